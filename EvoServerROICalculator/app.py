@@ -1,9 +1,20 @@
 import streamlit as st
+import altair as alt
+import numpy as np
+import pandas as pd
 import xml.etree.ElementTree as ET
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
 import os
 
+import roi_engine
+from roi_engine import DEFAULT_VALUES
+import monte_carlo
+import onchain
+import projection
+
 st.set_page_config(
     page_title="Dash Evonode ROI Calculator",
     page_icon="favicon.ico",
@@ -56,6 +67,73 @@ LANG = {
         'add_rent': {
             '$': {'eng': 'Additional servers rent ($/month)', 'rus': 'Общая аренда доп. серверов ($/мес)'},
             '₽': {'eng': 'Additional servers rent (₽/month)', 'rus': 'Общая аренда доп. серверов (₽/мес)'}
+        },
+        'dash_price': {'eng': 'Dash price ($)', 'rus': 'Курс Dash ($)'}
+    },
+    'scenarios': {
+        'header': {'eng': 'Scenario analysis', 'rus': 'Анализ сценариев'},
+        'x_axis': {'eng': 'Horizontal axis:', 'rus': 'Горизонтальная ось:'},
+        'y_axis': {'eng': 'Vertical axis:', 'rus': 'Вертикальная ось:'},
+        'heatmap': {'eng': 'ROI (%) across scenarios', 'rus': 'Доходность (%) по сценариям'},
+        'sensitivity': {'eng': 'ROI (%) when one input changes', 'rus': 'Доходность (%) при изменении одного параметра'},
+        'parameter': {'eng': 'Input', 'rus': 'Параметр'},
+        'base': {'eng': 'Current', 'rus': 'Текущее'}
+    },
+    'onchain': {
+        'header': {'eng': 'Platform payouts from on-chain history', 'rus': 'Выплаты Platform по истории блокчейна'},
+        'source': {
+            'eng': 'Validator hashes (one per line) or a fleet link; leave empty for the whole network',
+            'rus': 'Хэши валидаторов (по одному в строке) или ссылка на группу; пусто — вся сеть'
+        },
+        'epochs': {'eng': 'Closed epochs to average', 'rus': 'Количество закрытых эпох для усреднения'},
+        'load': {'eng': 'Use on-chain payouts', 'rus': 'Использовать выплаты из блокчейна'},
+        'loaded': {
+            'eng': 'Platform: {:.2f} Dash per validator every {:.2f} days (epochs {}–{}, {} validators). Core payouts are still entered manually.',
+            'rus': 'Platform: {:.2f} Dash на валидатора каждые {:.2f} дней (эпохи {}–{}, валидаторов: {}). Выплаты Core по-прежнему вводятся вручную.'
+        },
+        'no_data': {'eng': 'No withdrawal history found for these validators', 'rus': 'История выплат для этих валидаторов не найдена'},
+        'error': {'eng': 'Could not load on-chain payouts: {}', 'rus': 'Не удалось загрузить выплаты из блокчейна: {}'}
+    },
+    'projection': {
+        'header': {'eng': 'Multi-year projection', 'rus': 'Многолетний прогноз'},
+        'settings': {'eng': 'Projection settings', 'rus': 'Параметры прогноза'},
+        'years': {'eng': 'Years', 'rus': 'Лет'},
+        'dash_drift': {'eng': 'Dash price change (%/year)', 'rus': 'Изменение курса Dash (%/год)'},
+        'fx_drift': {'eng': 'USD/RUB change (%/year)', 'rus': 'Изменение курса USD/RUB (%/год)'},
+        'reinvest': {'eng': 'Reinvest payouts into new servers', 'rus': 'Реинвестировать выплаты в новые серверы'},
+        'npv_rate': {'eng': 'Discount rate for NPV (%/year)', 'rus': 'Ставка дисконтирования для NPV (%/год)'},
+        'scenarios': {'eng': 'Scenarios (drawn from the simulation distributions)', 'rus': 'Сценарии (по распределениям моделирования)'},
+        'npv': {'eng': 'Median NPV', 'rus': 'Медианный NPV'},
+        'irr': {'eng': 'Median IRR', 'rus': 'Медианная IRR'},
+        'break_even': {'eng': 'Break-even (median)', 'rus': 'Окупаемость (медиана)'},
+        'break_even_value': {'eng': '{:.1f} years ({:.0f}% of scenarios)', 'rus': '{:.1f} лет ({:.0f}% сценариев)'},
+        'never': {'eng': 'Not within the horizon', 'rus': 'Не в пределах прогноза'},
+        'nodes': {'eng': 'Servers at the end (median)', 'rus': 'Серверов в конце (медиана)'},
+        'net_worth': {'eng': 'Net position ($): cash taken out plus collateral value', 'rus': 'Чистая позиция ($): полученные средства плюс стоимость залога'},
+        'year': {'eng': 'Year', 'rus': 'Год'}
+    },
+    'simulation': {
+        'header': {'eng': 'Simulation', 'rus': 'Моделирование'},
+        'settings': {'eng': 'Input distributions', 'rus': 'Распределения параметров'},
+        'distribution': {'eng': 'Distribution', 'rus': 'Распределение'},
+        'spread': {'eng': 'Spread (%)', 'rus': 'Разброс (%)'},
+        'history': {
+            'profit1': {'eng': 'Historical Platform payouts (Dash), one per line', 'rus': 'История выплат Platform (Dash), по одной в строке'},
+            'profit2': {'eng': 'Historical Core payouts (Dash), one per line', 'rus': 'История выплат Core (Dash), по одной в строке'}
+        },
+        'trials': {'eng': 'Number of trials', 'rus': 'Количество испытаний'},
+        'median': {'eng': 'Median ROI', 'rus': 'Медианная доходность'},
+        'range': {'eng': 'ROI 5–95%', 'rus': 'Доходность 5–95%'},
+        'loss': {'eng': 'Probability of loss', 'rus': 'Вероятность убытка'},
+        'histogram': {'eng': 'ROI (%) distribution', 'rus': 'Распределение доходности (%)'},
+        'percentile': {'eng': 'Percentile', 'rus': 'Перцентиль'},
+        'no_trials': {'eng': 'No trial produced a valid ROI; check the inputs', 'rus': 'Ни одно испытание не дало корректной доходности; проверьте параметры'},
+        'kinds': {
+            'fixed': {'eng': 'Fixed', 'rus': 'Фиксированное'},
+            'normal': {'eng': 'Normal', 'rus': 'Нормальное'},
+            'lognormal': {'eng': 'Lognormal', 'rus': 'Логнормальное'},
+            'uniform': {'eng': 'Uniform', 'rus': 'Равномерное'},
+            'triangular': {'eng': 'Triangular', 'rus': 'Треугольное'}
         }
     },
     'results': {
@@ -75,26 +153,54 @@ LANG = {
     'calculate': {'eng': 'Calculate', 'rus': 'Рассчитать'}
 }
 
-# Default values
-DEFAULT_VALUES = {
-    'servers_count': 5,
-    'investment_per_server': 4000,
-    'profit1': 9,
-    'days1': 9.5,
-    'profit2': 0.89,
-    'days2': 4.5,
-    'ssl_cost': 81,
-    'ssl_months': 36,
-    'discount_rate': 10,
-    'rent_main': {'$': 50, '₽': 4350},
-    'add_servers': {'$': 45, '₽': 7655}
+# Scenario analysis settings
+SWEEP_POINTS = 25
+SWEEP_RANGE = (0.5, 1.5)  # axis span as multiples of the current value
+SWEEP_AXES = ('servers_count', 'dash_usd', 'profit1', 'days1', 'profit2', 'days2', 'rent_main_usd')
+
+# Simulation defaults: (distribution, spread in percent) per uncertain input
+SIMULATION_DEFAULTS = {
+    'dash_usd': ('lognormal', 30.0),
+    'profit1': ('normal', 10.0),
+    'days1': ('normal', 10.0),
+    'profit2': ('normal', 10.0),
+    'days2': ('normal', 10.0)
+}
+
+# LANG['inputs'] labels of the roi_engine parameters; rents are always in $ there
+PARAMETER_LABELS = {
+    'servers_count': ('servers',),
+    'investment_per_server': ('investment',),
+    'profit1': ('profit1',),
+    'days1': ('days1',),
+    'profit2': ('profit2',),
+    'days2': ('days2',),
+    'ssl_cost': ('ssl',),
+    'ssl_months': ('ssl_months',),
+    'discount_rate': ('discount',),
+    'rent_main_usd': ('main_rent', '$'),
+    'add_servers_usd': ('add_rent', '$'),
+    'dash_usd': ('dash_price',)
 }
 
+@st.cache_resource
+def get_http_session():
+    """Shared keep-alive session with retries for the rate APIs"""
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET"])
+    )
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_maxsize=4, max_retries=retry))
+    return session
+
 @st.cache_data(ttl=3600)  # Cache for 1 hour
 def get_usd_rate():
     """Get USD/RUB rate from CBR"""
     try:
-        response = requests.get('https://www.cbr.ru/scripts/XML_daily.asp', timeout=10)
+        response = get_http_session().get('https://www.cbr.ru/scripts/XML_daily.asp', timeout=10)
         response.encoding = 'windows-1251'
         root = ET.fromstring(response.text)
         
@@ -111,12 +217,18 @@ def get_usd_rate():
 def get_dash_rate():
     """Get Dash/USD rate"""
     try:
-        response = requests.get("https://chainz.cryptoid.info/dash/api.dws?q=ticker.usd", timeout=10)
+        response = get_http_session().get("https://chainz.cryptoid.info/dash/api.dws?q=ticker.usd", timeout=10)
         return round(float(response.text), 2)
     except Exception as e:
         st.warning(f"Error getting Dash rate: {e}. Using default value of 28.50 $/DASH")
         return 28.50  # Default value in case of error
 
+@st.cache_data(ttl=3600, show_spinner=False)  # The server recomputes once per epoch; this spares reruns the round trip
+def get_payout_stats(validators, fleet_id, epochs):
+    """Empirical Platform payouts for validators (a tuple), a fleet or the whole network"""
+    return onchain.fetch_payout_stats(list(validators) if validators else None, fleet_id, epochs,
+                                      session=get_http_session())
+
 def initialize_session_state():
     """Initialize session state variables if they don't exist"""
     if 'lang' not in st.session_state:
@@ -131,6 +243,10 @@ def initialize_session_state():
         st.session_state.calculation_done = False
     if 'calculation_results' not in st.session_state:
         st.session_state.calculation_results = {}
+    if 'onchain_stats' not in st.session_state:
+        st.session_state.onchain_stats = None
+    if 'onchain_error' not in st.session_state:
+        st.session_state.onchain_error = None
 
 def change_language():
     """Change the language of the application"""
@@ -150,70 +266,281 @@ def change_currency():
         st.session_state.currency = '₽'
 #     st.rerun()
 
-def calculate_profit():
-    """Calculate profit based on user inputs"""
-    lang = st.session_state.lang
-    currency = st.session_state.currency
-    dash_usd = st.session_state.dash_usd
-    usd_rub = st.session_state.usd_rub
-    
-    # Get input values from session state
-    servers_count = st.session_state.servers_count
-    investment_per_server = st.session_state.investment_per_server
-    profit1 = st.session_state.profit1
-    days1 = st.session_state.days1
-    profit2 = st.session_state.profit2
-    days2 = st.session_state.days2
-    ssl_cost = st.session_state.ssl_cost
-    ssl_months = st.session_state.ssl_months
-    discount_rate = st.session_state.discount_rate / 100
-    
-    rent_main = st.session_state.rent_main
-    add_servers = st.session_state.add_servers
+def load_onchain_payouts():
+    """Fill the Platform inputs and the simulation's payout history from on-chain data"""
+    validators, fleet_id = onchain.parse_source(st.session_state.onchain_source)
+    try:
+        stats = get_payout_stats(tuple(validators or ()), fleet_id, int(st.session_state.onchain_epochs))
+    except Exception as e:
+        st.session_state.onchain_stats = None
+        st.session_state.onchain_error = str(e)
+        return
 
-    # Currency conversion
-    if currency == '₽':
-        rent_main_usd = rent_main / usd_rub
-        add_servers_usd = add_servers / usd_rub
-    else:
-        rent_main_usd = rent_main
-        add_servers_usd = add_servers
+    st.session_state.onchain_error = None
+    st.session_state.onchain_stats = stats
+    # The form inputs do not go below 0.1
+    for key, value in onchain.payout_inputs(stats).items():
+        st.session_state[key] = max(value, 0.1)
+    if stats.get('epoch_payouts'):
+        st.session_state.sim_history_profit1 = '\n'.join(str(value) for value in stats['epoch_payouts'])
 
-    # Calculations
-    total_investment = investment_per_server * servers_count
-    ssl_annual_per_server = (ssl_cost / ssl_months) * 12  # Annual cost per server
-    ssl_total = ssl_annual_per_server * servers_count      # Total annual cost
-    
-    annual_payouts1 = 365 / days1
-    annual_dash1 = annual_payouts1 * profit1 * servers_count
-    
-    annual_payouts2 = 365 / days2
-    annual_dash2 = annual_payouts2 * profit2 * servers_count
-    
-    total_dash = annual_dash1 + annual_dash2
-    total_usd_income = total_dash * dash_usd
+def render_onchain(lang):
+    """Controls that replace the Platform payout defaults with measured values"""
+    with st.expander(LANG['onchain']['header'][lang]):
+        st.text_area(LANG['onchain']['source'][lang], key='onchain_source')
+        st.number_input(LANG['onchain']['epochs'][lang], min_value=1, max_value=100, value=10, step=1,
+                        key='onchain_epochs')
+        st.button(LANG['onchain']['load'][lang], on_click=load_onchain_payouts)
 
-    rent_total_usd = (rent_main_usd * servers_count + add_servers_usd) * 12 * (1 - discount_rate)
-    total_usd_expenses = rent_total_usd + ssl_total
+        stats = st.session_state.onchain_stats
+        if st.session_state.onchain_error:
+            st.warning(LANG['onchain']['error'][lang].format(st.session_state.onchain_error))
+        elif stats is not None and stats.get('payout_per_epoch') is None:
+            st.warning(LANG['onchain']['no_data'][lang])
+        elif stats is not None:
+            st.info(LANG['onchain']['loaded'][lang].format(
+                stats['payout_per_epoch'], stats['epoch_days'] or 0, stats['start_epoch'], stats['end_epoch'],
+                stats['validators']
+            ))
 
-    initial_investment_usd = total_investment * dash_usd
-    net_profit = total_usd_income - total_usd_expenses
-    profit_percent = (net_profit / initial_investment_usd) * 100
+def parameter_label(name, lang):
+    """Localized label of a roi_engine parameter"""
+    label = LANG['inputs']
+    for key in PARAMETER_LABELS[name]:
+        label = label[key]
+    return label[lang]
 
-    # Store results
+def roi_inputs():
+    """roi_engine parameters from the form values in session state"""
+    currency = st.session_state.currency
+    usd_rub = st.session_state.usd_rub
+    return {
+        'servers_count': st.session_state.servers_count,
+        'investment_per_server': st.session_state.investment_per_server,
+        'profit1': st.session_state.profit1,
+        'days1': st.session_state.days1,
+        'profit2': st.session_state.profit2,
+        'days2': st.session_state.days2,
+        'ssl_cost': st.session_state.ssl_cost,
+        'ssl_months': st.session_state.ssl_months,
+        'discount_rate': st.session_state.discount_rate,
+        'rent_main_usd': float(roi_engine.rent_to_usd(st.session_state.rent_main, currency, usd_rub)),
+        'add_servers_usd': float(roi_engine.rent_to_usd(st.session_state.add_servers, currency, usd_rub)),
+        'dash_usd': st.session_state.dash_usd
+    }
+
+def calculate_profit():
+    """Calculate profit based on user inputs"""
+    inputs = roi_inputs()
+    results = {key: float(value) for key, value in roi_engine.evaluate(**inputs).items()}
+
+    # Store results; the button callback runs before the rerun, so the page picks them up directly
     st.session_state.calculation_results = {
-        'dash_usd': dash_usd,
-        'usd_rub': usd_rub,
-        'total_investment': total_investment,
-        'initial_investment_usd': initial_investment_usd,
-        'total_usd_income': total_usd_income,
-        'total_usd_expenses': total_usd_expenses,
-        'net_profit': net_profit,
-        'profit_percent': profit_percent
+        'dash_usd': st.session_state.dash_usd,
+        'usd_rub': st.session_state.usd_rub,
+        **results,
+        'inputs': inputs
     }
-    
     st.session_state.calculation_done = True
-    st.rerun()
+
+def sweep_values(name, value):
+    """Axis values around the current value of a parameter"""
+    if name == 'servers_count':
+        return np.arange(1, max(2 * int(value), SWEEP_POINTS) + 1)
+    return np.linspace(value * SWEEP_RANGE[0], value * SWEEP_RANGE[1], SWEEP_POINTS)
+
+@st.cache_data
+def scenario_grid(inputs, x_name, y_name):
+    """Long-form ROI table over two parameters, for the heatmap"""
+    x_values = sweep_values(x_name, inputs[x_name])
+    y_values = sweep_values(y_name, inputs[y_name])
+    roi = roi_engine.sweep(inputs, {x_name: x_values, y_name: y_values})['profit_percent']
+    x_grid, y_grid = np.meshgrid(x_values, y_values, indexing='ij')
+    return pd.DataFrame({'x': x_grid.ravel().round(2), 'y': y_grid.ravel().round(2), 'roi': roi.ravel()})
+
+@st.cache_data
+def sensitivity_table(inputs, lang):
+    """ROI table with one input changed at a time by each roi_engine.SENSITIVITY_STEPS step"""
+    roi = roi_engine.sensitivity(inputs)
+    table = pd.DataFrame(roi, columns=[f"{step:+d}%" for step in roi_engine.SENSITIVITY_STEPS])
+    table.insert(0, LANG['scenarios']['base'][lang], float(roi_engine.evaluate(**inputs)['profit_percent']))
+    table.insert(0, LANG['scenarios']['parameter'][lang], [parameter_label(name, lang) for name in roi_engine.PARAMETERS])
+    return table
+
+def parse_history(text):
+    """Payout amounts from a textarea, skipping lines that are not numbers"""
+    values = []
+    for line in text.splitlines():
+        try:
+            values.append(float(line.strip().replace(',', '.')))
+        except ValueError:
+            continue
+    return values
+
+def render_simulation(inputs, lang):
+    """Monte Carlo ROI over the uncertain inputs; returns the distribution specs for the projection"""
+    st.header(LANG['simulation']['header'][lang])
+
+    specs = {}
+    with st.expander(LANG['simulation']['settings'][lang]):
+        kinds = [kind for kind in monte_carlo.DISTRIBUTIONS if kind != 'bootstrap']
+        for name in monte_carlo.UNCERTAIN_PARAMETERS:
+            kind, spread = SIMULATION_DEFAULTS[name]
+            col1, col2, col3 = st.columns([2, 1, 1])
+            with col1:
+                st.markdown(parameter_label(name, lang))
+            with col2:
+                kind = st.selectbox(LANG['simulation']['distribution'][lang], kinds, index=kinds.index(kind),
+                                    format_func=lambda kind: LANG['simulation']['kinds'][kind][lang],
+                                    key=f'sim_kind_{name}')
+            with col3:
+                spread = st.number_input(LANG['simulation']['spread'][lang], min_value=0.0, max_value=100.0,
+                                         value=spread, step=1.0, key=f'sim_spread_{name}')
+            specs[name] = {'kind': kind, 'spread': spread}
+
+        # Payout history replaces the payout distribution; a year averages 365 / interval payouts
+        for name, days in (('profit1', 'days1'), ('profit2', 'days2')):
+            history = parse_history(st.text_area(LANG['simulation']['history'][name][lang], key=f'sim_history_{name}'))
+            if history:
+                specs[name] = {'kind': 'bootstrap', 'values': history,
+                               'draws': round(roi_engine.DAYS_PER_YEAR / inputs[days])}
+
+        trials = st.number_input(LANG['simulation']['trials'][lang], min_value=1000, max_value=10_000_000,
+                                 value=monte_carlo.DEFAULT_TRIALS, step=10_000, key='sim_trials')
+
+    result = monte_carlo.simulate(inputs, specs, trials=int(trials))
+    if not result['trials']:
+        st.warning(LANG['simulation']['no_trials'][lang])
+        return specs
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric(LANG['simulation']['median'][lang], f"{result['percentiles'][50]:.2f}%")
+    with col2:
+        st.metric(LANG['simulation']['range'][lang],
+                  f"{result['percentiles'][5]:.2f}% … {result['percentiles'][95]:.2f}%")
+    with col3:
+        st.metric(LANG['simulation']['loss'][lang], f"{result['probability_of_loss'] * 100:.1f}%")
+
+    edges = result['histogram']['edges']
+    histogram = pd.DataFrame({'start': edges[:-1], 'end': edges[1:], 'count': result['histogram']['counts']})
+    st.subheader(LANG['simulation']['histogram'][lang])
+    st.altair_chart(alt.Chart(histogram).mark_bar().encode(
+        x=alt.X('start:Q', bin='binned', title='ROI (%)'),
+        x2='end:Q',
+        y=alt.Y('count:Q', title=None),
+        color=alt.condition(alt.datum.end <= 0, alt.value('#e45756'), alt.value('#54a24b'))
+    ), use_container_width=True)
+
+    st.dataframe(
+        pd.DataFrame({
+            LANG['simulation']['percentile'][lang]: [f"P{p}" for p in result['percentiles']],
+            'ROI (%)': list(result['percentiles'].values())
+        }),
+        hide_index=True,
+        column_config={'ROI (%)': st.column_config.NumberColumn(format="%.2f%%")}
+    )
+    return specs
+
+@st.cache_data
+def projection_summary(inputs, specs, scenarios, options):
+    """Percentile bands and headline figures of a projection over scenarios drawn like the simulation"""
+    rng = np.random.default_rng(monte_carlo.DEFAULT_SEED)
+    base = monte_carlo.draw(inputs, specs, scenarios, rng) if scenarios > 1 else inputs
+    result = projection.project_inputs(base, **options)
+    break_even = result['break_even_month']
+    reached = break_even >= 0
+    return {
+        'years': result['months'] / roi_engine.MONTHS_PER_YEAR,
+        'fan': projection.fan(result['net_worth']),
+        'npv': float(np.median(result['npv'])),
+        'irr': float(np.nanmedian(result['irr'])) if np.isfinite(result['irr']).any() else None,
+        'break_even_years': float(np.median(break_even[reached])) / roi_engine.MONTHS_PER_YEAR if reached.any() else None,
+        'break_even_share': float(reached.mean()),
+        'nodes': float(np.median(result['nodes'][:, -1]))
+    }
+
+def render_projection(inputs, specs, lang):
+    """Monthly cash-flow projection with NPV, IRR, break-even and a net position fan chart"""
+    st.header(LANG['projection']['header'][lang])
+
+    with st.expander(LANG['projection']['settings'][lang]):
+        col1, col2 = st.columns(2)
+        with col1:
+            years = st.slider(LANG['projection']['years'][lang], min_value=1, max_value=20,
+                              value=projection.DEFAULT_YEARS, key='proj_years')
+            dash_drift = st.number_input(LANG['projection']['dash_drift'][lang], min_value=-50.0, max_value=100.0,
+                                         value=0.0, step=1.0, key='proj_dash_drift')
+            rent_fx_drift = 0.0
+            if st.session_state.currency == '₽':
+                rent_fx_drift = st.number_input(LANG['projection']['fx_drift'][lang], min_value=-50.0,
+                                                max_value=100.0, value=0.0, step=1.0, key='proj_fx_drift')
+        with col2:
+            npv_rate = st.number_input(LANG['projection']['npv_rate'][lang], min_value=0.0, max_value=100.0,
+                                       value=float(projection.DEFAULT_NPV_RATE), step=1.0, key='proj_npv_rate')
+            scenarios = st.number_input(LANG['projection']['scenarios'][lang], min_value=1, max_value=5000,
+                                        value=1000, step=100, key='proj_scenarios')
+            reinvest = st.checkbox(LANG['projection']['reinvest'][lang], key='proj_reinvest')
+
+    options = {'years': years, 'dash_drift': dash_drift, 'rent_fx_drift': rent_fx_drift,
+               'reinvest': reinvest, 'npv_rate': npv_rate}
+    summary = projection_summary(inputs, specs, int(scenarios), options)
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric(LANG['projection']['npv'][lang], f"${summary['npv']:,.0f}")
+    with col2:
+        st.metric(LANG['projection']['irr'][lang], f"{summary['irr']:.2f}%" if summary['irr'] is not None else "—")
+    with col3:
+        st.metric(LANG['projection']['break_even'][lang],
+                  LANG['projection']['break_even_value'][lang].format(summary['break_even_years'],
+                                                                      summary['break_even_share'] * 100)
+                  if summary['break_even_years'] is not None else LANG['projection']['never'][lang])
+    with col4:
+        st.metric(LANG['projection']['nodes'][lang], f"{summary['nodes']:.0f}")
+
+    low, median, high = summary['fan']
+    bands = pd.DataFrame({'year': summary['years'], 'low': low, 'median': median, 'high': high})
+    year_axis = alt.X('year:Q', title=LANG['projection']['year'][lang])
+    st.subheader(LANG['projection']['net_worth'][lang])
+    st.altair_chart(
+        alt.Chart(bands).mark_area(opacity=0.3).encode(x=year_axis, y=alt.Y('low:Q', title='$'), y2='high:Q')
+        + alt.Chart(bands).mark_line().encode(x=year_axis, y='median:Q'),
+        use_container_width=True
+    )
+
+def render_scenarios(inputs, lang):
+    """Heatmap of ROI over two chosen inputs and a one-at-a-time sensitivity table"""
+    st.header(LANG['scenarios']['header'][lang])
+
+    labels = {name: parameter_label(name, lang) for name in SWEEP_AXES}
+    col1, col2 = st.columns(2)
+    with col1:
+        x_name = st.selectbox(LANG['scenarios']['x_axis'][lang], SWEEP_AXES, index=0,
+                              format_func=labels.get, key='sweep_x')
+    with col2:
+        y_name = st.selectbox(LANG['scenarios']['y_axis'][lang], [name for name in SWEEP_AXES if name != x_name],
+                              index=0, format_func=labels.get, key='sweep_y')
+
+    grid = scenario_grid(inputs, x_name, y_name)
+    st.subheader(LANG['scenarios']['heatmap'][lang])
+    heatmap = alt.Chart(grid).mark_rect().encode(
+        x=alt.X('x:O', title=labels[x_name]),
+        y=alt.Y('y:O', title=labels[y_name], sort='descending'),
+        color=alt.Color('roi:Q', title='ROI (%)', scale=alt.Scale(scheme='redyellowgreen', domainMid=0)),
+        tooltip=[alt.Tooltip('x:Q', title=labels[x_name]), alt.Tooltip('y:Q', title=labels[y_name]),
+                 alt.Tooltip('roi:Q', title='ROI (%)', format='.2f')]
+    )
+    st.altair_chart(heatmap, use_container_width=True)
+
+    st.subheader(LANG['scenarios']['sensitivity'][lang])
+    table = sensitivity_table(inputs, lang)
+    st.dataframe(
+        table,
+        hide_index=True,
+        use_container_width=True,
+        column_config={column: st.column_config.NumberColumn(format="%.2f%%") for column in table.columns[1:]}
+    )
 
 def main():
     # Initialize session state
@@ -308,6 +635,7 @@ def main():
     
     # Main form for inputs
     st.header(LANG['inputs']['default_values'][lang])
+    render_onchain(lang)
     
     col1, col2 = st.columns(2)
     
@@ -451,5 +779,14 @@ def main():
             delta_color="normal" if roi_value > 0 else "inverse"
         )
 
+        st.divider()
+        render_scenarios(results['inputs'], lang)
+
+        st.divider()
+        specs = render_simulation(results['inputs'], lang)
+
+        st.divider()
+        render_projection(results['inputs'], specs, lang)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,132 @@
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import roi_engine
+
+# Inputs that can be drawn from a distribution instead of taken as a point estimate
+UNCERTAIN_PARAMETERS = ('dash_usd', 'profit1', 'days1', 'profit2', 'days2')
+
+# Distribution kinds; spread is in percent of the base value (sigma for normal and lognormal, half-width otherwise)
+DISTRIBUTIONS = ('fixed', 'normal', 'lognormal', 'uniform', 'triangular', 'bootstrap')
+
+# Simulation settings
+DEFAULT_TRIALS = 100_000
+CHUNK_SIZE = 50_000  # trials evaluated at once; bounds the size of the intermediate arrays
+PERCENTILES = (5, 25, 50, 75, 95)
+HISTOGRAM_BINS = 50
+HISTOGRAM_RANGE = (0.5, 99.5)  # percentiles the histogram spans, so outliers do not flatten it
+DEFAULT_SEED = 0
+MIN_INTERVAL_DAYS = 0.1  # same floor as the form inputs
+CACHE_SIZE = 32
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def parameter_hash(base, specs, trials, seed):
+    """Stable key of a simulation's inputs"""
+    payload = json.dumps([base, specs, trials, seed], sort_keys=True, default=float)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def sample(spec, base_value, size, rng):
+    """Draw size values of one input from its distribution spec around base_value.
+
+    A bootstrap spec resamples its "values" (e.g. historical payouts) and
+    averages "draws" of them per trial, as a year is made of many payouts.
+    """
+    kind = spec.get('kind', 'fixed')
+    spread = spec.get('spread', 0) / 100
+    if kind == 'fixed':
+        return np.full(size, base_value, dtype=float)
+    if kind == 'normal':
+        return rng.normal(base_value, base_value * spread, size)
+    if kind == 'lognormal':
+        # mu = -sigma^2 / 2 keeps base_value the mean rather than the median
+        return base_value * rng.lognormal(-spread ** 2 / 2, spread, size)
+    if kind == 'uniform':
+        return rng.uniform(base_value * (1 - spread), base_value * (1 + spread), size)
+    if kind == 'triangular':
+        if spread == 0:
+            return np.full(size, base_value, dtype=float)
+        return rng.triangular(base_value * (1 - spread), base_value, base_value * (1 + spread), size)
+    if kind == 'bootstrap':
+        values = np.asarray(spec.get('values') or [base_value], dtype=float)
+        draws = max(int(spec.get('draws', 1)), 1)
+        return rng.choice(values, size=(size, draws)).mean(axis=1)
+    raise ValueError(f"Unknown distribution: {kind}")
+
+
+def clip_samples(name, values):
+    """Keep sampled inputs in the range the form allows"""
+    if name in ('days1', 'days2'):
+        return np.maximum(values, MIN_INTERVAL_DAYS)
+    return np.maximum(values, 0)
+
+
+def draw(base, specs, size, rng):
+    """Parameter arrays for size scenarios: the specs' inputs sampled, the others taken from base"""
+    params = dict(base)
+    for name, spec in specs.items():
+        params[name] = clip_samples(name, sample(spec, base[name], size, rng))
+    return params
+
+
+def simulate(base, specs, trials=DEFAULT_TRIALS, seed=DEFAULT_SEED, chunk_size=CHUNK_SIZE):
+    """ROI percentiles, mean and probability of loss over randomly drawn scenarios.
+
+    base maps every roi_engine parameter to its point estimate and specs
+    maps some of UNCERTAIN_PARAMETERS to distribution specs. Trials run in
+    chunks of chunk_size, so only the per-trial ROI array grows with the
+    trial count. Results for a seeded run are cached by parameter hash.
+    When no trial has a finite ROI the result has trials 0 and an "error".
+    """
+    unknown = set(specs) - set(UNCERTAIN_PARAMETERS)
+    if unknown:
+        raise ValueError(f"Parameters cannot be simulated: {', '.join(sorted(unknown))}")
+
+    key = parameter_hash(base, specs, trials, seed) if seed is not None else None
+    if key is not None:
+        with _cache_lock:
+            if key in _cache:
+                _cache.move_to_end(key)
+                return _cache[key]
+
+    rng = np.random.default_rng(seed)
+    roi = np.empty(trials)
+    for start in range(0, trials, chunk_size):
+        size = min(chunk_size, trials - start)
+        roi[start:start + size] = roi_engine.evaluate(**draw(base, specs, size, rng))['profit_percent']
+
+    roi = roi[np.isfinite(roi)]
+    if not roi.size:
+        # e.g. zero investment or NaN inputs: no trial has a defined ROI
+        return {
+            'trials': 0,
+            'error': "no valid trials",
+            'mean': None,
+            'std': None,
+            'probability_of_loss': None,
+            'percentiles': {},
+            'histogram': {'counts': [], 'edges': []}
+        }
+    counts, edges = np.histogram(roi, bins=HISTOGRAM_BINS, range=tuple(np.percentile(roi, HISTOGRAM_RANGE)))
+    result = {
+        'trials': int(roi.size),
+        'mean': float(roi.mean()),
+        'std': float(roi.std()),
+        'probability_of_loss': float((roi < 0).mean()),
+        'percentiles': dict(zip(PERCENTILES, np.percentile(roi, PERCENTILES).tolist())),
+        'histogram': {'counts': counts.tolist(), 'edges': edges.tolist()}
+    }
+
+    if key is not None:
+        with _cache_lock:
+            _cache[key] = result
+            while len(_cache) > CACHE_SIZE:
+                _cache.popitem(last=False)
+    return result
@@ -0,0 +1,47 @@
+import os
+import re
+
+import requests
+
+# WebMuxValidator instance that serves the withdrawal history
+WEBMUX_API_URL = os.environ.get("WEBMUX_API_URL", "https://evocalc.ru/webmux").rstrip('/')
+REQUEST_TIMEOUT = (5, 150)  # the server may sync a fleet it has not seen before answering
+
+FLEET_LINK = re.compile(r'/fleet/([0-9a-f]+)')
+VALIDATOR_HASH = re.compile(r'^[0-9A-Fa-f]{64}$')
+
+
+def parse_source(text):
+    """Split a textarea into (validators, fleet_id): a fleet link or ID, or validator hashes one per line"""
+    text = text.strip()
+    match = FLEET_LINK.search(text)
+    if match:
+        return None, match.group(1)
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    if len(lines) == 1 and not VALIDATOR_HASH.match(lines[0]):
+        return None, lines[0]
+    return list(dict.fromkeys(lines)) or None, None
+
+
+def fetch_payout_stats(validators=None, fleet_id=None, epochs=None, session=None):
+    """Empirical Platform payouts from WebMuxValidator's /api/payout_stats (the whole network when nothing is given)"""
+    payload = {}
+    if fleet_id:
+        payload['fleet_id'] = fleet_id
+    elif validators:
+        payload['validators'] = validators
+    if epochs:
+        payload['epochs'] = epochs
+    response = (session or requests).post(f"{WEBMUX_API_URL}/api/payout_stats", json=payload, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return response.json()
+
+
+def payout_inputs(stats):
+    """ROI inputs (profit1, days1) from payout stats, leaving out the ones without data"""
+    inputs = {}
+    if stats.get('payout_per_epoch') is not None:
+        inputs['profit1'] = round(stats['payout_per_epoch'], 2)
+    if stats.get('epoch_days'):
+        inputs['days1'] = round(stats['epoch_days'], 2)
+    return inputs
@@ -0,0 +1,125 @@
+import numpy as np
+
+from roi_engine import DAYS_PER_YEAR, MONTHS_PER_YEAR, PARAMETERS
+
+# Projection settings
+DEFAULT_YEARS = 10
+DEFAULT_NPV_RATE = 10  # annual discount rate in percent
+IRR_BOUNDS = (-0.5, 1.0)  # monthly rates searched for the IRR; lower bounds overflow on long horizons
+IRR_ITERATIONS = 60
+FAN_PERCENTILES = (5, 50, 95)
+
+
+def growth(rate_percent, months):
+    """Compound factor after months at an annual rate in percent (scenarios x months)"""
+    return (1 + rate_percent[:, None] / 100) ** (months[None, :] / MONTHS_PER_YEAR)
+
+
+def npv(cash_flows, monthly_rate):
+    """Net present value of monthly cash flows (scenarios x months) at a monthly rate per scenario"""
+    months = np.arange(cash_flows.shape[1])
+    return (cash_flows * (1 + monthly_rate[:, None]) ** -months[None, :]).sum(axis=1)
+
+
+def irr(cash_flows):
+    """Annual IRR in percent per scenario by bisection on the monthly rate, NaN without a sign change"""
+    lo = np.full(len(cash_flows), IRR_BOUNDS[0])
+    hi = np.full(len(cash_flows), IRR_BOUNDS[1])
+    npv_lo = npv(cash_flows, lo)
+    valid = np.sign(npv_lo) != np.sign(npv(cash_flows, hi))
+    for _ in range(IRR_ITERATIONS):
+        mid = (lo + hi) / 2
+        npv_mid = npv(cash_flows, mid)
+        below = np.sign(npv_mid) == np.sign(npv_lo)
+        lo = np.where(below, mid, lo)
+        npv_lo = np.where(below, npv_mid, npv_lo)
+        hi = np.where(below, hi, mid)
+    rate = (lo + hi) / 2
+    return np.where(valid, ((1 + rate) ** MONTHS_PER_YEAR - 1) * 100, np.nan)
+
+
+def project(servers_count, investment_per_server, profit1, days1, profit2, days2, ssl_cost, ssl_months,
+            discount_rate, rent_main_usd, add_servers_usd, dash_usd, years=DEFAULT_YEARS, dash_drift=0,
+            rent_fx_drift=0, reinvest=False, npv_rate=DEFAULT_NPV_RATE):
+    """Monthly cash flows of one or many scenarios over a number of years.
+
+    The roi_engine inputs may be scalars or equal-length arrays, one value
+    per scenario; rents are today's $ amounts. dash_drift is the annual
+    change of the Dash price and rent_fx_drift the annual rise of the rent
+    currency's USD rate (USD/RUB for rent in ₽, so rent gets cheaper in $).
+    Month 0 buys the collateral and the last month sells it. With reinvest
+    payouts are kept in Dash and every full collateral starts a new server.
+    SSL certificates are bought with each server and renewed for all of
+    them every ssl_months.
+    """
+    values = np.broadcast_arrays(*(np.atleast_1d(np.asarray(value, dtype=float)) for value in (
+        servers_count, investment_per_server, profit1, days1, profit2, days2, ssl_cost, ssl_months,
+        discount_rate, rent_main_usd, add_servers_usd, dash_usd, dash_drift, rent_fx_drift, npv_rate
+    )))
+    servers_count, investment_per_server, profit1, days1, profit2, days2, ssl_cost, ssl_months, \
+        discount_rate, rent_main_usd, add_servers_usd, dash_usd, dash_drift, rent_fx_drift, npv_rate = (
+            value.ravel() for value in values
+        )
+    scenarios = len(servers_count)
+    horizon = int(round(years * MONTHS_PER_YEAR))
+    months = np.arange(horizon + 1)
+
+    price = dash_usd[:, None] * growth(dash_drift, months)
+    rent_factor = 1 / growth(rent_fx_drift, months)
+    dash_per_server = (DAYS_PER_YEAR / days1 * profit1 + DAYS_PER_YEAR / days2 * profit2) / MONTHS_PER_YEAR
+    ssl_cycle = np.maximum(np.round(ssl_months), 1)
+
+    nodes = np.empty((scenarios, horizon + 1))
+    pool = np.zeros((scenarios, horizon + 1))
+    cash_flows = np.zeros((scenarios, horizon + 1))
+    nodes[:, 0] = servers_count
+    cash_flows[:, 0] = -servers_count * investment_per_server * price[:, 0]
+    new_nodes = np.zeros(scenarios)
+
+    for month in range(1, horizon + 1):
+        current = nodes[:, month - 1]
+        income = current * dash_per_server
+        rent = (rent_main_usd * current + add_servers_usd) * (1 - discount_rate / 100) * rent_factor[:, month]
+        renew = (month - 1) % ssl_cycle == 0
+        ssl = np.where(renew, ssl_cost * current, ssl_cost * new_nodes)
+
+        if reinvest:
+            balance = pool[:, month - 1] + income
+            new_nodes = np.floor(balance / investment_per_server)
+            pool[:, month] = balance - new_nodes * investment_per_server
+            nodes[:, month] = current + new_nodes
+            cash_flows[:, month] = -rent - ssl
+        else:
+            nodes[:, month] = current
+            cash_flows[:, month] = income * price[:, month] - rent - ssl
+
+    cumulative = np.cumsum(cash_flows, axis=1)
+    holdings = (nodes * investment_per_server[:, None] + pool) * price
+    net_worth = cumulative + holdings
+    cash_flows[:, -1] += holdings[:, -1]
+
+    # Break-even: the first month the cash taken out covers the money put in, collateral not counted
+    recovered = cumulative >= 0
+    recovered[:, 0] = False
+    break_even = np.where(recovered.any(axis=1), recovered.argmax(axis=1), -1)
+
+    monthly_rate = (1 + npv_rate / 100) ** (1 / MONTHS_PER_YEAR) - 1
+    return {
+        'months': months,
+        'cash_flows': cash_flows,
+        'net_worth': net_worth,
+        'nodes': nodes,
+        'npv': npv(cash_flows, monthly_rate),
+        'irr': irr(cash_flows),
+        'break_even_month': break_even
+    }
+
+
+def project_inputs(base, **options):
+    """project() over roi_engine inputs (scalars or per-scenario arrays) with the projection options"""
+    return project(**{name: base[name] for name in PARAMETERS}, **options)
+
+
+def fan(series, percentiles=FAN_PERCENTILES):
+    """Percentile bands of a scenarios x months array, as a percentiles x months array"""
+    return np.percentile(series, percentiles, axis=0)
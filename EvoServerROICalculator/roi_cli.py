@@ -0,0 +1,336 @@
+"""Headless ROI evaluation: a CLI over CSV/JSON fleet configurations and a small HTTP JSON endpoint.
+
+    python roi_cli.py evaluate fleets.csv --workers 4 > results.ndjson
+    python roi_cli.py serve --port 8502
+
+Both stream one JSON result per configuration and share the roi_engine
+(and, with --years, projection) core with the Streamlit app.
+"""
+import io
+import sys
+import csv
+import json
+import math
+import argparse
+from collections import deque
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import numpy as np
+
+import roi_engine
+import projection
+from roi_engine import DEFAULT_VALUES, PARAMETERS
+
+# Rates used when a configuration does not set them (the app's fallbacks)
+DEFAULT_DASH_USD = 28.50
+DEFAULT_USD_RUB = 84.21
+CURRENCY_ALIASES = {'USD': '$', 'RUB': '₽'}
+RENT_PARAMETERS = ('rent_main_usd', 'add_servers_usd')  # may be given in the rent currency without the suffix
+
+# Batch settings
+BATCH_SIZE = 1000         # configurations evaluated in one vectorized call
+MAX_PENDING_BATCHES = 2   # per worker; bounds memory while streaming large inputs
+
+# HTTP endpoint
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8502
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+# Result columns, in output order
+ROI_FIELDS = ('total_investment', 'initial_investment_usd', 'total_usd_income', 'total_usd_expenses', 'net_profit',
+              'profit_percent')
+PROJECTION_FIELDS = ('npv', 'irr', 'break_even_month', 'final_servers')
+
+
+def config_params(config, defaults):
+    """roi_engine parameters of one configuration; missing fields come from defaults and the form defaults"""
+    if not isinstance(config, dict):
+        raise ValueError("A configuration must be an object")
+    config = {**defaults, **{key: value for key, value in config.items() if value not in (None, '')}}
+    currency = CURRENCY_ALIASES.get(str(config.get('currency', '$')).upper(), config.get('currency', '$'))
+    if currency not in ('$', '₽'):
+        raise ValueError(f"Unknown currency: {currency}")
+    usd_rub = float(config.get('usd_rub', DEFAULT_USD_RUB))
+
+    params = {}
+    for name in PARAMETERS:
+        if name in config:
+            params[name] = float(config[name])
+        elif name in RENT_PARAMETERS:
+            rent = name[:-len('_usd')]
+            amount = float(config.get(rent, DEFAULT_VALUES[rent][currency]))
+            params[name] = float(roi_engine.rent_to_usd(amount, currency, usd_rub))
+        elif name == 'dash_usd':
+            params[name] = DEFAULT_DASH_USD
+        else:
+            params[name] = float(DEFAULT_VALUES[name])
+    return params
+
+
+def number(value):
+    """JSON-safe float (NaN and infinities become None)"""
+    value = float(value)
+    return round(value, 6) if math.isfinite(value) else None
+
+
+def evaluate_batch(batch, options):
+    """Results for a list of (index, configuration) pairs, in order; runs in worker processes.
+
+    Valid configurations are stacked into arrays and evaluated in one call;
+    invalid ones get an "error" result instead of failing the batch.
+    """
+    rows = []
+    params = []
+    for index, config in batch:
+        row = {'index': index}
+        if isinstance(config, dict) and ('id' in config or 'name' in config):
+            row['id'] = config.get('id', config.get('name'))
+        try:
+            params.append(config_params(config, options.get('defaults') or {}))
+        except (TypeError, ValueError) as e:
+            row['error'] = str(e)
+        rows.append(row)
+
+    valid = [row for row in rows if 'error' not in row]
+    if not valid:
+        return rows
+    arrays = {name: np.array([param[name] for param in params]) for name in PARAMETERS}
+    results = roi_engine.evaluate(**arrays)
+    projected = None
+    if options.get('years'):
+        projected = projection.project_inputs(arrays, years=options['years'], reinvest=options.get('reinvest', False),
+                                              dash_drift=options.get('dash_drift', 0),
+                                              rent_fx_drift=options.get('rent_fx_drift', 0),
+                                              npv_rate=options.get('npv_rate', projection.DEFAULT_NPV_RATE))
+
+    for i, row in enumerate(valid):
+        for field in ROI_FIELDS:
+            row[field] = number(results[field][i])
+        if projected is not None:
+            row['npv'] = number(projected['npv'][i])
+            row['irr'] = number(projected['irr'][i])
+            row['break_even_month'] = int(projected['break_even_month'][i])
+            row['final_servers'] = int(projected['nodes'][i, -1])
+    return rows
+
+
+def batches(configs, size=BATCH_SIZE):
+    """(index, configuration) pairs in lists of up to size"""
+    numbered = enumerate(configs)
+    while True:
+        batch = list(islice(numbered, size))
+        if not batch:
+            return
+        yield batch
+
+
+def evaluate_configs(configs, options, workers=1, executor=None):
+    """Stream results for an iterable of configurations, in input order.
+
+    With more than one worker, batches run in a process pool with a
+    bounded number in flight, so large inputs are never held in memory.
+    """
+    if workers <= 1 and executor is None:
+        for batch in batches(configs):
+            yield from evaluate_batch(batch, options)
+        return
+
+    pool = executor or ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending = deque()
+        for batch in batches(configs):
+            pending.append(pool.submit(evaluate_batch, batch, options))
+            if len(pending) >= workers * MAX_PENDING_BATCHES:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        if executor is None:
+            pool.shutdown(cancel_futures=True)
+
+
+def input_format(path, text=None):
+    """Input format from a file extension, or from the first character of a request body"""
+    if text is not None:
+        first = text.lstrip()[:1]
+        return 'json' if first == '[' else 'ndjson' if first == '{' else 'csv'
+    if path.endswith('.json'):
+        return 'json'
+    if path.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    return 'csv'
+
+
+def read_configs(stream, fmt):
+    """Configurations from CSV, a JSON array or JSON lines; CSV and JSON lines are read lazily"""
+    if fmt == 'json':
+        configs = json.load(stream)
+        if not isinstance(configs, list):
+            raise ValueError("A JSON input must be an array of configurations")
+        yield from configs
+    elif fmt == 'ndjson':
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+    else:
+        yield from csv.DictReader(stream)
+
+
+def write_results(results, output, fmt, options):
+    """Write results as JSON lines or CSV, flushing per batch so consumers see them as they arrive"""
+    if fmt == 'csv':
+        fields = ['index', 'id', *ROI_FIELDS, *(PROJECTION_FIELDS if options.get('years') else ()), 'error']
+        writer = csv.DictWriter(output, fieldnames=fields, extrasaction='ignore')
+        writer.writeheader()
+        for count, row in enumerate(results, 1):
+            writer.writerow(row)
+            if count % BATCH_SIZE == 0:
+                output.flush()
+    else:
+        for count, row in enumerate(results, 1):
+            output.write(json.dumps(row, ensure_ascii=False) + '\n')
+            if count % BATCH_SIZE == 0:
+                output.flush()
+    output.flush()
+
+
+def projection_options(args):
+    """Options shared by evaluate_batch from the command line"""
+    return {
+        'years': args.years,
+        'reinvest': args.reinvest,
+        'dash_drift': args.dash_drift,
+        'rent_fx_drift': args.fx_drift,
+        'npv_rate': args.npv_rate,
+        'defaults': {key: value for key, value in (('dash_usd', args.dash_usd), ('usd_rub', args.usd_rub),
+                                                   ('currency', args.currency)) if value is not None}
+    }
+
+
+class ROIRequestHandler(BaseHTTPRequestHandler):
+    """POST /roi with a JSON array or JSON lines body; streams JSON lines back.
+
+    Query parameters years, reinvest, dash_drift, fx_drift, npv_rate,
+    dash_usd, usd_rub and currency set the same options as the CLI.
+    """
+
+    executor = None
+    workers = 1
+
+    def do_POST(self):
+        path, _, query = self.path.partition('?')
+        if path.rstrip('/') != '/roi':
+            self.send_error(404)
+            return
+        if self.headers.get('Content-Length') is None:
+            self.send_error(411)
+            return
+        try:
+            length = int(self.headers['Content-Length'])
+            if length < 0:
+                raise ValueError("Invalid Content-Length")
+            if length > MAX_BODY_BYTES:
+                self.send_error(413)
+                return
+            options = self.query_options(query)
+            body = self.rfile.read(length).decode('utf-8')
+            configs = list(read_configs(io.StringIO(body), input_format(None, body)))
+        except (ValueError, UnicodeDecodeError) as e:
+            self.send_response(400)
+            self.send_header('Content-Type', 'application/json')
+            self.end_headers()
+            self.wfile.write(json.dumps({'error': str(e)}).encode())
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.close_connection = True  # the body ends with the connection
+        output = io.TextIOWrapper(self.wfile, encoding='utf-8', write_through=True)
+        write_results(evaluate_configs(configs, options, self.workers, self.executor), output, 'ndjson', options)
+        output.detach()
+
+    @staticmethod
+    def query_options(query):
+        params = {key: values[-1] for key, values in parse_qs(query).items()}
+        return {
+            'years': float(params['years']) if params.get('years') else None,
+            'reinvest': params.get('reinvest', '').lower() in ('1', 'true', 'yes'),
+            'dash_drift': float(params.get('dash_drift', 0)),
+            'rent_fx_drift': float(params.get('fx_drift', 0)),
+            'npv_rate': float(params.get('npv_rate', projection.DEFAULT_NPV_RATE)),
+            'defaults': {key: params[key] for key in ('dash_usd', 'usd_rub', 'currency') if key in params}
+        }
+
+
+def serve(host, port, workers):
+    """Run the HTTP endpoint until interrupted, sharing one process pool between requests"""
+    ROIRequestHandler.workers = workers
+    if workers > 1:
+        ROIRequestHandler.executor = ProcessPoolExecutor(max_workers=workers)
+    server = ThreadingHTTPServer((host, port), ROIRequestHandler)
+    print(f"Serving ROI evaluations on http://{host}:{port}/roi", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if ROIRequestHandler.executor is not None:
+            ROIRequestHandler.executor.shutdown(cancel_futures=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate Dash Evonode ROI for many fleet configurations")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    evaluate = commands.add_parser('evaluate', help="evaluate a CSV/JSON file of configurations")
+    evaluate.add_argument('input', nargs='?', default='-', help="input file, - for stdin (default)")
+    evaluate.add_argument('--input-format', choices=('csv', 'json', 'ndjson'),
+                          help="default: from the file extension, CSV for stdin")
+    evaluate.add_argument('-o', '--output', default='-', help="output file, - for stdout (default)")
+    evaluate.add_argument('--format', choices=('ndjson', 'csv'), default='ndjson', help="output format")
+    evaluate.add_argument('-w', '--workers', type=int, default=1, help="worker processes (default 1)")
+    evaluate.add_argument('--years', type=float, help="also project NPV, IRR and break-even over this many years")
+    evaluate.add_argument('--reinvest', action='store_true', help="reinvest payouts into new servers")
+    evaluate.add_argument('--dash-drift', type=float, default=0, help="Dash price change, %%/year")
+    evaluate.add_argument('--fx-drift', type=float, default=0, help="USD/RUB change for ₽ rent, %%/year")
+    evaluate.add_argument('--npv-rate', type=float, default=projection.DEFAULT_NPV_RATE, help="NPV discount rate, %%/year")
+    evaluate.add_argument('--dash-usd', type=float, help=f"Dash price where a row has none (default {DEFAULT_DASH_USD})")
+    evaluate.add_argument('--usd-rub', type=float, help=f"USD/RUB rate where a row has none (default {DEFAULT_USD_RUB})")
+    evaluate.add_argument('--currency', choices=('$', '₽'), help="rent currency where a row has none (default $)")
+
+    server = commands.add_parser('serve', help="serve POST /roi over HTTP")
+    server.add_argument('--host', default=DEFAULT_HOST)
+    server.add_argument('--port', type=int, default=DEFAULT_PORT)
+    server.add_argument('-w', '--workers', type=int, default=1, help="worker processes (default 1)")
+
+    args = parser.parse_args(argv)
+    if args.command == 'serve':
+        serve(args.host, args.port, args.workers)
+        return 0
+
+    options = projection_options(args)
+    source = sys.stdin if args.input == '-' else open(args.input, newline='', encoding='utf-8')
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', newline='', encoding='utf-8')
+    try:
+        fmt = args.input_format or input_format('' if args.input == '-' else args.input)
+        results = evaluate_configs(read_configs(source, fmt), options, args.workers)
+        write_results(results, output, args.format, options)
+    except (ValueError, csv.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+import numpy as np
+
+# Calendar constants
+DAYS_PER_YEAR = 365
+MONTHS_PER_YEAR = 12
+
+# ROI inputs in calculate_profit order; rents are in $/month and discount_rate in percent
+PARAMETERS = (
+    'servers_count', 'investment_per_server', 'profit1', 'days1', 'profit2', 'days2',
+    'ssl_cost', 'ssl_months', 'discount_rate', 'rent_main_usd', 'add_servers_usd', 'dash_usd'
+)
+
+# Form defaults, shared with the headless entry points
+DEFAULT_VALUES = {
+    'servers_count': 5,
+    'investment_per_server': 4000,
+    'profit1': 9,
+    'days1': 9.5,
+    'profit2': 0.89,
+    'days2': 4.5,
+    'ssl_cost': 81,
+    'ssl_months': 36,
+    'discount_rate': 10,
+    'rent_main': {'$': 50, '₽': 4350},
+    'add_servers': {'$': 45, '₽': 7655}
+}
+
+# Sensitivity defaults
+SENSITIVITY_STEPS = (-20, -10, 10, 20)  # percent change applied to one input at a time
+
+
+def rent_to_usd(rent, currency, usd_rub):
+    """Monthly rent in $ from an amount in the selected rent currency"""
+    return np.asarray(rent, dtype=float) / usd_rub if currency == '₽' else np.asarray(rent, dtype=float)
+
+
+def evaluate(servers_count, investment_per_server, profit1, days1, profit2, days2, ssl_cost, ssl_months,
+             discount_rate, rent_main_usd, add_servers_usd, dash_usd):
+    """Annual ROI figures for scalar or broadcastable array inputs.
+
+    This is the calculate_profit formula with every operation applied
+    element-wise, so a grid of scenarios costs one pass over the arrays.
+    """
+    servers_count, investment_per_server, profit1, days1, profit2, days2, ssl_cost, ssl_months, \
+        discount_rate, rent_main_usd, add_servers_usd, dash_usd = (
+            np.asarray(value, dtype=float) for value in (
+                servers_count, investment_per_server, profit1, days1, profit2, days2, ssl_cost, ssl_months,
+                discount_rate, rent_main_usd, add_servers_usd, dash_usd
+            )
+        )
+
+    total_investment = investment_per_server * servers_count
+    ssl_total = ssl_cost / ssl_months * MONTHS_PER_YEAR * servers_count
+
+    total_dash = (DAYS_PER_YEAR / days1 * profit1 + DAYS_PER_YEAR / days2 * profit2) * servers_count
+    total_usd_income = total_dash * dash_usd
+
+    rent_total_usd = (rent_main_usd * servers_count + add_servers_usd) * MONTHS_PER_YEAR * (1 - discount_rate / 100)
+    total_usd_expenses = rent_total_usd + ssl_total
+
+    initial_investment_usd = total_investment * dash_usd
+    net_profit = total_usd_income - total_usd_expenses
+    with np.errstate(divide='ignore', invalid='ignore'):
+        profit_percent = net_profit / initial_investment_usd * 100
+
+    return {
+        'total_investment': total_investment,
+        'initial_investment_usd': initial_investment_usd,
+        'total_usd_income': total_usd_income,
+        'total_usd_expenses': total_usd_expenses,
+        'net_profit': net_profit,
+        'profit_percent': profit_percent
+    }
+
+
+def sweep(base, axes):
+    """Evaluate every combination of the axis values around a base scenario.
+
+    base maps each name in PARAMETERS to a scalar; axes maps some of them
+    to 1-D value arrays. Each axis gets its own dimension in axes order, so
+    the results have shape (len(axis_1), len(axis_2), ...) and are built by
+    broadcasting rather than by materialising the parameter grid.
+    """
+    unknown = set(axes) - set(PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {', '.join(sorted(unknown))}")
+
+    params = dict(base)
+    shape = []
+    for dim, (name, values) in enumerate(axes.items()):
+        values = np.asarray(values, dtype=float).ravel()
+        params[name] = values.reshape((1,) * dim + (-1,) + (1,) * (len(axes) - dim - 1))
+        shape.append(values.size)
+
+    results = evaluate(**{name: params[name] for name in PARAMETERS})
+    # Figures that do not depend on an axis keep a smaller shape; views give them the full one
+    return {key: np.broadcast_to(value, tuple(shape)) for key, value in results.items()}
+
+
+def sensitivity(base, parameters=PARAMETERS, steps=SENSITIVITY_STEPS):
+    """ROI in percent with one input changed by each step (in percent), as a parameters x steps array.
+
+    All scenarios are evaluated together: row i scales only parameters[i].
+    """
+    factors = 1 + np.asarray(steps, dtype=float) / 100
+    rows = np.arange(len(parameters))[:, None]
+    params = {
+        name: base[name] * np.where(rows == parameters.index(name), factors, 1.0) if name in parameters else base[name]
+        for name in PARAMETERS
+    }
+    return evaluate(**params)['profit_percent']
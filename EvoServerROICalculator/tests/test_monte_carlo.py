@@ -0,0 +1,44 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import monte_carlo  # noqa: E402
+from test_roi_engine import BASE  # noqa: E402
+
+SPECS = {'dash_usd': {'kind': 'lognormal', 'spread': 30}, 'profit1': {'kind': 'normal', 'spread': 10}}
+
+
+class SimulateTest(unittest.TestCase):
+
+    def setUp(self):
+        monte_carlo._cache.clear()
+
+    def test_seeded_percentiles_are_reproducible(self):
+        first = monte_carlo.simulate(BASE, SPECS, trials=20_000, seed=7, chunk_size=3_000)
+        monte_carlo._cache.clear()
+        second = monte_carlo.simulate(BASE, SPECS, trials=20_000, seed=7, chunk_size=3_000)
+        self.assertEqual(first['percentiles'], second['percentiles'])
+        self.assertEqual(list(first['percentiles']), list(monte_carlo.PERCENTILES))
+        self.assertNotEqual(first['percentiles'], monte_carlo.simulate(BASE, SPECS, trials=20_000, seed=8)['percentiles'])
+
+    def test_fixed_inputs_give_the_point_estimate(self):
+        result = monte_carlo.simulate(BASE, {'dash_usd': {'kind': 'fixed'}}, trials=1_000)
+        self.assertAlmostEqual(result['percentiles'][5], 88)
+        self.assertAlmostEqual(result['percentiles'][95], 88)
+        self.assertEqual(result['probability_of_loss'], 0)
+
+    def test_no_valid_trials(self):
+        result = monte_carlo.simulate({**BASE, 'investment_per_server': 0}, SPECS, trials=1_000)
+        self.assertEqual(result['trials'], 0)
+        self.assertEqual(result['error'], "no valid trials")
+
+    def test_lognormal_keeps_the_base_mean(self):
+        values = monte_carlo.sample({'kind': 'lognormal', 'spread': 50}, 10.0, 400_000, np.random.default_rng(0))
+        self.assertAlmostEqual(values.mean(), 10.0, delta=0.05)
+
+
+if __name__ == "__main__":
+    unittest.main()
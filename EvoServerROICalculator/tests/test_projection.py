@@ -0,0 +1,29 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import projection  # noqa: E402
+
+
+class IRRTest(unittest.TestCase):
+
+    def test_known_rates(self):
+        flows = np.zeros((2, 13))
+        flows[0, [0, 12]] = [-100, 110]  # 10 % after a year
+        flows[1, [0, 1]] = [-100, 110]   # 10 % after a month
+        np.testing.assert_allclose(projection.irr(flows), [10, (1.1 ** 12 - 1) * 100], rtol=1e-6)
+
+    def test_no_sign_change_is_nan(self):
+        self.assertTrue(np.isnan(projection.irr(np.array([[100.0, 10.0, 10.0]]))[0]))
+
+    def test_npv_at_the_irr_is_zero(self):
+        flows = np.array([[-1000.0] + [30.0] * 47 + [1030.0]])
+        monthly = (1 + projection.irr(flows) / 100) ** (1 / 12) - 1
+        self.assertAlmostEqual(float(projection.npv(flows, monthly)[0]), 0, places=6)
+
+
+if __name__ == "__main__":
+    unittest.main()
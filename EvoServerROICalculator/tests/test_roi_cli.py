@@ -0,0 +1,66 @@
+import io
+import os
+import sys
+import csv
+import json
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import roi_cli  # noqa: E402
+import roi_engine  # noqa: E402
+from test_roi_engine import BASE  # noqa: E402
+
+
+class BatchTest(unittest.TestCase):
+
+    def test_results_in_input_order_with_row_errors(self):
+        configs = [{'id': 'a', **BASE}, {'id': 'b', 'currency': 'EUR'}, {'name': 'c', 'servers_count': 'many'}, BASE]
+        rows = list(roi_cli.evaluate_configs(configs, {}))
+        self.assertEqual([row['index'] for row in rows], [0, 1, 2, 3])
+        self.assertEqual([row.get('id') for row in rows], ['a', 'b', 'c', None])
+        self.assertAlmostEqual(rows[0]['profit_percent'], 88)
+        self.assertEqual(rows[3]['profit_percent'], rows[0]['profit_percent'])
+        self.assertIn("Unknown currency", rows[1]['error'])
+        self.assertIn('error', rows[2])
+        self.assertNotIn('profit_percent', rows[2])
+
+    def test_batches_match_a_single_evaluation(self):
+        configs = [{**BASE, 'servers_count': n} for n in range(1, 8)]
+        rows = list(roi_cli.evaluate_configs(iter(configs), {}, workers=1))
+        expected = roi_engine.evaluate(**{**BASE, 'servers_count': 7})
+        self.assertAlmostEqual(rows[-1]['net_profit'], round(float(expected['net_profit']), 6))
+
+    def test_rent_in_the_rent_currency(self):
+        params = roi_cli.config_params({'currency': 'RUB', 'usd_rub': 100, 'rent_main': 5000, 'servers_count': 3}, {})
+        self.assertEqual(params['rent_main_usd'], 50)
+        self.assertEqual(params['servers_count'], 3)
+        self.assertEqual(params['add_servers_usd'], roi_engine.DEFAULT_VALUES['add_servers']['₽'] / 100)
+
+    def test_projection_fields(self):
+        rows = list(roi_cli.evaluate_configs([BASE], {'years': 2}))
+        self.assertEqual(rows[0]['final_servers'], 1)
+        self.assertIsNotNone(rows[0]['irr'])
+
+    def test_csv_output(self):
+        output = io.StringIO()
+        roi_cli.write_results(roi_cli.evaluate_configs([BASE, {'currency': 'EUR'}], {}), output, 'csv', {})
+        rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+        self.assertEqual(float(rows[0]['profit_percent']), 88)
+        self.assertTrue(rows[1]['error'])
+
+    def test_main_reads_json_and_writes_ndjson(self):
+        directory = tempfile.mkdtemp()
+        source = os.path.join(directory, 'fleets.json')
+        target = os.path.join(directory, 'results.ndjson')
+        with open(source, 'w') as f:
+            json.dump([BASE, {'currency': 'EUR'}], f)
+        self.assertEqual(roi_cli.main(['evaluate', source, '-o', target]), 0)
+        with open(target) as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual(len(rows), 2)
+        self.assertAlmostEqual(rows[0]['profit_percent'], 88)
+        self.assertIn('error', rows[1])
+
+if __name__ == "__main__":
+    unittest.main()
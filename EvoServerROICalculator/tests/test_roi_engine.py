@@ -0,0 +1,44 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import roi_engine  # noqa: E402
+
+# One server earning 100 Dash every 36.5 days (1000 Dash a year) at 10 $/Dash on a 10 000 $ collateral,
+# with 100 $/month rent: (10 000 - 1 200) / 10 000 = 88 % a year
+BASE = {
+    'servers_count': 1, 'investment_per_server': 1000, 'profit1': 100, 'days1': 36.5, 'profit2': 0, 'days2': 1,
+    'ssl_cost': 0, 'ssl_months': 12, 'discount_rate': 0, 'rent_main_usd': 100, 'add_servers_usd': 0, 'dash_usd': 10
+}
+
+
+class EvaluateTest(unittest.TestCase):
+
+    def test_scalar_roi(self):
+        self.assertAlmostEqual(float(roi_engine.evaluate(**BASE)['profit_percent']), 88)
+
+    def test_sweep_shape_follows_axes(self):
+        results = roi_engine.sweep(BASE, {'dash_usd': [5, 10, 20], 'servers_count': [1, 2], 'discount_rate': [0, 5, 10, 15]})
+        for value in results.values():
+            self.assertEqual(value.shape, (3, 2, 4))
+        self.assertAlmostEqual(results['profit_percent'][1, 0, 0], 88)
+        self.assertAlmostEqual(results['total_investment'][2, 1, 3], 2000)
+
+    def test_sweep_rejects_unknown_parameters(self):
+        with self.assertRaises(ValueError):
+            roi_engine.sweep(BASE, {'price': [1, 2]})
+
+    def test_sensitivity_row(self):
+        table = roi_engine.sensitivity(BASE, parameters=('profit1', 'dash_usd'), steps=(-10, 10))
+        self.assertEqual(table.shape, (2, 2))
+        # 900 or 1100 Dash a year at 10 $ less 1 200 $ rent, on 10 000 $
+        np.testing.assert_allclose(table[0], [78, 98])
+        # The price moves income and collateral value together, leaving only the rent share
+        np.testing.assert_allclose(table[1], [(9000 - 1200) / 9000 * 100, (11000 - 1200) / 11000 * 100])
+
+
+if __name__ == "__main__":
+    unittest.main()
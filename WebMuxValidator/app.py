@@ -1,20 +1,24 @@
 import os
 import json
-import time
 import logging
-import requests
-import concurrent.futures
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for, flash
-from datetime import datetime
-import multiprocessing
+from flask import Flask, Response, render_template, make_response, request, jsonify, session, redirect, url_for, flash, stream_with_context
 
+from jobs import INLINE_WAIT_SECONDS, job_queue
+from poller import start_poller
+from store import JOB_DONE, JOB_FAILED
+from withdrawal_matrix import WithdrawalMatrix
+from response_format import (
+    FORMAT_COLUMNAR, requested_format, encode_response, columnar_result, compress_response,
+    table_etag, with_validators, not_modified
+)
+from async_engine import fleet_is_fresh
+from table_fragments import cached_table_fragment
+from fleets import OWNED_FLEETS_MAX, parse_validators_text, save_fleet, use_fleet, load_fleet
+from epoch_index import FIRST_EPOCH
+from payout_stats import payout_stats, PAYOUT_STATS_EPOCHS, MAX_PAYOUT_STATS_EPOCHS
 from utils import (
-    timestamp_to_epoch, 
-    load_cached_data, 
     save_cached_data, 
-    fetch_validator_identity,
-    fetch_withdrawal_data,
-    calculate_totals
+    store
 )
 
 # Configure logging
@@ -28,18 +32,16 @@ app = Flask(__name__)
 app.config['APPLICATION_ROOT'] = '/webmux'  # Добавьте эту строку!
 app.secret_key = os.environ.get("SESSION_SECRET", "dash-validator-withdrawals-secret")
 
+# Keep the fleet cache warm across epoch rollovers (one gunicorn worker polls)
+start_poller()
+app.after_request(compress_response)
+
 # Cache directory
 SAVE_DIR = os.path.join(os.path.expanduser("~"), "tmp")
 os.makedirs(SAVE_DIR, exist_ok=True)
 
-# Cache files
-VALIDATORS_FILE = os.path.join(SAVE_DIR, "validators.txt")
-IDENTITIES_FILE = os.path.join(SAVE_DIR, "identities.txt")
-IDENTITYBALANCE_FILE = os.path.join(SAVE_DIR, "identityBalance.txt")
-WITHDRAWAL_TABLE_FILE = os.path.join(SAVE_DIR, "withdrawal_table.txt")
+# Cache file
 CUR_EPOCH_FILE = os.path.join(SAVE_DIR, "cur_epoch.txt")
-CUR_EPOCH_BLOCKS_FILE = os.path.join(SAVE_DIR, "cur_epoch_blocks.txt")
-LIST_BLOCKS_FILE = os.path.join(SAVE_DIR, "listProposedBlocks.txt")
 
 # Global variables for translations
 translations = {
@@ -60,7 +62,13 @@ translations = {
         "copy_success": "Table has been copied to clipboard",
         "loading_validators": "Connecting to the Dash API and retrieving validator data...",
         "start_epoch_label": "Starting Epoch:",
-        "start_epoch_hint": "Select the epoch number to start the display from (default: 21)"
+        "start_epoch_hint": "Select the epoch number to start the display from (default: 21)",
+        "blocks": "Blocks",
+        "apy": "APY",
+        "fleet_name_label": "Fleet name (optional):",
+        "fleet_name_placeholder": "e.g. Main servers",
+        "fleet_link": "Fleet link:",
+        "fleet_not_found": "This fleet link is unknown or has expired"
     },
     "ru": {
         "title": "Мониторинг Выплат Валидаторов Dash",
@@ -79,7 +87,13 @@ translations = {
         "copy_success": "Таблица скопирована в буфер обмена",
         "loading_validators": "Соединение с API Dash и получение данных валидатора...",
         "start_epoch_label": "Начальная Эпоха:",
-        "start_epoch_hint": "Выберите номер эпохи, с которой начать отображение (по умолчанию: 21)"
+        "start_epoch_hint": "Выберите номер эпохи, с которой начать отображение (по умолчанию: 21)",
+        "blocks": "Блоки",
+        "apy": "Доходность",
+        "fleet_name_label": "Название группы (необязательно):",
+        "fleet_name_placeholder": "например, Основные серверы",
+        "fleet_link": "Ссылка на группу:",
+        "fleet_not_found": "Ссылка на группу неизвестна или устарела"
     }
 }
 
@@ -90,14 +104,18 @@ def index():
         lang = 'en'
     
     # Get current epoch for the max value in the epoch input field
+    # (last known value, kept fresh by the poller; no upstream call on page views)
     try:
-        from utils import get_current_epoch
-        current_epoch = get_current_epoch()
+        from utils import get_known_epoch
+        current_epoch = get_known_epoch()
     except Exception as e:
         logger.error(f"Error getting current epoch: {e}")
         current_epoch = 24  # Fallback value
     
-    return render_template('index.html', lang=lang, translations=translations[lang], current_epoch=current_epoch)
+    response = make_response(render_template('index.html', lang=lang, translations=translations[lang], current_epoch=current_epoch))
+    response.add_etag()
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 @app.route('/process_validators', methods=['POST'])
 def process_validators():
@@ -110,7 +128,6 @@ def process_validators():
             lang = 'en'
             
         validators_text = request.form.get('validators', '')
-        logger.debug(f"Received validators text: {validators_text}")
         
         # Get the starting epoch (default to 21 if not specified)
         start_epoch = request.form.get('start_epoch', '21')
@@ -123,34 +140,122 @@ def process_validators():
             
         logger.debug(f"Starting epoch set to: {start_epoch}")
         
-        # Split by newline and filter out empty lines
-        validators = [v.strip() for v in validators_text.split('\n') if v.strip()]
-        logger.debug(f"Parsed validators: {validators}")
+        # Split by newline and filter out empty lines and repeats
+        validators = parse_validators_text(validators_text)
+        logger.debug(f"Parsed {len(validators)} validators")
         
         if not validators:
             logger.warning("No validators provided")
             flash(translations[lang]["empty_validators"], "danger")
             return redirect(url_for('index', lang=lang))
         
-        # Convert validators list to JSON string to ensure correct format
-        import json
-        validators_json = json.dumps(validators)
-        logger.debug(f"Validators JSON: {validators_json}")
-        
-        # Instead of redirecting, render the results template directly
-        return render_template('results.html', 
-                               lang=lang, 
-                               translations=translations[lang], 
-                               validators=validators,
-                               validators_json=validators_json,
-                               validators_text=validators_text,
-                               start_epoch=start_epoch)
+        # Store the list as a fleet and show it at its own URL, so reloading
+        # does not resubmit the form and the link can be shared; only the
+        # session that created a fleet may rename it
+        owned_fleets = session.get('owned_fleets', [])
+        fleet_id, created = save_fleet(validators, request.form.get('fleet_name'), start_epoch, owned_fleets)
+        if created:
+            session['owned_fleets'] = (owned_fleets + [fleet_id])[-OWNED_FLEETS_MAX:]
+        return redirect(url_for('view_fleet', fleet_id=fleet_id, lang=lang, start_epoch=start_epoch), code=303)
     except Exception as e:
         logger.exception(f"Error in process_validators: {e}")
         flash(f"An error occurred: {str(e)}", "danger")
         return redirect(url_for('index', lang=lang))
 
-# Removed results route as we're rendering the results page directly
+@app.route('/fleet/<fleet_id>')
+def view_fleet(fleet_id):
+    """Results page of a saved fleet"""
+    lang = request.args.get('lang', 'en')
+    if lang not in translations:
+        lang = 'en'
+    
+    fleet = load_fleet(fleet_id)
+    if fleet is None:
+        flash(translations[lang]["fleet_not_found"], "danger")
+        return redirect(url_for('index', lang=lang))
+    
+    # Starting epoch from the URL, else the one the fleet was saved with
+    try:
+        start_epoch = int(request.args.get('start_epoch') or fleet["start_epoch"] or 21)
+        if start_epoch < 1:
+            start_epoch = 21
+    except ValueError:
+        start_epoch = 21
+    
+    validators = fleet["validators"]
+    
+    # Repeat views of an unchanged fleet get the table pre-rendered
+    table_html = None
+    try:
+        table_html = cached_table_fragment(validators, max(FIRST_EPOCH, start_epoch), lang, translations[lang])
+    except Exception as e:
+        logger.error(f"Error rendering cached table: {e}")
+    
+    return render_template('results.html', 
+                           lang=lang, 
+                           translations=translations[lang], 
+                           validators=validators,
+                           validators_json=json.dumps(validators),
+                           validators_text='\n'.join(validators),
+                           start_epoch=start_epoch,
+                           table_html=table_html,
+                           fleet=fleet,
+                           fleet_url=url_for('view_fleet', fleet_id=fleet_id, lang=lang, _external=True))
+
+def parse_withdrawals_request():
+    """Get (validators, lang, start_epoch) from a withdrawals API request"""
+    # Get data from POST request with better error handling
+    try:
+        data = request.get_json() or {}
+    except Exception as e:
+        logger.error(f"Error parsing JSON from request: {e}")
+        data = {}
+        
+    validators = data.get('validators', [])
+    fleet = store.get_fleet(data['fleet_id']) if data.get('fleet_id') else None
+    if fleet is not None:
+        # A saved fleet's list is authoritative
+        validators = fleet["validators"]
+    lang = data.get('lang', 'en')
+    if lang not in translations:
+        lang = 'en'
+    start_epoch = data.get('start_epoch', 21)
+    
+    # Ensure start_epoch is an integer
+    try:
+        start_epoch = int(start_epoch)
+        if start_epoch < 1:
+            start_epoch = 21
+    except:
+        start_epoch = 21
+        
+    logger.debug(f"API: Using start_epoch={start_epoch}")
+    
+    if not validators:
+        # Try to get from form data if not in JSON
+        validators_text = request.form.get('validators', '')
+        if validators_text:
+            validators = parse_validators_text(validators_text)
+        else:
+            validators = []
+    
+    logger.debug(f"API: Received {len(validators)} validators, lang={lang}")
+    return validators, lang, start_epoch
+
+def fleet_result(fleet):
+    """Job result with the stored columnar withdrawals expanded to {validator: {epoch: amount}}"""
+    if "columns" not in fleet["withdrawals"]:
+        return fleet  # stored before results were columnar
+    return {**fleet, "withdrawals": WithdrawalMatrix.from_columnar(fleet["withdrawals"]).to_rows()}
+
+def api_error_message(api_errors, lang):
+    """Build the user-facing message for API connection errors"""
+    error_msg = "Не удалось подключиться к серверу Dash Platform API. " if lang == 'ru' else "Could not connect to Dash Platform API server. "
+    if "connection" in api_errors:
+        error_msg += "Пожалуйста, проверьте подключение к интернету и попробуйте позже." if lang == 'ru' else "Please check your internet connection and try again later."
+    elif "timeout" in api_errors:
+        error_msg += "Превышено время ожидания. Пожалуйста, попробуйте позже." if lang == 'ru' else "Request timed out. Please try again later."
+    return error_msg
 
 # добавил webmux:
 @app.route('/api/fetch_withdrawals', methods=['POST'])  # Измените путь!
@@ -158,202 +263,219 @@ def api_fetch_withdrawals():
     logger.debug("API fetch_withdrawals called")
     
     try:
-        # Get data from POST request with better error handling
-        try:
-            data = request.get_json() or {}
-        except Exception as e:
-            logger.error(f"Error parsing JSON from request: {e}")
-            data = {}
-            
-        validators = data.get('validators', [])
-        lang = data.get('lang', 'en')
-        start_epoch = data.get('start_epoch', 21)
-        
-        # Ensure start_epoch is an integer
-        try:
-            start_epoch = int(start_epoch)
-            if start_epoch < 1:
-                start_epoch = 21
-        except:
-            start_epoch = 21
-            
-        logger.debug(f"API: Using start_epoch={start_epoch}")
-        
-        if not validators:
-            # Try to get from form data if not in JSON
-            validators_text = request.form.get('validators', '')
-            if validators_text:
-                validators = [v.strip() for v in validators_text.split('\n') if v.strip()]
-            else:
-                validators = []
-        
-        logger.debug(f"API: Received {len(validators)} validators, lang={lang}")
+        validators, lang, start_epoch = parse_withdrawals_request()
         
         if not validators:
             logger.warning("API: No validators provided")
             return jsonify({"error": translations[lang]["empty_validators"]}), 400
         
-        # Save validators list to file for caching
-        save_cached_data(VALIDATORS_FILE, validators)
-        logger.debug(f"Saved validators to {VALIDATORS_FILE}")
+        # An existing fleet for this list stays pre-warmed while in use
+        use_fleet(validators)
         
-        # Get validator identities and IPs
-        identities = {}
-        validator_ips = {}
-        logger.debug(f"Fetching identities for {len(validators)} validators")
-        for validator in validators:
-            # Get validator identity
-            identity = fetch_validator_identity(validator)
-            if identity:
-                identities[validator] = identity
-                logger.debug(f"Got identity for {validator}: {identity}")
-            else:
-                logger.warning(f"No identity found for validator {validator}")
-                
-            # Check for cached IP address
-            ip_cache_file = os.path.join(SAVE_DIR, f"validator_ip_{validator}.txt")
-            try:
-                if os.path.exists(ip_cache_file):
-                    with open(ip_cache_file, 'r') as f:
-                        server_ip = f.read().strip()
-                        if server_ip:
-                            validator_ips[validator] = server_ip
-                            logger.debug(f"Using cached IP for {validator}: {server_ip}")
-            except Exception as e:
-                logger.error(f"Error reading validator IP from cache: {e}")
+        # Use the provided start_epoch instead of the default calculation
+        # But ensure it's not before FIRST_EPOCH (the earliest with data)
+        start_epoch = max(FIRST_EPOCH, start_epoch)
+        response_format = requested_format()
         
-        # Save identities to cache
-        if identities:
-            save_cached_data(IDENTITIES_FILE, identities)
-            logger.debug(f"Saved {len(identities)} identities to {IDENTITIES_FILE}")
-            
-        # Save IPs to cache
-        if validator_ips:
-            save_cached_data(os.path.join(SAVE_DIR, "validator_ips.json"), validator_ips)
-            logger.debug(f"Saved {len(validator_ips)} validator IPs")
-            
-        # Get current epoch
-        current_epoch = None
-        try:
-            logger.debug("Fetching current epoch from API")
-            response = requests.get("https://platform-explorer.pshenmic.dev/status")
-            data = response.json()
-            current_epoch = data.get('epoch', {}).get('number', 6)
-            logger.debug(f"Current epoch is {current_epoch}")
-        except Exception as e:
-            logger.error(f"Error fetching current epoch: {e}")
-            current_epoch = 6  # Default to start from epoch 6
-            logger.debug(f"Using default epoch: {current_epoch}")
+        # Nothing to sync and the client's copy matches the stored data: skip the job
+        if request.if_none_match and fleet_is_fresh(validators):
+            from utils import get_current_epoch
+            etag, last_modified = table_etag(validators, start_epoch, get_current_epoch(), response_format)
+            if request.if_none_match.contains_weak(etag):
+                logger.debug(f"Withdrawals table unchanged for {len(validators)} validators")
+                return not_modified(etag, last_modified)
+        
+        # Fetch identities, withdrawals and epoch boundaries as a background job
+        # (repeated clicks join the job already in flight)
+        logger.debug(f"Fetching fleet withdrawals for {len(validators)} validators from epoch {start_epoch}")
+        job_id, _ = job_queue.submit(validators, start_epoch)
+        job = job_queue.wait(job_id, timeout=INLINE_WAIT_SECONDS)
+        if job is None or job["status"] == JOB_FAILED:
+            return jsonify({"error": translations[lang]["error_fetching"], "job_id": job_id}), 500
+        if job["status"] != JOB_DONE:
+            # Still running: the client can poll the job instead of holding the request open
+            return jsonify({"job_id": job_id, "status": job["status"]}), 202
+        if not job["result"]["api_errors"]:
+            etag, last_modified = table_etag(validators, start_epoch, job["result"]["current_epoch"], response_format)
+            if request.if_none_match.contains_weak(etag):
+                return not_modified(etag, last_modified)
+        if response_format == FORMAT_COLUMNAR and not job["result"]["api_errors"]:
+            # Opt-in compact encoding (decoded by script.js)
+            save_cached_data(CUR_EPOCH_FILE, job["result"]["current_epoch"] or FIRST_EPOCH)
+            return with_validators(encode_response(columnar_result(job["result"])), etag, last_modified)
+        fleet = fleet_result(job["result"])
+        identities = fleet["identities"]
+        validator_ips = fleet["validator_ips"]
+        withdrawals_data = fleet["withdrawals"]
+        api_connection_errors = fleet["api_errors"]
+        current_epoch = fleet["current_epoch"] or FIRST_EPOCH
         
         # Save current epoch to cache
         save_cached_data(CUR_EPOCH_FILE, current_epoch)
         logger.debug(f"Saved current epoch {current_epoch} to {CUR_EPOCH_FILE}")
         
-        # Fetch withdrawal data for the specified epochs
-        withdrawals_data = {}
-        
-        # Use the provided start_epoch instead of the default calculation
-        # But ensure it's not before epoch 6 (the earliest with data)
-        start_epoch = max(6, start_epoch)
-        
-        # Using ThreadPoolExecutor with very limited parallelism
-        logger.debug(f"Starting fetch for withdrawal data from epoch {start_epoch} to {current_epoch}")
-        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-            futures = []
-            for validator in validators:
-                for epoch in range(start_epoch, current_epoch + 1):
-                    # Check if we already have this data in cache
-                    cache_file = os.path.join(SAVE_DIR, f"withdrawal_{validator}_{epoch}.json")
-                    cached_data = load_cached_data(cache_file)
-                    
-                    if cached_data:
-                        logger.debug(f"Using cached data for {validator} at epoch {epoch}")
-                        if cached_data[0] == validator and cached_data[1] == epoch:
-                            if validator not in withdrawals_data:
-                                withdrawals_data[validator] = {}
-                            withdrawals_data[validator][epoch] = cached_data[2]
-                    else:
-                        futures.append(
-                            executor.submit(
-                                fetch_withdrawal_data, 
-                                validator, 
-                                epoch
-                            )
-                        )
-                        # Longer delay between tasks to avoid API rate limiting
-                        time.sleep(0.5)
-            
-            logger.debug(f"Created {len(futures)} fetch tasks")
-            
-            # Variables to track API connection errors
-            api_connection_errors = []
+        # Check if we encountered API connection errors
+        if api_connection_errors:
+            logger.warning(f"API connection issues detected: {api_connection_errors}")
             
-            for future in concurrent.futures.as_completed(futures):
-                result = future.result()
-                if result:
-                    validator, epoch, amount = result
-                    
-                    # Check for special error markers
-                    if isinstance(amount, str) and amount.startswith("API_"):
-                        if amount == "API_CONNECTION_ERROR" and "connection" not in api_connection_errors:
-                            api_connection_errors.append("connection")
-                        elif amount == "API_TIMEOUT_ERROR" and "timeout" not in api_connection_errors:
-                            api_connection_errors.append("timeout")
-                        continue
-                    
-                    if validator not in withdrawals_data:
-                        withdrawals_data[validator] = {}
-                    withdrawals_data[validator][epoch] = amount
-                    logger.debug(f"Got withdrawal for {validator} at epoch {epoch}: {amount}")
-            
-            # Check if we encountered API connection errors
-            if api_connection_errors:
-                error_msg = "Не удалось подключиться к серверу Dash Platform API. " if lang == 'ru' else "Could not connect to Dash Platform API server. "
-                if "connection" in api_connection_errors:
-                    error_msg += "Пожалуйста, проверьте подключение к интернету и попробуйте позже." if lang == 'ru' else "Please check your internet connection and try again later."
-                elif "timeout" in api_connection_errors:
-                    error_msg += "Превышено время ожидания. Пожалуйста, попробуйте позже." if lang == 'ru' else "Request timed out. Please try again later."
-                
-                logger.warning(f"API connection issues detected: {api_connection_errors}")
-                
-                # Continue with empty data but include error message
-                result = {
-                    "withdrawals": {},
-                    "identities": {},
-                    "validator_totals": {},
-                    "grand_total": 0,
-                    "epoch_range": [6],
-                    "current_epoch": 6,
-                    "api_error": error_msg
-                }
-                return jsonify(result)
-        
-        # Calculate totals but only show the epochs we actually fetched data for
-        logger.debug("Calculating totals")
-        validator_totals, grand_total, epoch_range = calculate_totals(
-            withdrawals_data, 
-            validators, 
-            current_epoch,
-            start_epoch
-        )
+            # Continue with empty data but include error message
+            result = {
+                "withdrawals": {},
+                "identities": {},
+                "validator_totals": {},
+                "grand_total": 0,
+                "epoch_range": [FIRST_EPOCH],
+                "current_epoch": FIRST_EPOCH,
+                "api_error": api_error_message(api_connection_errors, lang)
+            }
+            return jsonify(result)
         
-        # Format the data for the frontend
+        # Format the data for the frontend (the job has calculated the totals)
         result = {
             "withdrawals": withdrawals_data,
             "identities": identities,
-            "validator_totals": validator_totals,
-            "grand_total": grand_total,
-            "epoch_range": epoch_range,
+            "validator_totals": fleet["validator_totals"],
+            "grand_total": fleet["grand_total"],
+            "epoch_range": fleet["epoch_range"],
             "current_epoch": current_epoch,
-            "validator_ips": validator_ips  # Add the validator IPs to the response
+            "validator_ips": validator_ips,  # Add the validator IPs to the response
+            "blocks": fleet["blocks"],  # Blocks proposed in the current epoch
+            "yields": fleet["yields"],  # APY per validator and fleet, per-epoch yield
+            "cell_stats": fleet["cell_stats"]  # Cells served fetched / cached / known-empty / unknown
         }
         
         logger.debug(f"API response ready with data for {len(withdrawals_data)} validators")
-        return jsonify(result)
+        return with_validators(encode_response(result), etag, last_modified)
         
     except Exception as e:
         logger.exception(f"Error processing withdrawals: {e}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/fetch_withdrawals/stream', methods=['POST'])
+def api_fetch_withdrawals_stream():
+    """Stream the withdrawals table as NDJSON, one row per validator as it resolves"""
+    logger.debug("API fetch_withdrawals/stream called")
+    validators, lang, start_epoch = parse_withdrawals_request()
+    if not validators:
+        logger.warning("API: No validators provided")
+        return jsonify({"error": translations[lang]["empty_validators"]}), 400
+
+    use_fleet(validators)
+    start_epoch = max(FIRST_EPOCH, start_epoch)
+
+    job_id, _ = job_queue.submit(validators, start_epoch)
+
+    def generate():
+        try:
+            for kind, payload in job_queue.follow(job_id):
+                if kind == "start":
+                    current_epoch = payload["current_epoch"]
+                    save_cached_data(CUR_EPOCH_FILE, current_epoch)
+                    message = {
+                        "type": "start",
+                        "job_id": job_id,
+                        "current_epoch": current_epoch,
+                        "epoch_range": list(range(start_epoch, current_epoch + 1)),
+                        "validators": validators
+                    }
+                elif kind == "row":
+                    message = {"type": "row", **payload}
+                elif payload["status"] == JOB_FAILED:
+                    message = {"type": "error", "error": translations[lang]["error_fetching"]}
+                else:
+                    fleet = payload["result"]
+                    message = {
+                        "type": "done",
+                        "validator_totals": fleet["validator_totals"],
+                        "grand_total": fleet["grand_total"],
+                        "epoch_range": fleet["epoch_range"],
+                        "yields": fleet["yields"],
+                        "cell_stats": fleet["cell_stats"]
+                    }
+                    if fleet["api_errors"]:
+                        logger.warning(f"API connection issues detected: {fleet['api_errors']}")
+                        message["api_error"] = api_error_message(fleet["api_errors"], lang)
+                    else:
+                        # Lets the client revalidate this table later with If-None-Match
+                        message["etag"] = table_etag(validators, start_epoch, fleet["current_epoch"], FORMAT_COLUMNAR)[0]
+                yield json.dumps(message) + "\n"
+        except Exception as e:
+            logger.exception(f"Error streaming withdrawals: {e}")
+            yield json.dumps({"type": "error", "error": str(e)}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.route('/api/jobs', methods=['POST'])
+def api_submit_job():
+    """Submit a withdrawals table job (or join an identical one in flight)"""
+    validators, lang, start_epoch = parse_withdrawals_request()
+    if not validators:
+        return jsonify({"error": translations[lang]["empty_validators"]}), 400
+
+    use_fleet(validators)
+    job_id, created = job_queue.submit(validators, max(FIRST_EPOCH, start_epoch))
+    job = job_queue.get(job_id)
+    return jsonify({"job_id": job_id, "status": job["status"], "deduplicated": not created}), 202
+
+@app.route('/api/jobs/<job_id>')
+def api_job_status(job_id):
+    """Poll a job: progress, rows finished after ?since=<seq>, and the result once done"""
+    lang = request.args.get('lang', 'en')
+    if lang not in translations:
+        lang = 'en'
+    try:
+        since = int(request.args.get('since', 0))
+    except ValueError:
+        since = 0
+
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+
+    rows = job_queue.rows(job_id, since)
+    result = {
+        "job_id": job_id,
+        "status": job["status"],
+        "total": len(job["validators"]),
+        "completed": job["completed"],
+        "current_epoch": job["current_epoch"],
+        "rows": [row for _, row in rows],
+        "next": rows[-1][0] if rows else since
+    }
+    if job["status"] == JOB_DONE:
+        if requested_format() == FORMAT_COLUMNAR:
+            result["result"] = columnar_result(job["result"])
+        else:
+            result["result"] = fleet_result(job["result"])
+        if job["result"]["api_errors"]:
+            result["api_error"] = api_error_message(job["result"]["api_errors"], lang)
+    elif job["status"] == JOB_FAILED:
+        result["error"] = translations[lang]["error_fetching"]
+    return encode_response(result)
+
+@app.route('/api/payout_stats', methods=['GET', 'POST'])
+def api_payout_stats():
+    """Average Platform payout per epoch and epoch length for a validator set, a fleet or the whole network"""
+    data = (request.get_json(silent=True) or {}) if request.method == 'POST' else request.args
+    validators = data.get('validators') or None
+    if isinstance(validators, str):
+        validators = parse_validators_text(validators.replace(',', '\n'))
+    if data.get('fleet_id'):
+        fleet = store.get_fleet(data['fleet_id'])
+        if fleet is None:
+            return jsonify({"error": translations['en']["fleet_not_found"]}), 404
+        validators = fleet["validators"]
+    try:
+        epochs = min(max(int(data.get('epochs', PAYOUT_STATS_EPOCHS)), 1), MAX_PAYOUT_STATS_EPOCHS)
+    except (TypeError, ValueError):
+        epochs = PAYOUT_STATS_EPOCHS
+
+    try:
+        return jsonify(payout_stats(validators, epochs))
+    except Exception as e:
+        logger.exception(f"Error computing payout stats: {e}")
+        return jsonify({"error": translations['en']["error_fetching"]}), 500
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5000, debug=True)
@@ -0,0 +1,78 @@
+import time
+import numpy as np
+
+# Units (platform credits, core duffs and the table's amount unit per DASH)
+CREDITS_PER_DASH = 10 ** 11
+DUFFS_PER_DASH = 10 ** 8
+TABLE_UNITS_PER_DASH = 1000
+
+# Evonode collateral used when the explorer does not report one
+EVONODE_COLLATERAL_DASH = 4000
+
+SECONDS_PER_YEAR = 31536000
+
+
+def build_inputs(matrix, validators, records, lifetime_totals):
+    """Build the yield arrays for a validator list from a WithdrawalMatrix.
+
+    Returns (withdrawals, collateral, earned, registered_times): a
+    validators x epochs matrix and per-validator vectors, all in DASH
+    except registration times (unix seconds, 0 when unknown).
+    """
+    withdrawals = matrix.reindex(validators).values / TABLE_UNITS_PER_DASH
+
+    def column(field):
+        return np.array(
+            [(records.get(validator) or {}).get(field) or 0 for validator in validators], dtype=float
+        )
+
+    collateral = column("collateral") / DUFFS_PER_DASH
+    collateral[collateral <= 0] = EVONODE_COLLATERAL_DASH
+    # Lifetime earnings are everything withdrawn plus what is still on the identity
+    lifetime = np.array([lifetime_totals.get(validator) or 0 for validator in validators], dtype=float)
+    earned = (lifetime + column("identity_balance")) / CREDITS_PER_DASH
+    return withdrawals, collateral, earned, column("registered_time")
+
+
+def compute_yields(withdrawals, collateral, earned, registered_times, now=None):
+    """Vectorized APY and per-epoch yield.
+
+    APY per validator is lifetime earnings over collateral per year since
+    registration. The fleet APY averages the positive per-validator values
+    (as the bash table does); the weighted APY divides total earnings by
+    total collateral-years. Epoch yield is the fleet's withdrawals in an
+    epoch as a percentage of its collateral, with a running average.
+    """
+    now = time.time() if now is None else now
+    years = (now - registered_times) / SECONDS_PER_YEAR
+    valid = (registered_times > 0) & (years > 0)
+
+    apy = np.full(len(earned), np.nan)
+    apy[valid] = earned[valid] / collateral[valid] / years[valid] * 100
+    positive = valid & (apy > 0)
+
+    collateral_years = (collateral * np.where(valid, years, 0)).sum()
+    epoch_yield = withdrawals.sum(axis=0) / collateral.sum() * 100 if len(collateral) else withdrawals.sum(axis=0)
+    running_average = np.cumsum(epoch_yield) / np.arange(1, len(epoch_yield) + 1)
+
+    return {
+        "apy": apy,
+        "fleet_apy": apy[positive].mean() if positive.any() else np.nan,
+        "fleet_apy_weighted": earned[valid].sum() / collateral_years * 100 if collateral_years else np.nan,
+        "epoch_yield": epoch_yield,
+        "running_average": running_average
+    }
+
+
+def yields_to_json(validators, epoch_range, yields):
+    """Convert compute_yields() arrays to a JSON-ready dict (NaN becomes None)"""
+    def number(value):
+        return None if np.isnan(value) else round(float(value), 4)
+
+    return {
+        "apy": {validator: number(value) for validator, value in zip(validators, yields["apy"])},
+        "fleet_apy": number(yields["fleet_apy"]),
+        "fleet_apy_weighted": number(yields["fleet_apy_weighted"]),
+        "epoch_yield": {epoch: number(value) for epoch, value in zip(epoch_range, yields["epoch_yield"])},
+        "running_average": {epoch: number(value) for epoch, value in zip(epoch_range, yields["running_average"])}
+    }
@@ -0,0 +1,392 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+import httpx
+
+from http_client import (
+    PLATFORM_API_BASE,
+    PLATFORM_API_MAX_CONNECTIONS,
+    RETRY_STATUSES,
+    platform_client
+)
+from cache import MISSING
+from singleflight import AsyncSingleFlight
+from validator_registry import REGISTRY_TTL
+from utils import cache, store, registry, epoch_index, block_index, withdrawal_store, parse_validator_info
+
+logger = logging.getLogger(__name__)
+
+# Engine limits
+MAX_CONCURRENCY = int(os.environ.get("PLATFORM_API_CONCURRENCY", "8"))
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 0.5
+REQUEST_TIMEOUT = httpx.Timeout(15, connect=5)
+FETCH_TIMEOUT = 600  # seconds a Flask worker waits for a whole fleet
+WITHDRAWALS_FRESH_SECONDS = int(os.environ.get("WITHDRAWALS_FRESH_SECONDS", "60"))  # skip re-syncing within this window
+
+
+class AsyncPlatformClient:
+    """Async platform explorer client with bounded concurrency.
+
+    Requests draw from the same token bucket as the synchronous client, so
+    the global rate limit holds across both.
+    """
+
+    def __init__(self, base_url=PLATFORM_API_BASE, max_concurrency=MAX_CONCURRENCY,
+                 max_connections=PLATFORM_API_MAX_CONNECTIONS, rate_limiter=platform_client.rate_limiter):
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=REQUEST_TIMEOUT,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        )
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.rate_limiter = rate_limiter
+        self.flight = AsyncSingleFlight()
+
+    async def get_json(self, path, params=None):
+        """GET a path and decode the JSON body; identical concurrent GETs share one request"""
+        key = (path, tuple(sorted(params.items())) if params else ())
+        return await self.flight.do(key, self._get_json, path, params)
+
+    async def _get_json(self, path, params=None):
+        """GET a path and decode the JSON body, retrying 429/5xx with backoff"""
+        for attempt in range(MAX_RETRIES + 1):
+            delay = BACKOFF_SECONDS * 2 ** attempt
+            async with self.semaphore:
+                await asyncio.sleep(self.rate_limiter.reserve())
+                try:
+                    response = await self.client.get(path, params=params)
+                except httpx.TransportError:
+                    if attempt == MAX_RETRIES:
+                        raise
+                    response = None
+            if response is not None:
+                if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                    response.raise_for_status()
+                    return response.json()
+                retry_after = response.headers.get('Retry-After', '')
+                if retry_after.isdigit():
+                    delay = int(retry_after)
+            logger.debug(f"Retrying {path} in {delay}s (attempt {attempt + 1})")
+            await asyncio.sleep(delay)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+class AsyncRunner:
+    """Background event loop that synchronous Flask code submits coroutines to.
+
+    Keeping one loop per process lets the async client's connection pool
+    outlive individual requests.
+    """
+
+    def __init__(self):
+        self.loop = None
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self.lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                self.thread = threading.Thread(target=self.loop.run_forever, name="webmux-async", daemon=True)
+                self.thread.start()
+
+    def submit(self, coro):
+        """Schedule a coroutine on the background loop and return its future"""
+        self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        """Run a coroutine on the background loop and wait for its result"""
+        return self.submit(coro).result(timeout)
+
+
+runner = AsyncRunner()
+flight = AsyncSingleFlight()
+_client = None
+
+
+def get_async_client():
+    """Get the shared async client (must be called on the runner loop)"""
+    global _client
+    if _client is None:
+        _client = AsyncPlatformClient()
+    return _client
+
+
+def classify_error(error):
+    """Map a fetch exception to the API error kind shown to the user"""
+    if isinstance(error, httpx.TimeoutException):
+        return "timeout"
+    if isinstance(error, httpx.TransportError):
+        return "connection"
+    return None
+
+
+async def fetch_epoch_timestamps(client, epoch_number):
+    """Get start and end timestamps and the first block height for a given epoch"""
+    try:
+        data = await client.get_json(f"/epoch/{epoch_number}")
+        epoch_data = data.get('epoch') or {}
+        start_time = epoch_data.get('startTime')
+        end_time = epoch_data.get('endTime')
+        if not start_time or not end_time:
+            return None
+        return (start_time, end_time, epoch_data.get('firstBlockHeight'))
+    except Exception as e:
+        logger.error(f"Error fetching epoch timestamps for epoch {epoch_number}: {e}")
+        return None
+
+
+async def refresh_epoch_index(client, current_epoch):
+    """Fetch all newly closed epochs concurrently into the epoch index"""
+    missing = epoch_index.missing_epochs(current_epoch)
+    fetched = await asyncio.gather(*(fetch_epoch_timestamps(client, epoch) for epoch in missing))
+    await asyncio.to_thread(epoch_index.extend, current_epoch, list(zip(missing, fetched)))
+
+    # The open epoch's first block bounds the proposed-block count
+    if epoch_index.open_first_height is None:
+        first_height = await asyncio.to_thread(cache.get, "epoch_first_block", current_epoch)
+        if first_height is MISSING:
+            epoch_data = await fetch_epoch_timestamps(client, current_epoch)
+            first_height = epoch_data[2] if epoch_data else None
+            if first_height:
+                await asyncio.to_thread(cache.set, "epoch_first_block", current_epoch, first_height)
+        await asyncio.to_thread(epoch_index.set_first_block_heights, [(current_epoch, first_height)])
+
+
+async def sync_validator_blocks(client, validator):
+    """Sync a validator's proposed blocks; returns False on error"""
+    try:
+        await block_index.sync(client, validator)
+        return True
+    except Exception as e:
+        logger.error(f"Error fetching proposed blocks for validator {validator}: {e}")
+        return False
+
+
+async def sync_identity_withdrawals(client, identity):
+    """Sync an identity's withdrawal history into the local store (once at a time per identity)"""
+    return await flight.do(("sync", identity), _sync_identity_withdrawals, client, identity)
+
+
+async def _sync_identity_withdrawals(client, identity):
+    sync = await asyncio.to_thread(withdrawal_store.begin_sync, identity)
+    while sync.add_page(await client.get_json(f"/identity/{identity}/withdrawals", params=sync.params())):
+        pass
+    return await asyncio.to_thread(sync.commit)
+
+
+async def fetch_validator_history(client, validator, record=None):
+    """Fetch a validator's identity, server IP and withdrawal history.
+
+    record is the validator's registry entry; validators missing from the
+    registry are looked up one by one. source is "fetched" when the history
+    was synced now, "cached" when it is served from the store, and None when
+    nothing is known.
+    """
+    result = {"validator": validator, "identity": None, "server_ip": None, "source": None, "error": None}
+    try:
+        info = record if record and record["identity"] else await asyncio.to_thread(cache.get, "validator", validator)
+        if info is MISSING:
+            info = parse_validator_info(await client.get_json(f"/validator/{validator}"))
+            if info["identity"]:
+                await asyncio.to_thread(cache.set, "validator", validator, info)
+                await asyncio.to_thread(store.upsert_validator, validator, info["identity"], info["server_ip"])
+        result["identity"] = info["identity"]
+        result["server_ip"] = info["server_ip"]
+        if not result["identity"]:
+            logger.warning(f"No identity found for validator {validator}")
+            return result
+        sync_times = await asyncio.to_thread(store.get_sync_times, [result["identity"]])
+        synced_at = sync_times.get(result["identity"])
+        if synced_at is not None and time.time() * 1000 - synced_at < WITHDRAWALS_FRESH_SECONDS * 1000:
+            result["source"] = "cached"
+            return result
+        await sync_identity_withdrawals(client, result["identity"])
+        result["source"] = "fetched"
+    except Exception as e:
+        logger.error(f"Error fetching history for validator {validator}: {e}")
+        result["error"] = classify_error(e)
+        # Cells already known from an earlier sync can still be served
+        if result["identity"] and await asyncio.to_thread(store.get_sync_times, [result["identity"]]):
+            result["source"] = "cached"
+    return result
+
+
+def count_cells(histories, matrix, start_epoch, current_epoch):
+    """Count matrix cells by where they were served from.
+
+    A cell not fetched now is known when its identity was synced after the
+    epoch closed (or within the freshness window), or when the legacy cell
+    cache had it; known cells without withdrawals are known-empty rather
+    than unknown, so they are never refetched.
+    """
+    counts = {"fetched": 0, "cached": 0, "known_empty": 0, "unknown": 0}
+    validators = [history["validator"] for history in histories]
+    identities = [history["identity"] for history in histories if history["identity"]]
+    sync_times = store.get_sync_times(identities) if identities else {}
+    legacy = store.legacy_cells(validators, start_epoch, current_epoch) if validators else set()
+    fresh_after = time.time() * 1000 - WITHDRAWALS_FRESH_SECONDS * 1000
+
+    for history in histories:
+        validator = history["validator"]
+        cells = matrix.get(validator, {})
+        synced_at = sync_times.get(history["identity"])
+        for epoch in range(start_epoch, current_epoch + 1):
+            if history["source"] == "fetched":
+                counts["fetched"] += 1
+                continue
+            known = (validator, epoch) in legacy
+            if synced_at is not None and history["source"] == "cached":
+                end_time = epoch_index.end_time(epoch)
+                known = known or synced_at >= fresh_after or (end_time is not None and synced_at > end_time)
+            if not known:
+                counts["unknown"] += 1
+            elif cells.get(epoch):
+                counts["cached"] += 1
+            else:
+                counts["known_empty"] += 1
+    return counts
+
+
+async def fetch_current_epoch(client):
+    """Get the current epoch from the status cache or /status; raises ValueError if /status has none"""
+    current_epoch = await asyncio.to_thread(cache.get, "status", "current_epoch")
+    if current_epoch is MISSING:
+        status = await client.get_json("/status")
+        current_epoch = (status.get('epoch') or {}).get('number')
+        if not current_epoch:
+            raise ValueError("/status did not report the current epoch")
+        await asyncio.to_thread(cache.set, "status", "current_epoch", current_epoch)
+    return current_epoch
+
+
+def fleet_is_fresh(validators):
+    """Whether a table for these validators would be built from local data alone right now"""
+    if cache.get("status", "current_epoch") is MISSING:
+        return False
+    if time.time() - registry.listed_at() > REGISTRY_TTL:
+        return False
+    records = registry.lookup(validators)
+    if len(records) < len(set(validators)):
+        return False
+    sync_times = store.get_sync_times([record["identity"] for record in records.values()])
+    fresh_after = time.time() * 1000 - WITHDRAWALS_FRESH_SECONDS * 1000
+    if any(sync_times.get(record["identity"], 0) < fresh_after for record in records.values()):
+        return False
+    return all(cache.get("blocks", validator) is not MISSING for validator in validators)
+
+
+async def iter_fleet_withdrawals(validators, start_epoch):
+    """Yield fleet events as they resolve.
+
+    A "start" event carries the current epoch, then one "row" event per
+    validator arrives in completion order, then a final "done" event with
+    the API errors and cell statistics.
+    """
+    client = get_async_client()
+    try:
+        current_epoch = await fetch_current_epoch(client)
+    except Exception as e:
+        logger.error(f"Error fetching current epoch: {e}")
+        yield {"type": "done", "api_errors": [classify_error(e) or "connection"], "cell_stats": None}
+        return
+    yield {"type": "start", "current_epoch": current_epoch}
+
+    # Rows need the epoch index, so it is refreshed alongside the histories
+    index_task = asyncio.ensure_future(refresh_epoch_index(client, current_epoch))
+    records = await registry.ensure(client, validators)
+    registered_task = asyncio.ensure_future(registry.fill_registered_times(client, validators))
+    tasks = [
+        asyncio.ensure_future(fetch_validator_history(client, validator, records.get(validator)))
+        for validator in validators
+    ]
+    block_tasks = {
+        validator: asyncio.ensure_future(sync_validator_blocks(client, validator))
+        for validator in validators
+    }
+    histories = []
+    matrix = {}
+    api_errors = []
+    finished = False
+    try:
+        for next_history in asyncio.as_completed(tasks):
+            history = await next_history
+            await index_task
+            validator = history["validator"]
+            blocks = None
+            if await block_tasks[validator]:
+                blocks = await asyncio.to_thread(block_index.count_in_epoch, validator, current_epoch)
+            row = None
+            if history["source"] is not None:
+                await asyncio.to_thread(store.assign_epochs, epoch_index.epoch_for, history["identity"])
+                rows = await asyncio.to_thread(store.withdrawal_matrix, [validator], start_epoch, current_epoch)
+                row = matrix[validator] = rows.get(validator, {})
+            if history["error"] and history["error"] not in api_errors:
+                api_errors.append(history["error"])
+            histories.append(history)
+            yield {
+                "type": "row",
+                "validator": validator,
+                "identity": history["identity"],
+                "server_ip": history["server_ip"],
+                "withdrawals": row,
+                "blocks": blocks,
+                "error": history["error"]
+            }
+        finished = True
+    finally:
+        # A closed stream (client gone) stops the remaining fetches; registration times are still awaited below
+        for task in [index_task, *tasks, *block_tasks.values()]:
+            task.cancel()
+        if not finished:
+            registered_task.cancel()
+
+    try:
+        await registered_task
+    except Exception as e:
+        logger.error(f"Error fetching registration times: {e}")
+    cell_stats = await asyncio.to_thread(count_cells, histories, matrix, start_epoch, current_epoch)
+    logger.info(f"Withdrawal cells served: {cell_stats}")
+    yield {"type": "done", "api_errors": api_errors, "cell_stats": cell_stats}
+
+
+async def fetch_fleet_withdrawals_async(validators, start_epoch):
+    """Fetch identities, withdrawals and epoch boundaries for a whole fleet concurrently"""
+    fleet = {
+        "current_epoch": None,
+        "identities": {},
+        "validator_ips": {},
+        "withdrawals": {},
+        "blocks": {},
+        "cell_stats": None,
+        "api_errors": []
+    }
+    async for event in iter_fleet_withdrawals(validators, start_epoch):
+        if event["type"] == "start":
+            fleet["current_epoch"] = event["current_epoch"]
+        elif event["type"] == "row":
+            validator = event["validator"]
+            if event["identity"]:
+                fleet["identities"][validator] = event["identity"]
+            if event["server_ip"]:
+                fleet["validator_ips"][validator] = event["server_ip"]
+            if event["withdrawals"] is not None:
+                fleet["withdrawals"][validator] = event["withdrawals"]
+            if event["blocks"] is not None:
+                fleet["blocks"][validator] = event["blocks"]
+        else:
+            fleet["api_errors"] = event["api_errors"]
+            fleet["cell_stats"] = event["cell_stats"]
+    return fleet
+
+
+def fetch_fleet_withdrawals(validators, start_epoch, timeout=FETCH_TIMEOUT):
+    """Synchronous adapter for Flask views around fetch_fleet_withdrawals_async"""
+    return runner.run(fetch_fleet_withdrawals_async(validators, start_epoch), timeout)
+
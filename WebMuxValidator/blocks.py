@@ -0,0 +1,85 @@
+import bisect
+import asyncio
+import logging
+import threading
+from array import array
+
+from cache import MISSING
+
+logger = logging.getLogger(__name__)
+
+BLOCKS_PAGE_LIMIT = 100
+
+
+class BlockIndex:
+    """Sorted, persisted proposed-block heights per validator.
+
+    Heights are appended from /validator/{hash}/blocks in ascending order,
+    fetching only the pages beyond what is already stored; blocks proposed
+    in an epoch are counted with two bisects against the epochs' first
+    block heights.
+    """
+
+    def __init__(self, store, cache, epoch_index):
+        self.store = store
+        self.cache = cache
+        self.epoch_index = epoch_index
+        self.heights = {}
+        self.lock = threading.Lock()
+
+    def get_heights(self, validator):
+        """Sorted proposed-block heights for a validator, loaded from the store once"""
+        with self.lock:
+            heights = self.heights.get(validator)
+            if heights is None:
+                heights = self.heights[validator] = array('q', self.store.load_block_heights(validator))
+            return heights
+
+    def add_heights(self, validator, new_heights):
+        heights = self.get_heights(validator)
+        new_heights = sorted(height for height in set(new_heights) if not heights or height > heights[-1])
+        if new_heights:
+            self.store.add_block_heights(validator, new_heights)
+            with self.lock:
+                heights.extend(new_heights)
+        return len(new_heights)
+
+    async def sync(self, client, validator):
+        """Fetch proposed blocks beyond the stored ones (at most once per cache TTL)"""
+        if await asyncio.to_thread(self.cache.get, "blocks", validator) is not MISSING:
+            return
+
+        heights = await asyncio.to_thread(self.get_heights, validator)
+        # A partly filled last page is fetched again; heights already stored are skipped
+        first_page = len(heights) // BLOCKS_PAGE_LIMIT + 1
+        params = {"limit": BLOCKS_PAGE_LIMIT, "order": "asc"}
+        path = f"/validator/{validator}/blocks"
+        data = await client.get_json(path, params={**params, "page": first_page})
+        pages = [data]
+        total = (data.get('pagination') or {}).get('total') or 0
+        last_page = -(-total // BLOCKS_PAGE_LIMIT)
+        if last_page > first_page:
+            pages += await asyncio.gather(
+                *(client.get_json(path, params={**params, "page": page}) for page in range(first_page + 1, last_page + 1))
+            )
+
+        new_heights = [
+            (item.get('header') or {}).get('height')
+            for page in pages for item in page.get('resultSet') or []
+        ]
+        added = await asyncio.to_thread(self.add_heights, validator, [height for height in new_heights if height])
+        await asyncio.to_thread(self.cache.set, "blocks", validator, len(heights))
+        logger.debug(f"Synced {added} new proposed blocks for {validator}")
+
+    def count_in_epoch(self, validator, epoch):
+        """Blocks a validator proposed in an epoch, or None if the epoch's first block is unknown"""
+        first_height = self.epoch_index.first_block_height(epoch)
+        if first_height is None:
+            return None
+        next_height = self.epoch_index.first_block_height(epoch + 1)
+        if next_height is None and epoch != self.epoch_index.current_epoch:
+            return None
+        heights = self.get_heights(validator)
+        lo = bisect.bisect_left(heights, first_height)
+        hi = bisect.bisect_left(heights, next_height) if next_height else len(heights)
+        return hi - lo
@@ -0,0 +1,111 @@
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Time-to-live per data class in seconds (None means the data never changes)
+CACHE_TTLS = {
+    "epoch": None,          # closed epoch boundaries
+    "epoch_first_block": None,  # first block height of an epoch
+    "withdrawals": None,    # past withdrawals, kept current by the sync itself
+    "status": 30,           # /status current epoch
+    "validator": 6 * 3600,  # validator identity / IP
+    "blocks": 60,           # proposed-block list last synced
+    "block_time": 3600,     # failed core block time lookups, not retried before this
+    "table_fragment": 6 * 3600,  # rendered tables; new data changes the key
+    "payout_stats": 6 * 3600,    # empirical payouts; a new epoch or new data changes the key
+    "file": 60,             # parsed ~/tmp cache files
+}
+DEFAULT_MAX_ITEMS = 4096
+
+# Returned by get() on a miss so that None can be cached as a value
+MISSING = object()
+
+
+class TieredCache:
+    """In-process LRU in front of the SQLite store, with a TTL per data class.
+
+    Hits are served from memory without touching the filesystem; memory
+    misses fall back to disk so cold starts still reuse earlier results.
+    """
+
+    def __init__(self, store, max_items=DEFAULT_MAX_ITEMS, ttls=CACHE_TTLS):
+        self.store = store
+        self.max_items = max_items
+        self.ttls = ttls
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _is_fresh(self, kind, stored_at):
+        ttl = self.ttls.get(kind)
+        return ttl is None or time.time() - stored_at < ttl
+
+    def _remember(self, kind, key, value, stored_at):
+        with self.lock:
+            self.memory[(kind, key)] = (value, stored_at)
+            self.memory.move_to_end((kind, key))
+            while len(self.memory) > self.max_items:
+                self.memory.popitem(last=False)
+
+    def get(self, kind, key, persist=True):
+        """Get a fresh value from memory, then disk, or MISSING"""
+        with self.lock:
+            entry = self.memory.get((kind, key))
+            if entry is not None:
+                if self._is_fresh(kind, entry[1]):
+                    self.memory.move_to_end((kind, key))
+                    return entry[0]
+                del self.memory[(kind, key)]
+
+        if not persist:
+            return MISSING
+
+        try:
+            entry = self.store.cache_get(kind, str(key))
+            if entry is not None and self._is_fresh(kind, entry[1]):
+                self._remember(kind, key, entry[0], entry[1])
+                return entry[0]
+        except Exception as e:
+            logger.error(f"Error reading cache entry {kind}/{key}: {e}")
+        return MISSING
+
+    def get_stale(self, kind, key):
+        """Get the last stored value whatever its age, or MISSING (no upstream call is implied)"""
+        with self.lock:
+            entry = self.memory.get((kind, key))
+        if entry is not None:
+            return entry[0]
+        try:
+            entry = self.store.cache_get(kind, str(key))
+            if entry is not None:
+                return entry[0]
+        except Exception as e:
+            logger.error(f"Error reading cache entry {kind}/{key}: {e}")
+        return MISSING
+
+    def set(self, kind, key, value, persist=True):
+        """Store a value in memory and, unless persist is False, on disk"""
+        stored_at = time.time()
+        self._remember(kind, key, value, stored_at)
+        if not persist:
+            return
+        try:
+            self.store.cache_set(kind, str(key), value, stored_at)
+        except Exception as e:
+            logger.error(f"Error writing cache entry {kind}/{key}: {e}")
+
+    def invalidate(self, kind, key):
+        """Drop a value from memory (the stored copy is left for set() to replace)"""
+        with self.lock:
+            self.memory.pop((kind, key), None)
+
+    def get_or_load(self, kind, key, loader, persist=True):
+        """Get a cached value or call loader() and cache its result if not None"""
+        value = self.get(kind, key, persist)
+        if value is MISSING:
+            value = loader()
+            if value is not None:
+                self.set(kind, key, value, persist)
+        return value
@@ -0,0 +1,150 @@
+import bisect
+import logging
+import threading
+from array import array
+
+logger = logging.getLogger(__name__)
+
+# First epoch with withdrawal data; earlier epochs are neither indexed nor shown
+FIRST_EPOCH = 6
+
+# Sentinel end time for the open (current) epoch
+OPEN_END_TIME = 2 ** 63 - 1
+
+
+class EpochIndex:
+    """Sorted in-memory index of closed epoch boundaries backed by the store.
+
+    Boundaries (times and first block heights) are kept as compact int64
+    arrays for bisect lookups. Closed epochs never change, so only newly
+    closed epochs are fetched.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.epochs = array('q')
+        self.start_times = array('q')
+        self.end_times = array('q')
+        self.first_heights = array('q')  # 0 while a closed epoch's first block is unknown
+        self.current_epoch = None
+        self.open_first_height = None    # first block of the current (open) epoch
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Load the index from the store"""
+        try:
+            rows = self.store.load_epochs()
+            self.epochs = array('q', (row[0] for row in rows))
+            self.start_times = array('q', (row[1] for row in rows))
+            self.end_times = array('q', (row[2] for row in rows))
+            self.first_heights = array('q', (row[3] or 0 for row in rows))
+            logger.debug(f"Loaded {len(self.epochs)} epochs from the store")
+        except Exception as e:
+            logger.error(f"Error loading epoch index: {e}")
+
+    @property
+    def last_closed_epoch(self):
+        return self.epochs[-1] if self.epochs else FIRST_EPOCH - 1
+
+    def missing_epochs(self, current_epoch):
+        """Closed epochs not yet in the index"""
+        return list(range(self.last_closed_epoch + 1, current_epoch))
+
+    def extend(self, current_epoch, fetched):
+        """Append fetched (epoch, (start_time, end_time[, first_block_height]) or None) pairs in order.
+
+        Appending stops at the first failure so the missing epoch is retried
+        on the next refresh.
+        """
+        with self.lock:
+            if current_epoch != self.current_epoch:
+                self.open_first_height = None
+            self.current_epoch = current_epoch
+            added = []
+            for epoch, epoch_data in fetched:
+                if epoch != self.last_closed_epoch + 1:
+                    continue
+                if not epoch_data:
+                    logger.warning(f"Could not get boundaries for epoch {epoch}, will retry later")
+                    break
+                self.epochs.append(epoch)
+                self.start_times.append(epoch_data[0])
+                self.end_times.append(epoch_data[1])
+                first_height = epoch_data[2] if len(epoch_data) > 2 else None
+                self.first_heights.append(first_height or 0)
+                added.append((epoch, epoch_data[0], epoch_data[1], first_height))
+            if added:
+                self.store.add_epochs(added)
+                logger.debug(f"Added {len(added)} closed epochs to the epoch index")
+
+    def refresh(self, current_epoch, fetch_epoch):
+        """Fetch boundaries of epochs closed since the last refresh.
+
+        fetch_epoch(n) must return (start_time, end_time) or None.
+        """
+        fetched = []
+        for epoch in self.missing_epochs(current_epoch):
+            epoch_data = fetch_epoch(epoch)
+            fetched.append((epoch, epoch_data))
+            if not epoch_data:
+                break
+        self.extend(current_epoch, fetched)
+
+    def first_block_height(self, epoch):
+        """First block height of a closed or the open epoch, or None if unknown"""
+        if epoch == self.current_epoch:
+            return self.open_first_height
+        index = bisect.bisect_left(self.epochs, epoch)
+        if index < len(self.epochs) and self.epochs[index] == epoch:
+            return self.first_heights[index] or None
+        return None
+
+    def set_first_block_heights(self, pairs):
+        """Record (epoch, first_block_height) pairs; the open epoch's is kept in memory only"""
+        closed = []
+        with self.lock:
+            for epoch, height in pairs:
+                if not height:
+                    continue
+                if epoch == self.current_epoch:
+                    self.open_first_height = height
+                    continue
+                index = bisect.bisect_left(self.epochs, epoch)
+                if index < len(self.epochs) and self.epochs[index] == epoch:
+                    self.first_heights[index] = height
+                    closed.append((epoch, height))
+        if closed:
+            self.store.set_epoch_first_blocks(closed)
+
+    def epoch_for(self, timestamp_ms):
+        """Map a millisecond timestamp to an epoch number, or None if unknown"""
+        index = bisect.bisect_right(self.start_times, timestamp_ms) - 1
+        if index < 0:
+            return None
+        if timestamp_ms <= self.end_times[index]:
+            return self.epochs[index]
+        # After the last closed epoch means the open epoch
+        if index == len(self.epochs) - 1 and self.current_epoch == self.epochs[index] + 1:
+            return self.current_epoch
+        return None
+
+    def end_time(self, epoch):
+        """End timestamp of a closed epoch, or None if it is not in the index"""
+        index = bisect.bisect_left(self.epochs, epoch)
+        if index < len(self.epochs) and self.epochs[index] == epoch:
+            return self.end_times[index]
+        return None
+
+    def boundaries(self, start_epoch, end_epoch):
+        """Get sorted (epoch, start_time, end_time) tuples for a range of epochs.
+
+        The open epoch, if in range, runs from the end of the last closed epoch.
+        """
+        lo = bisect.bisect_left(self.epochs, start_epoch)
+        hi = bisect.bisect_right(self.epochs, end_epoch)
+        result = list(zip(self.epochs[lo:hi], self.start_times[lo:hi], self.end_times[lo:hi]))
+        if (self.epochs and self.current_epoch == self.epochs[-1] + 1
+                and start_epoch <= self.current_epoch <= end_epoch):
+            result.append((self.current_epoch, self.end_times[-1] + 1, OPEN_END_TIME))
+        return result
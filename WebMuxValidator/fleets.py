@@ -0,0 +1,59 @@
+import os
+import json
+import hashlib
+import logging
+
+from utils import store
+
+logger = logging.getLogger(__name__)
+
+# Fleet settings
+FLEET_ID_LENGTH = 16
+FLEET_NAME_MAX_LENGTH = 80
+OWNED_FLEETS_MAX = 50  # fleet IDs remembered per browser session as created there
+FLEET_ACTIVE_SECONDS = int(os.environ.get("WEBMUX_FLEET_ACTIVE_SECONDS", str(30 * 86400)))  # pre-warmed while used this recently
+
+
+def parse_validators_text(validators_text):
+    """Validator hashes from a textarea: one per line, blank lines and repeats dropped, order kept"""
+    return list(dict.fromkeys(line.strip() for line in validators_text.splitlines() if line.strip()))
+
+
+def fleet_id(validators):
+    """Stable ID of a validator list, so submitting the same list again reuses its fleet"""
+    return hashlib.sha256(json.dumps(validators).encode()).hexdigest()[:FLEET_ID_LENGTH]
+
+
+def save_fleet(validators, name=None, start_epoch=None, owned=()):
+    """Store a validator set and return (fleet ID, created).
+
+    IDs come from the list, so anyone submitting the same list reaches the
+    same fleet; its name and start epoch change only if the fleet is in
+    owned (the IDs the caller created), otherwise it is just marked used.
+    """
+    fleet = fleet_id(validators)
+    existing = store.get_fleet(fleet)
+    if existing is not None and fleet not in owned:
+        store.touch_fleet(fleet)
+        return fleet, False
+    name = (name or "").strip()[:FLEET_NAME_MAX_LENGTH] or None
+    store.save_fleet(fleet, validators, name, start_epoch)
+    logger.debug(f"Saved fleet {fleet} with {len(validators)} validators")
+    return fleet, existing is None
+
+
+def use_fleet(validators):
+    """Mark the saved fleet of a validator list used, without creating one; returns its ID or None"""
+    fleet = fleet_id(validators)
+    if store.get_fleet(fleet) is None:
+        return None
+    store.touch_fleet(fleet)
+    return fleet
+
+
+def load_fleet(fleet):
+    """Get a saved fleet and mark it used, or None if the ID is unknown"""
+    saved = store.get_fleet(fleet)
+    if saved is not None:
+        store.touch_fleet(fleet)
+    return saved
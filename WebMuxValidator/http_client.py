@@ -0,0 +1,101 @@
+import os
+import time
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# API Endpoints
+PLATFORM_API_BASE = os.environ.get("PLATFORM_API_BASE", "https://platform-explorer.pshenmic.dev")
+INSIGHT_API_BASE = os.environ.get("INSIGHT_API_BASE", "https://insight.dash.org/insight-api")  # core block times
+
+# Client limits (the explorer API is rate limited, keep below its budget)
+PLATFORM_API_RATE = float(os.environ.get("PLATFORM_API_RATE", "10"))  # requests per second
+PLATFORM_API_BURST = int(os.environ.get("PLATFORM_API_BURST", "10"))
+PLATFORM_API_MAX_CONNECTIONS = int(os.environ.get("PLATFORM_API_MAX_CONNECTIONS", "8"))
+DEFAULT_TIMEOUT = (5, 15)  # (connect, read) seconds
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token and return how many seconds to wait before using it"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self):
+        """Block until a token is available"""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class PlatformClient:
+    """Shared HTTP client for the platform explorer API.
+
+    One pooled keep-alive Session with a per-host connection limit, a token
+    bucket in front of every request, exponential-backoff retries on 429/5xx
+    and a default timeout.
+    """
+
+    def __init__(self, base_url=PLATFORM_API_BASE, rate=PLATFORM_API_RATE, burst=PLATFORM_API_BURST,
+                 max_connections=PLATFORM_API_MAX_CONNECTIONS, timeout=DEFAULT_TIMEOUT):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.rate_limiter = TokenBucket(rate, burst)
+        self.session = create_session(max_connections)
+
+    def get(self, path, **kwargs):
+        """GET a path (or absolute URL) through the rate limiter"""
+        url = path if path.startswith('http') else f"{self.base_url}{path}"
+        kwargs.setdefault('timeout', self.timeout)
+        self.rate_limiter.acquire()
+        return self.session.get(url, **kwargs)
+
+    def get_json(self, path, **kwargs):
+        """GET a path and decode the JSON body, raising on HTTP errors"""
+        response = self.get(path, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+
+def create_session(max_connections=PLATFORM_API_MAX_CONNECTIONS, retries=3):
+    """Create a pooled Session with retries and backoff on 429/5xx"""
+    retry = Retry(
+        total=retries,
+        backoff_factor=0.5,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET"]),
+        respect_retry_after_header=True
+    )
+    # pool_block makes max_connections a hard per-host limit
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=max_connections,
+        pool_block=True,
+        max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# Shared client used by all platform explorer calls
+platform_client = PlatformClient()
@@ -0,0 +1,200 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import hashlib
+import logging
+import threading
+
+from epoch_index import FIRST_EPOCH
+from store import JOB_RUNNING, JOB_DONE, JOB_FAILED
+from utils import store, calculate_totals
+from withdrawal_matrix import WithdrawalMatrix
+from async_engine import FETCH_TIMEOUT, runner, iter_fleet_withdrawals
+
+logger = logging.getLogger(__name__)
+
+# Job limits
+MAX_RUNNING_JOBS = int(os.environ.get("WEBMUX_MAX_JOBS", "2"))
+JOB_HEARTBEAT_SECONDS = 10             # in-flight jobs touch their row this often
+JOB_STALE_SECONDS = 3 * JOB_HEARTBEAT_SECONDS  # in-flight jobs that missed this many heartbeats are treated as dead
+JOB_RETENTION_SECONDS = 3600           # finished jobs stay pollable for this long
+POLL_INTERVAL = 0.5                    # seconds between store checks while following a job
+INLINE_WAIT_SECONDS = 5                # a blocking request answers 202 with the job ID after this long
+
+
+def job_key(validators, start_epoch):
+    """Deduplication key for a validator set and start epoch"""
+    payload = json.dumps([sorted(set(validators)), start_epoch])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def row_message(event):
+    """Wire format of a finished validator row"""
+    row = event["withdrawals"]
+    return {
+        "validator": event["validator"],
+        "identity": event["identity"],
+        "server_ip": event["server_ip"],
+        "withdrawals": row,
+        "total": sum(row.values()) if row else 0,
+        "blocks": event["blocks"]
+    }
+
+
+class JobQueue:
+    """Background withdrawal-table jobs on the async runner, tracked in the store.
+
+    Job state and finished rows live in SQLite, so any gunicorn worker can
+    answer a poll, and identical in-flight requests share one job. Jobs run
+    on the process's runner loop, at most MAX_RUNNING_JOBS at a time.
+    """
+
+    def __init__(self, store, max_running=MAX_RUNNING_JOBS):
+        self.store = store
+        self.max_running = max_running
+        self.semaphore = None
+        self.changed = threading.Condition()
+
+    def submit(self, validators, start_epoch):
+        """Start a job or join an identical one in flight; returns (job_id, created)"""
+        now = time.time()
+        self.store.purge_jobs(now - JOB_RETENTION_SECONDS)
+        job_id, created = self.store.claim_job(
+            uuid.uuid4().hex, job_key(validators, start_epoch), validators, start_epoch, now - JOB_STALE_SECONDS
+        )
+        if created:
+            runner.submit(self.run(job_id, validators, start_epoch))
+            logger.info(f"Started job {job_id} for {len(validators)} validators from epoch {start_epoch}")
+        else:
+            logger.info(f"Joined in-flight job {job_id}")
+        return job_id, created
+
+    def get(self, job_id):
+        return self.store.get_job(job_id)
+
+    def latest_done(self, validators, start_epoch):
+        """The newest finished job for a validator set and start epoch (kept for JOB_RETENTION_SECONDS), or None"""
+        job_id = self.store.latest_job_id(job_key(validators, start_epoch), JOB_DONE)
+        return self.get(job_id) if job_id else None
+
+    def rows(self, job_id, since=0):
+        return self.store.get_job_rows(job_id, since)
+
+    def _notify(self):
+        with self.changed:
+            self.changed.notify_all()
+
+    async def heartbeat(self, job_id):
+        """Touch a job's row every JOB_HEARTBEAT_SECONDS so other workers see it is alive"""
+        while True:
+            await asyncio.sleep(JOB_HEARTBEAT_SECONDS)
+            try:
+                await asyncio.to_thread(self.store.touch_job, job_id)
+            except Exception as e:
+                logger.warning(f"Heartbeat of job {job_id} failed: {e}")
+
+    async def run(self, job_id, validators, start_epoch):
+        """Run a job on the runner loop with a heartbeat, also while it waits for a slot"""
+        heartbeat = asyncio.ensure_future(self.heartbeat(job_id))
+        try:
+            await self.execute(job_id, validators, start_epoch)
+        finally:
+            heartbeat.cancel()
+
+    async def execute(self, job_id, validators, start_epoch):
+        """Run a job once a slot is free, recording rows as they finish"""
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.max_running)
+        async with self.semaphore:
+            fleet = {
+                "withdrawals": {},
+                "identities": {},
+                "validator_ips": {},
+                "blocks": {},
+                "current_epoch": None,
+                "cell_stats": None,
+                "api_errors": []
+            }
+            try:
+                await asyncio.to_thread(self.store.update_job, job_id, status=JOB_RUNNING)
+                async for event in iter_fleet_withdrawals(validators, start_epoch):
+                    if event["type"] == "start":
+                        fleet["current_epoch"] = event["current_epoch"] or FIRST_EPOCH
+                        await asyncio.to_thread(self.store.update_job, job_id, current_epoch=fleet["current_epoch"])
+                    elif event["type"] == "row":
+                        validator = event["validator"]
+                        if event["identity"]:
+                            fleet["identities"][validator] = event["identity"]
+                        if event["server_ip"]:
+                            fleet["validator_ips"][validator] = event["server_ip"]
+                        if event["withdrawals"] is not None:
+                            fleet["withdrawals"][validator] = event["withdrawals"]
+                        if event["blocks"] is not None:
+                            fleet["blocks"][validator] = event["blocks"]
+                        await asyncio.to_thread(self.store.add_job_row, job_id, row_message(event))
+                    else:
+                        fleet["api_errors"] = event["api_errors"]
+                        fleet["cell_stats"] = event["cell_stats"]
+                    self._notify()
+
+                current_epoch = fleet["current_epoch"] or FIRST_EPOCH
+                matrix = WithdrawalMatrix.from_rows(
+                    fleet["withdrawals"], validators, range(start_epoch, current_epoch + 1)
+                )
+                (fleet["validator_totals"], fleet["grand_total"],
+                 fleet["epoch_range"], fleet["yields"]) = calculate_totals(
+                    matrix, validators, current_epoch, start_epoch
+                )
+                # Stored columnar; the endpoints expand it for the table
+                fleet["withdrawals"] = matrix.to_columnar()
+                await asyncio.to_thread(self.store.update_job, job_id, status=JOB_DONE, result=json.dumps(fleet))
+                logger.info(f"Job {job_id} finished")
+            except Exception as e:
+                logger.exception(f"Job {job_id} failed: {e}")
+                await asyncio.to_thread(self.store.update_job, job_id, status=JOB_FAILED, error=str(e))
+            finally:
+                self._notify()
+
+    def wait(self, job_id, timeout=FETCH_TIMEOUT):
+        """Block until a job finishes or the timeout passes; returns the job"""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or job["status"] in (JOB_DONE, JOB_FAILED):
+                return job
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return job
+            with self.changed:
+                self.changed.wait(min(POLL_INTERVAL, remaining))
+
+    def follow(self, job_id, timeout=FETCH_TIMEOUT):
+        """Yield ("start", job), ("row", row) and finally ("done", job) as a job progresses.
+
+        Rows recorded before the call are replayed first, so a follower that
+        joins a running job still gets the whole table.
+        """
+        deadline = time.monotonic() + timeout
+        since = 0
+        started = False
+        while True:
+            job = self.get(job_id)
+            if job is None:
+                return
+            if not started and job["current_epoch"]:
+                started = True
+                yield "start", job
+            for since, row in self.rows(job_id, since):
+                yield "row", row
+            if job["status"] in (JOB_DONE, JOB_FAILED):
+                yield "done", job
+                return
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Job {job_id} did not finish in {timeout}s")
+            with self.changed:
+                self.changed.wait(POLL_INTERVAL)
+
+
+job_queue = JobQueue(store)
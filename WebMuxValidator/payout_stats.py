@@ -0,0 +1,105 @@
+import json
+import hashlib
+import logging
+
+import numpy as np
+
+from cache import MISSING
+from store import JOB_DONE
+from epoch_index import FIRST_EPOCH
+from apy import TABLE_UNITS_PER_DASH
+from utils import cache, store, epoch_index, registry, get_current_epoch, refresh_epoch_index
+from jobs import job_queue
+from withdrawal_matrix import WithdrawalMatrix
+
+logger = logging.getLogger(__name__)
+
+# Payout statistics settings
+PAYOUT_STATS_KIND = "payout_stats"
+PAYOUT_STATS_EPOCHS = 10       # closed epochs averaged by default
+MAX_PAYOUT_STATS_EPOCHS = 100
+PAYOUT_SYNC_TIMEOUT = 120      # seconds to wait for validators that were never synced
+MS_PER_DAY = 86400000
+PAYOUT_PRECISION = 6           # decimal places of the DASH amounts in the response
+
+
+def summarize_payouts(payouts, durations_ms):
+    """Average Platform payout per validator and epoch, and the average epoch length.
+
+    payouts is a validators x epochs array in DASH with NaN for epochs a
+    validator was not registered in; durations_ms holds the epoch lengths.
+    """
+    observed = payouts[~np.isnan(payouts)]
+    with np.errstate(invalid='ignore'):
+        per_validator = np.nanmean(payouts, axis=1) if payouts.size else np.empty(0)
+    per_validator = per_validator[~np.isnan(per_validator)]
+    durations_ms = durations_ms[durations_ms > 0]
+
+    def number(value):
+        return None if value is None or np.isnan(value) else round(float(value), PAYOUT_PRECISION)
+
+    return {
+        "validators": int(len(per_validator)),
+        "samples": int(observed.size),
+        "payout_per_epoch": number(observed.mean()) if observed.size else None,
+        "median_payout_per_epoch": number(np.median(per_validator)) if per_validator.size else None,
+        "epoch_days": number(durations_ms.mean() / MS_PER_DAY) if durations_ms.size else None,
+        "epoch_payouts": np.round(observed, PAYOUT_PRECISION).tolist()
+    }
+
+
+def sync_missing(validators, start_epoch):
+    """Fetch the histories of validators never synced before, waiting up to PAYOUT_SYNC_TIMEOUT"""
+    missing = set(validators) - set(store.synced_validators(validators))
+    if not missing:
+        return
+    job_id, _ = job_queue.submit(validators, start_epoch)
+    job = job_queue.wait(job_id, timeout=PAYOUT_SYNC_TIMEOUT)
+    if job is None or job["status"] != JOB_DONE:
+        logger.warning(f"Payout stats use partial data: {len(missing)} validators not synced yet")
+
+
+def payout_stats(validators=None, epochs=PAYOUT_STATS_EPOCHS):
+    """Empirical Platform payouts over the last closed epochs, cached per epoch and stored data.
+
+    validators None means every validator this server has synced, which
+    is the network as far as it is known here. Epochs before a validator's
+    registration are left out instead of counted as zero payouts.
+    """
+    current_epoch = get_current_epoch()
+    end_epoch = current_epoch - 1
+    start_epoch = max(FIRST_EPOCH, end_epoch - epochs + 1)
+    if validators:
+        sync_missing(validators, start_epoch)
+    pool = store.synced_validators(validators)
+
+    version, _ = store.data_version(pool) if pool else ([], 0)
+    key = hashlib.sha256(json.dumps([pool, start_epoch, end_epoch, version]).encode()).hexdigest()
+    stats = cache.get(PAYOUT_STATS_KIND, key)
+    if stats is not MISSING:
+        return stats
+
+    refresh_epoch_index(current_epoch)
+    boundaries = epoch_index.boundaries(start_epoch, end_epoch)
+    epoch_range = list(range(start_epoch, end_epoch + 1))
+    rows = store.withdrawal_matrix(pool, start_epoch, end_epoch) if pool else {}
+    payouts = WithdrawalMatrix.from_rows(rows, pool, epoch_range).reindex(pool).values / TABLE_UNITS_PER_DASH
+
+    end_times = {epoch: end for epoch, _, end in boundaries}
+    epoch_ends = np.array([end_times.get(epoch, 0) for epoch in epoch_range], dtype=float)
+    records = registry.lookup(pool)
+    registered_ms = np.array([(records.get(validator) or {}).get("registered_time") or 0 for validator in pool],
+                             dtype=float) * 1000
+    payouts[(epoch_ends[None, :] > 0) & (epoch_ends[None, :] < registered_ms[:, None])] = np.nan
+
+    durations = np.array([end - start for _, start, end in boundaries], dtype=float)
+    stats = {
+        **summarize_payouts(payouts, durations),
+        "start_epoch": start_epoch,
+        "end_epoch": end_epoch,
+        "current_epoch": current_epoch,
+        "network": validators is None
+    }
+    cache.set(PAYOUT_STATS_KIND, key, stats)
+    logger.debug(f"Payout stats for {len(pool)} validators over epochs {start_epoch}-{end_epoch}")
+    return stats
@@ -0,0 +1,130 @@
+import os
+import time
+import fcntl
+import logging
+import threading
+
+from utils import SAVE_DIR, cache, store, fetch_current_epoch
+from async_engine import fetch_fleet_withdrawals
+from fleets import FLEET_ACTIVE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Poller settings
+POLLER_ENABLED = os.environ.get("WEBMUX_POLLER", "1") != "0"
+POLL_SECONDS = int(os.environ.get("WEBMUX_POLL_SECONDS", "20"))           # /status check interval
+PREWARM_SECONDS = int(os.environ.get("WEBMUX_PREWARM_SECONDS", "900"))    # re-sync interval within an epoch
+LOCK_FILE = os.path.join(SAVE_DIR, "poller.lock")
+
+
+class EpochPoller:
+    """Background thread that pre-warms the fleet cache.
+
+    It watches /status for epoch rollover and re-syncs identities,
+    withdrawals and epoch boundaries for every saved fleet used recently,
+    each on its own schedule, so that interactive requests are served
+    from the store. Only the gunicorn worker holding the lock file polls;
+    the others keep retrying the lock in case that worker goes away.
+    """
+
+    def __init__(self, interval=POLL_SECONDS, prewarm_interval=PREWARM_SECONDS, lock_file=LOCK_FILE):
+        self.interval = interval
+        self.prewarm_interval = prewarm_interval
+        self.lock_file = lock_file
+        self.lock_fd = None
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.current_epoch = None
+        self.last_prewarm = 0
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name="webmux-poller", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def acquire_leadership(self):
+        """Take the poller lock without blocking; True if this process holds it"""
+        if self.lock_fd is not None:
+            return True
+        fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self.lock_fd = fd
+        logger.info(f"Epoch poller running in process {os.getpid()}")
+        return True
+
+    def known_validators(self):
+        """Every validator whose history was synced before.
+
+        Registry rows from the bulk /validators sync cover the whole network
+        and are not pre-warmed; only histories a user asked for are synced.
+        """
+        return store.synced_validators()
+
+    def poll(self):
+        """Check the current epoch and pre-warm on rollover or when the last pre-warm is stale"""
+        current_epoch = fetch_current_epoch()
+        if not current_epoch:
+            return
+        cache.set("status", "current_epoch", current_epoch)
+
+        rolled_over = current_epoch != self.current_epoch
+        if rolled_over and self.current_epoch is not None:
+            logger.info(f"Epoch rolled over from {self.current_epoch} to {current_epoch}")
+        self.current_epoch = current_epoch
+
+        fleets = store.active_fleets(time.time() - FLEET_ACTIVE_SECONDS)
+        if not fleets:
+            # Nothing saved as a fleet yet: warm everything known, as one set
+            if not rolled_over and time.time() - self.last_prewarm < self.prewarm_interval:
+                return
+            fleets = [{"id": None, "validators": self.known_validators(), "warmed_at": None}]
+
+        for fleet in fleets:
+            if self.stop_event.is_set():
+                return
+            if not rolled_over and fleet["warmed_at"] and time.time() - fleet["warmed_at"] < self.prewarm_interval:
+                continue
+            self.prewarm(fleet, current_epoch)
+
+    def prewarm(self, fleet, current_epoch):
+        """Sync one fleet's data for the current epoch"""
+        validators = fleet["validators"]
+        if not validators:
+            return
+        started = time.time()
+        # The matrix itself is not needed, so only the open epoch is loaded
+        result = fetch_fleet_withdrawals(validators, current_epoch)
+        warmed_at = time.time()
+        if fleet["id"]:
+            store.set_fleet_warmed(fleet["id"], warmed_at)
+        else:
+            self.last_prewarm = warmed_at
+        logger.info(
+            f"Pre-warmed fleet {fleet['id'] or 'legacy'} ({len(validators)} validators) for epoch {current_epoch} "
+            f"in {warmed_at - started:.1f}s (errors: {result['api_errors'] or 'none'})"
+        )
+
+    def run(self):
+        while not self.stop_event.is_set():
+            try:
+                if self.acquire_leadership():
+                    self.poll()
+            except Exception as e:
+                logger.error(f"Error in epoch poller: {e}")
+            self.stop_event.wait(self.interval)
+
+
+poller = EpochPoller()
+
+
+def start_poller():
+    """Start the background epoch poller unless disabled with WEBMUX_POLLER=0"""
+    if POLLER_ENABLED:
+        poller.start()
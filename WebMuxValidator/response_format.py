@@ -0,0 +1,149 @@
+import gzip
+import json
+import hashlib
+import logging
+
+import numpy as np
+from flask import Response, request, jsonify
+
+from utils import store
+from withdrawal_matrix import WithdrawalMatrix, AMOUNT_PRECISION
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Response formats
+FORMAT_COLUMNAR = "columnar"
+MSGPACK_MIMETYPE = "application/msgpack"
+
+# Compression settings
+COMPRESS_MIN_SIZE = 1024  # bytes; smaller bodies are sent as they are
+COMPRESSIBLE_MIMETYPES = ("application/json", "application/msgpack", "text/html", "text/css", "text/javascript",
+                          "application/javascript")
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def requested_format():
+    """Response format asked for by ?format= or a "format" field in the JSON body"""
+    data = request.get_json(silent=True) if request.is_json else None
+    return request.args.get('format') or (data if isinstance(data, dict) else {}).get('format')
+
+
+def wants_msgpack():
+    """Whether the client prefers msgpack and it is available"""
+    return msgpack is not None and request.accept_mimetypes[MSGPACK_MIMETYPE] > request.accept_mimetypes["application/json"]
+
+
+def encode_response(result):
+    """JSON response, or msgpack for clients that ask for it"""
+    if wants_msgpack():
+        return Response(msgpack.packb(result), mimetype=MSGPACK_MIMETYPE)
+    return jsonify(result)
+
+
+def table_etag(validators, start_epoch, current_epoch, response_format=None):
+    """Get (etag, last_modified_ms) for a withdrawals table from the stored data version"""
+    validators = sorted(set(validators))
+    version, last_modified = store.data_version(validators)
+    payload = json.dumps([validators, start_epoch, current_epoch, version, response_format])
+    return hashlib.sha256(payload.encode()).hexdigest()[:32], last_modified
+
+
+def with_validators(response, etag, last_modified_ms):
+    """Attach the ETag and Last-Modified headers; clients revalidate on every use"""
+    response.set_etag(etag)
+    if last_modified_ms:
+        response.last_modified = last_modified_ms / 1000
+    response.cache_control.no_cache = True
+    return response
+
+
+def not_modified(etag, last_modified_ms=None):
+    """Empty 304 response for a matching conditional request"""
+    return with_validators(Response(status=304), etag, last_modified_ms)
+
+
+def columnar_result(fleet):
+    """Compact form of a job result: validator and epoch labels once, everything else in flat arrays.
+
+    Withdrawals are a row-major validators x epochs array and per-validator
+    fields are lists aligned with the validator labels.
+    """
+    withdrawals = fleet["withdrawals"]
+    if "columns" in withdrawals:
+        matrix = WithdrawalMatrix.from_columnar(withdrawals)
+    else:  # stored before results were columnar
+        matrix = WithdrawalMatrix.from_rows(withdrawals, withdrawals, fleet["epoch_range"])
+    validators = matrix.validators
+    epochs = matrix.epochs.tolist()
+    yields = fleet.get("yields") or {}
+
+    def aligned(mapping, keys=validators):
+        mapping = mapping or {}
+        return [mapping.get(key, mapping.get(str(key))) for key in keys]
+
+    return {
+        "format": FORMAT_COLUMNAR,
+        "validators": validators,
+        "epochs": epochs,
+        "values": [value or 0 for value in np.round(matrix.values, AMOUNT_PRECISION).ravel().tolist()],
+        "identities": aligned(fleet["identities"]),
+        "validator_ips": aligned(fleet["validator_ips"]),
+        "validator_totals": aligned(fleet["validator_totals"]),
+        "blocks": aligned(fleet["blocks"]),
+        "yields": {
+            **yields,
+            "apy": aligned(yields.get("apy")),
+            "epoch_yield": aligned(yields.get("epoch_yield"), epochs),
+            "running_average": aligned(yields.get("running_average"), epochs)
+        } if yields else None,
+        "grand_total": fleet["grand_total"],
+        "epoch_range": fleet["epoch_range"],
+        "current_epoch": fleet["current_epoch"],
+        "cell_stats": fleet["cell_stats"]
+    }
+
+
+def compress_response(response):
+    """Brotli- or gzip-encode a response body when the client accepts it (after_request hook)"""
+    if (response.direct_passthrough or response.is_streamed or response.status_code < 200
+            or response.status_code in (204, 304) or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    accept = request.accept_encodings
+    encoding = "br" if brotli is not None and accept["br"] else "gzip" if accept["gzip"] else None
+    if encoding is None:
+        return response
+
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_SIZE:
+        return response
+    try:
+        if encoding == "br":
+            compressed = brotli.compress(body, quality=BROTLI_QUALITY)
+        else:
+            compressed = gzip.compress(body, compresslevel=GZIP_LEVEL)
+    except Exception as e:
+        logger.error(f"Error compressing response: {e}")
+        return response
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    # The encoded body is a different representation, so a strong ETag becomes weak
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    response.vary.add('Accept-Encoding')
+    logger.debug(f"Compressed response {len(body)} -> {len(compressed)} bytes ({encoding})")
+    return response
@@ -0,0 +1,79 @@
+import asyncio
+import functools
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key onto one execution.
+
+    The first caller runs the function; callers arriving while it is in
+    flight wait for it and share its result or exception. Nothing is kept
+    once the call returns, so caching stays with the callers.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.result
+
+    def wrap(self, fn):
+        """Decorator coalescing concurrent calls with the same arguments"""
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return self.do((fn.__qualname__, args, tuple(sorted(kwargs.items()))), fn, *args, **kwargs)
+        return wrapper
+
+
+class AsyncSingleFlight:
+    """Coroutine counterpart of SingleFlight for one event loop.
+
+    Waiters share one task; a waiter being cancelled does not cancel the
+    shared task for the others.
+    """
+
+    def __init__(self):
+        self.calls = {}
+
+    async def do(self, key, coro_fn, *args, **kwargs):
+        task = self.calls.get(key)
+        if task is None:
+            task = self.calls[key] = asyncio.ensure_future(coro_fn(*args, **kwargs))
+            task.add_done_callback(functools.partial(self._forget, key))
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self.calls.get(key) is task:
+            del self.calls[key]
+        # Mark the exception retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
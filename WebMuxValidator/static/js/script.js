@@ -49,6 +49,15 @@ function fetchWithdrawalsData(preloadedValidators = null) {
         return;
     }
     
+    // The server rendered an up-to-date table: nothing to fetch
+    if (tableContainer.dataset.prerendered === 'true') {
+        if (tableContainer.dataset.controlsReady !== 'true') {
+            tableContainer.dataset.controlsReady = 'true';
+            initTableControls(tableContainer);
+        }
+        return;
+    }
+    
     // Get validators from parameter or data attribute
     let validators = [];
     
@@ -103,15 +112,98 @@ function fetchWithdrawalsData(preloadedValidators = null) {
             : 'Connecting to the Dash Platform API and retrieving validator data...';
     }
     
+    // Stream rows as they resolve where the browser can read response bodies incrementally;
+    // a table already seen in this session is revalidated with its ETag instead
+    if (window.ReadableStream && window.TextDecoder && !getCachedTable(validators, start_epoch)) {
+        streamWithdrawalsData(validators, lang, start_epoch);
+    } else {
+        fetchWithdrawalsOnce(validators, lang, start_epoch);
+    }
+}
+
+// ID of the saved fleet shown on this page, if any
+function currentFleetId() {
+    const tableContainer = document.getElementById('withdrawals-table-container');
+    return (tableContainer && tableContainer.dataset.fleetId) || undefined;
+}
+
+// Last table per validator set and start epoch, kept for revalidation with If-None-Match
+function tableCacheKey(validators, start_epoch) {
+    return 'withdrawals:' + JSON.stringify([validators, start_epoch]);
+}
+
+function getCachedTable(validators, start_epoch) {
+    try {
+        return JSON.parse(sessionStorage.getItem(tableCacheKey(validators, start_epoch)) || 'null');
+    } catch (e) {
+        return null;
+    }
+}
+
+function setCachedTable(validators, start_epoch, etag, data) {
+    try {
+        sessionStorage.setItem(tableCacheKey(validators, start_epoch), JSON.stringify({ etag, data }));
+    } catch (e) {
+        console.warn('Could not cache the withdrawals table:', e);
+    }
+}
+
+// Expand the compact columnar response (labels once, flat value arrays) to the table's shape
+function decodeColumnarResult(data) {
+    const { validators, epochs, values } = data;
+    const byKey = (keys, list) => {
+        const result = {};
+        (list || []).forEach((value, i) => {
+            if (value !== null && value !== undefined) result[keys[i]] = value;
+        });
+        return result;
+    };
+
+    const withdrawals = {};
+    validators.forEach((validator, i) => {
+        const row = {};
+        epochs.forEach((epoch, j) => {
+            const amount = values[i * epochs.length + j];
+            if (amount) row[epoch] = amount;
+        });
+        withdrawals[validator] = row;
+    });
+
+    const yields = data.yields ? {
+        ...data.yields,
+        apy: byKey(validators, data.yields.apy),
+        epoch_yield: byKey(epochs, data.yields.epoch_yield),
+        running_average: byKey(epochs, data.yields.running_average)
+    } : null;
+
+    return {
+        ...data,
+        withdrawals,
+        identities: byKey(validators, data.identities),
+        validator_ips: byKey(validators, data.validator_ips),
+        validator_totals: byKey(validators, data.validator_totals),
+        blocks: byKey(validators, data.blocks),
+        yields
+    };
+}
+
+function fetchWithdrawalsOnce(validators, lang, start_epoch) {
+    const loadingContainer = document.getElementById('loading-container');
+    const resultsContainer = document.getElementById('results-container');
+    const loadingDetails = document.getElementById('loading-details');
+    const cached = getCachedTable(validators, start_epoch);
+    const headers = { 'Content-Type': 'application/json' };
+    if (cached && cached.etag) headers['If-None-Match'] = cached.etag;
+
 	fetch('/webmux/api/fetch_withdrawals', {  // Добавлен префикс /webmux
         method: 'POST',
-        headers: {
-            'Content-Type': 'application/json'
-        },
+        headers: headers,
         body: JSON.stringify({
             validators: validators,
+            fleet_id: currentFleetId(),
             lang: lang,
-            start_epoch: start_epoch
+            start_epoch: start_epoch,
+            format: 'columnar'
         }),
         credentials: 'same-origin'
     })
@@ -125,6 +217,10 @@ function fetchWithdrawalsData(preloadedValidators = null) {
                 : 'API data received, processing results...';
         }
         
+        // Unchanged since the cached copy
+        if (response.status === 304 && cached) {
+            return cached.data;
+        }
         if (!response.ok) {
             return response.json().then(errData => {
                 throw new Error(errData.error || 'Network response was not ok');
@@ -132,9 +228,14 @@ function fetchWithdrawalsData(preloadedValidators = null) {
                 throw new Error(`API error: ${response.status} ${response.statusText}`);
             });
         }
-        return response.json();
+        const etag = response.headers.get('ETag');
+        return response.json().then(data => {
+            if (etag && !data.error && !data.api_error) setCachedTable(validators, start_epoch, etag, data);
+            return data;
+        });
     })
     .then(data => {
+        if (data.format === 'columnar') data = decodeColumnarResult(data);
         console.log('Data received:', data);
         if (data.error) {
             console.error('Error in data:', data.error);
@@ -147,6 +248,11 @@ function fetchWithdrawalsData(preloadedValidators = null) {
             showError(data.api_error);
             return;
         }
+        // Still generating in the background: poll the job instead
+        if (data.job_id && !data.withdrawals) {
+            pollWithdrawalsJob(data.job_id, validators, lang);
+            return;
+        }
         renderWithdrawalsTable(data, validators);
         loadingContainer.classList.add('d-none');
         resultsContainer.classList.remove('d-none');
@@ -157,6 +263,148 @@ function fetchWithdrawalsData(preloadedValidators = null) {
     });
 }
 
+function pollWithdrawalsJob(jobId, validators, lang) {
+    const loadingContainer = document.getElementById('loading-container');
+    const resultsContainer = document.getElementById('results-container');
+    const loadingDetails = document.getElementById('loading-details');
+
+    fetch(`/webmux/api/jobs/${jobId}?lang=${lang}&format=columnar`, { credentials: 'same-origin' })
+    .then(response => response.json())
+    .then(job => {
+        if (job.error) {
+            showError(job.error);
+            return;
+        }
+        if (job.status !== 'done') {
+            if (loadingDetails) {
+                loadingDetails.textContent = lang === 'ru'
+                    ? `Загружено валидаторов: ${job.completed} из ${job.total}...`
+                    : `Loaded ${job.completed} of ${job.total} validators...`;
+            }
+            setTimeout(() => pollWithdrawalsJob(jobId, validators, lang), 2000);
+            return;
+        }
+        if (job.api_error) {
+            showError(job.api_error);
+            return;
+        }
+        renderWithdrawalsTable(decodeColumnarResult(job.result), validators);
+        loadingContainer.classList.add('d-none');
+        resultsContainer.classList.remove('d-none');
+    })
+    .catch(error => {
+        console.error('Error polling withdrawals job:', error);
+        showError(error.message || 'An unknown error occurred');
+    });
+}
+
+function streamWithdrawalsData(validators, lang, start_epoch) {
+    const loadingContainer = document.getElementById('loading-container');
+    const resultsContainer = document.getElementById('results-container');
+    const loadingDetails = document.getElementById('loading-details');
+
+    // Table state filled in as NDJSON events arrive
+    const data = {
+        withdrawals: {},
+        identities: {},
+        validator_ips: {},
+        validator_totals: {},
+        blocks: {},
+        grand_total: 0,
+        epoch_range: [],
+        current_epoch: null
+    };
+    let received = 0;
+
+    const handleEvent = event => {
+        if (event.type === 'start') {
+            data.current_epoch = event.current_epoch;
+            data.epoch_range = event.epoch_range;
+        } else if (event.type === 'row') {
+            received += 1;
+            if (event.identity) data.identities[event.validator] = event.identity;
+            if (event.server_ip) data.validator_ips[event.validator] = event.server_ip;
+            if (event.blocks !== null && event.blocks !== undefined) data.blocks[event.validator] = event.blocks;
+            if (event.withdrawals) {
+                data.withdrawals[event.validator] = event.withdrawals;
+                data.validator_totals[event.validator] = event.total;
+                data.grand_total += event.total;
+            }
+            if (loadingDetails) {
+                loadingDetails.textContent = lang === 'ru'
+                    ? `Загружено валидаторов: ${received} из ${validators.length}...`
+                    : `Loaded ${received} of ${validators.length} validators...`;
+            }
+            if (Object.keys(data.withdrawals).length) {
+                renderWithdrawalsTable(data, validators, true);
+                resultsContainer.classList.remove('d-none');
+            }
+        } else if (event.type === 'done') {
+            if (event.api_error) {
+                showError(event.api_error, { isWarning: Object.keys(data.withdrawals).length > 0 });
+            }
+            data.validator_totals = event.validator_totals;
+            data.grand_total = event.grand_total;
+            data.epoch_range = event.epoch_range;
+            data.yields = event.yields;
+            data.cell_stats = event.cell_stats;
+            console.log('Cells served:', event.cell_stats);
+            if (event.etag) setCachedTable(validators, start_epoch, `"${event.etag}"`, data);
+            renderWithdrawalsTable(data, validators);
+            loadingContainer.classList.add('d-none');
+            resultsContainer.classList.remove('d-none');
+        } else if (event.type === 'error') {
+            throw new Error(event.error);
+        }
+    };
+
+    fetch('/webmux/api/fetch_withdrawals/stream', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({
+            validators: validators,
+            fleet_id: currentFleetId(),
+            lang: lang,
+            start_epoch: start_epoch
+        }),
+        credentials: 'same-origin'
+    })
+    .then(response => {
+        if (response.status === 404) {
+            // Server without the streaming endpoint
+            return fetchWithdrawalsOnce(validators, lang, start_epoch);
+        }
+        if (!response.ok || !response.body) {
+            return response.json().then(errData => {
+                throw new Error(errData.error || `API error: ${response.status} ${response.statusText}`);
+            });
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+
+        const read = () => reader.read().then(({ done, value }) => {
+            buffer += decoder.decode(value || new Uint8Array(), { stream: !done });
+            const lines = buffer.split('\n');
+            buffer = lines.pop();
+            lines.filter(line => line.trim()).forEach(line => handleEvent(JSON.parse(line)));
+            if (done) {
+                if (buffer.trim()) handleEvent(JSON.parse(buffer));
+                return;
+            }
+            return read();
+        });
+        return read();
+    })
+    .catch(error => {
+        console.error('Error streaming withdrawals data:', error);
+        showError(error.message || 'An unknown error occurred');
+    });
+}
+
 function showError(message, options = {}) {
     const {
         isDebug = false,    // Режим отладки (показывать в console.error)
@@ -187,11 +435,15 @@ function showError(message, options = {}) {
     }
 }
 
-function renderWithdrawalsTable(data, originalValidatorsList) {
+function renderWithdrawalsTable(data, originalValidatorsList, partial = false) {
     const tableContainer = document.getElementById('withdrawals-table-container');
     if (!tableContainer) return;
     
     const { withdrawals, identities, validator_totals, grand_total, epoch_range, current_epoch, validator_ips } = data;
+    const blocks = data.blocks || {};
+    const yields = data.yields || {};
+    const apy = yields.apy || {};
+    const formatApy = value => value !== null && value !== undefined ? `${value.toFixed(2)}%` : '—';
     
     // Get translations from HTML data attributes
     const translations = {
@@ -199,7 +451,9 @@ function renderWithdrawalsTable(data, originalValidatorsList) {
         total: tableContainer.dataset.translatorTotal || 'TOTAL',
         grandTotal: tableContainer.dataset.translatorGrandTotal || 'GRAND TOTAL',
         epoch: tableContainer.dataset.translatorEpoch || 'Epoch',
-        noData: tableContainer.dataset.translatorNoData || 'No data available'
+        noData: tableContainer.dataset.translatorNoData || 'No data available',
+        blocks: tableContainer.dataset.translatorBlocks || 'Blocks',
+        apy: tableContainer.dataset.translatorApy || 'APY'
     };
 
     // Рассчитываем суммы по эпохам
@@ -249,11 +503,11 @@ function renderWithdrawalsTable(data, originalValidatorsList) {
         tableHtml += `<th class="${bgClass}">${epoch}</th>`;
     });
     
-    tableHtml += `<th class="bg-dark">${translations.total}</th></tr></thead><tbody>`;
+    tableHtml += `<th class="bg-dark">${translations.total}</th><th class="bg-dark">${translations.blocks}</th><th class="bg-dark">${translations.apy}</th></tr></thead><tbody>`;
     
     // Check if we have any data
     if (Object.keys(withdrawals).length === 0) {
-        tableHtml += `<tr><td colspan="${epoch_range.length + 2}" class="text-center">${translations.noData}</td></tr>`;
+        tableHtml += `<tr><td colspan="${epoch_range.length + 4}" class="text-center">${translations.noData}</td></tr>`;
     } else {
         // Iterate through validators
         originalValidatorsList.forEach(validator => {
@@ -273,7 +527,14 @@ function renderWithdrawalsTable(data, originalValidatorsList) {
             });
             
             const validatorTotal = validator_totals[validator] || 0;
-            tableHtml += `<td class="text-end bg-dark fw-bold">${(validatorTotal / 1000).toFixed(1)}</td></tr>`;
+            tableHtml += `<td class="text-end bg-dark fw-bold">${(validatorTotal / 1000).toFixed(1)}</td>`;
+            
+            // Blocks proposed in the current epoch
+            const validatorBlocks = blocks[validator];
+            tableHtml += `<td class="text-end bg-dark">${validatorBlocks !== null && validatorBlocks !== undefined ? validatorBlocks : '—'}</td>`;
+            
+            // Lifetime earnings over collateral per year since registration
+            tableHtml += `<td class="text-end bg-dark">${formatApy(apy[validator])}</td></tr>`;
         });
     }
     
@@ -289,7 +550,12 @@ function renderWithdrawalsTable(data, originalValidatorsList) {
         tableHtml += `<td class="text-end ${bgClass} fw-bold">${(epochTotals[epoch] / 1000).toFixed(1)}</td>`;
     });
     
-    tableHtml += `<td class="text-end fw-bold bg-dark">${(grand_total / 1000).toFixed(1)}</td></tr>
+    const totalBlocks = originalValidatorsList
+        .filter(validator => withdrawals[validator])
+        .reduce((sum, validator) => sum + (blocks[validator] || 0), 0);
+    tableHtml += `<td class="text-end fw-bold bg-dark">${(grand_total / 1000).toFixed(1)}</td>
+                <td class="text-end fw-bold bg-dark">${totalBlocks}</td>
+                <td class="text-end fw-bold bg-dark">${formatApy(yields.fleet_apy)}</td></tr>
         </tfoot>
         </table>
     </div>
@@ -300,9 +566,13 @@ function renderWithdrawalsTable(data, originalValidatorsList) {
     </div>`;
     
     tableContainer.innerHTML = tableHtml;
-    
-    // Initialize DataTable if available
-    if (typeof DataTable !== 'undefined') {
+    initTableControls(tableContainer, partial);
+}
+
+// DataTable and the copy button for a rendered table (by script.js or the server)
+function initTableControls(tableContainer, partial = false) {
+    // Initialize DataTable if available (once the table is complete)
+    if (!partial && typeof DataTable !== 'undefined') {
         try {
             new DataTable('table', {
                 paging: false,
@@ -0,0 +1,659 @@
+import os
+import re
+import json
+import glob
+import time
+import logging
+import sqlite3
+import threading
+from array import array
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS validators (
+    validator TEXT PRIMARY KEY,
+    identity TEXT,
+    server_ip TEXT,
+    updated_at REAL,
+    identity_balance INTEGER,
+    registered_height INTEGER,
+    collateral INTEGER,
+    fingerprint TEXT,
+    registered_time INTEGER
+);
+CREATE INDEX IF NOT EXISTS validators_identity ON validators (identity);
+CREATE TABLE IF NOT EXISTS epochs (
+    epoch INTEGER PRIMARY KEY,
+    start_time INTEGER NOT NULL,
+    end_time INTEGER NOT NULL,
+    first_block_height INTEGER
+);
+CREATE TABLE IF NOT EXISTS validator_blocks (
+    validator TEXT NOT NULL,
+    height INTEGER NOT NULL,
+    PRIMARY KEY (validator, height)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS withdrawals (
+    identity TEXT NOT NULL,
+    key TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    amount INTEGER NOT NULL,
+    epoch INTEGER,
+    PRIMARY KEY (identity, key)
+);
+CREATE INDEX IF NOT EXISTS withdrawals_identity_epoch ON withdrawals (identity, epoch);
+CREATE TABLE IF NOT EXISTS sync_state (
+    identity TEXT PRIMARY KEY,
+    watermark INTEGER,
+    synced_at INTEGER
+);
+CREATE TABLE IF NOT EXISTS legacy_epoch_totals (
+    validator TEXT NOT NULL,
+    epoch INTEGER NOT NULL,
+    amount INTEGER NOT NULL,
+    PRIMARY KEY (validator, epoch)
+);
+CREATE TABLE IF NOT EXISTS cache (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    PRIMARY KEY (kind, key)
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    key TEXT NOT NULL,
+    status TEXT NOT NULL,
+    validators TEXT NOT NULL,
+    start_epoch INTEGER NOT NULL,
+    current_epoch INTEGER,
+    completed INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_key ON jobs (key, status);
+CREATE TABLE IF NOT EXISTS job_rows (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    row TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS job_rows_job ON job_rows (job_id, seq);
+CREATE TABLE IF NOT EXISTS fleets (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    validators TEXT NOT NULL,
+    start_epoch INTEGER,
+    created_at REAL NOT NULL,
+    used_at REAL NOT NULL,
+    warmed_at REAL
+);
+CREATE INDEX IF NOT EXISTS fleets_used ON fleets (used_at);
+"""
+
+# Job states; queued and running jobs count as in flight
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+# Columns added after a table was first created, added on open when missing
+ADDED_COLUMNS = {
+    "sync_state": {"synced_at": "INTEGER"},
+    "epochs": {"first_block_height": "INTEGER"},
+    "validators": {
+        "identity_balance": "INTEGER",
+        "registered_height": "INTEGER",
+        "collateral": "INTEGER",
+        "fingerprint": "TEXT",
+        "registered_time": "INTEGER",
+    },
+}
+
+# Withdrawal amounts are in duffs; the table shows them divided by this
+AMOUNT_DIVISOR = 100000000
+
+
+class Store:
+    """Single embedded SQLite (WAL) store for validators, epochs and withdrawals.
+
+    Connections are per thread; WAL lets gunicorn workers read while one
+    of them writes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+            for table, added in ADDED_COLUMNS.items():
+                columns = {row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+                for column, column_type in added.items():
+                    if column not in columns:
+                        self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
+    @property
+    def conn(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    # Meta
+
+    def get_meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    # Validators
+
+    def upsert_validator(self, validator, identity, server_ip):
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO validators (validator, identity, server_ip, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (validator) DO UPDATE SET identity = excluded.identity, "
+                "server_ip = COALESCE(excluded.server_ip, validators.server_ip), updated_at = excluded.updated_at, "
+                "fingerprint = NULL",
+                (validator, identity, server_ip, time.time())
+            )
+
+    def get_validator_fingerprints(self):
+        rows = self.conn.execute("SELECT validator, fingerprint FROM validators WHERE fingerprint IS NOT NULL").fetchall()
+        return dict(rows)
+
+    def upsert_validator_records(self, records):
+        """Insert or update full registry records (dicts with the validators columns)"""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO validators (validator, identity, server_ip, identity_balance, registered_height, "
+                "collateral, fingerprint, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (validator) DO UPDATE SET identity = excluded.identity, server_ip = excluded.server_ip, "
+                "registered_time = CASE WHEN validators.registered_height IS excluded.registered_height "
+                "THEN validators.registered_time END, "
+                "identity_balance = excluded.identity_balance, registered_height = excluded.registered_height, "
+                "collateral = excluded.collateral, fingerprint = excluded.fingerprint, updated_at = excluded.updated_at",
+                [
+                    (record["validator"], record["identity"], record["server_ip"], record["identity_balance"],
+                     record["registered_height"], record["collateral"], record["fingerprint"], now)
+                    for record in records
+                ]
+            )
+
+    def get_validator_records(self, validators):
+        """Get {validator: record dict} with every registry column"""
+        rows = self.conn.execute(
+            f"SELECT validator, identity, server_ip, identity_balance, registered_height, collateral, updated_at, "
+            f"registered_time FROM validators WHERE validator IN ({placeholders(validators)})",
+            list(validators)
+        ).fetchall()
+        return {
+            row[0]: {
+                "identity": row[1],
+                "server_ip": row[2],
+                "identity_balance": row[3],
+                "registered_height": row[4],
+                "collateral": row[5],
+                "updated_at": row[6],
+                "registered_time": row[7]
+            }
+            for row in rows
+        }
+
+    def set_registered_times(self, pairs):
+        """Record (validator, registration block time in seconds) pairs"""
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE validators SET registered_time = ? WHERE validator = ?",
+                [(registered_time, validator) for validator, registered_time in pairs]
+            )
+
+    # Epochs
+
+    def load_epochs(self):
+        """Load closed epochs as sorted (epoch, start_time, end_time, first_block_height) rows"""
+        return self.conn.execute(
+            "SELECT epoch, start_time, end_time, first_block_height FROM epochs ORDER BY epoch"
+        ).fetchall()
+
+    def add_epochs(self, rows):
+        """Add (epoch, start_time, end_time, first_block_height) rows"""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO epochs (epoch, start_time, end_time, first_block_height) VALUES (?, ?, ?, ?)",
+                rows
+            )
+
+    def set_epoch_first_blocks(self, pairs):
+        """Fill in first_block_height for (epoch, height) pairs"""
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE epochs SET first_block_height = ? WHERE epoch = ?",
+                [(height, epoch) for epoch, height in pairs]
+            )
+
+    # Proposed blocks
+
+    def load_block_heights(self, validator):
+        rows = self.conn.execute(
+            "SELECT height FROM validator_blocks WHERE validator = ? ORDER BY height", (validator,)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def add_block_heights(self, validator, heights):
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO validator_blocks (validator, height) VALUES (?, ?)",
+                [(validator, height) for height in heights]
+            )
+
+    # Withdrawals
+
+    def get_watermark(self, identity):
+        row = self.conn.execute("SELECT watermark FROM sync_state WHERE identity = ?", (identity,)).fetchone()
+        return row[0] if row else None
+
+    def load_withdrawals(self, identity):
+        rows = self.conn.execute(
+            "SELECT key, timestamp, amount FROM withdrawals WHERE identity = ? ORDER BY timestamp",
+            (identity,)
+        ).fetchall()
+        return [{"key": key, "timestamp": timestamp, "amount": amount} for key, timestamp, amount in rows]
+
+    def get_sync_times(self, identities):
+        """Get {identity: synced_at (ms)} for identities synced at least once"""
+        rows = self.conn.execute(
+            f"SELECT identity, synced_at FROM sync_state WHERE identity IN ({placeholders(identities)})",
+            list(identities)
+        ).fetchall()
+        return {identity: synced_at or 0 for identity, synced_at in rows}
+
+    def synced_validators(self, validators=None):
+        """Validators whose withdrawal history has been synced at least once (all of them if validators is None)"""
+        query = "SELECT v.validator FROM validators v JOIN sync_state s ON s.identity = v.identity"
+        if validators is None:
+            return [row[0] for row in self.conn.execute(query).fetchall()]
+        rows = self.conn.execute(f"{query} WHERE v.validator IN ({placeholders(validators)})", list(validators)).fetchall()
+        synced = {row[0] for row in rows}
+        return [validator for validator in validators if validator in synced]
+
+    def add_withdrawals(self, identity, records, watermark):
+        """Insert new withdrawal records and record the sync in one transaction.
+
+        The sync time is recorded even when nothing was found, so an empty
+        history counts as known rather than unknown.
+        """
+        with self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO withdrawals (identity, key, timestamp, amount) VALUES (?, ?, ?, ?)",
+                [(identity, record['key'], record['timestamp'], record['amount']) for record in records]
+            )
+            added = self.conn.total_changes - before
+            self.conn.execute(
+                "INSERT INTO sync_state (identity, watermark, synced_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (identity) DO UPDATE SET "
+                "watermark = COALESCE(excluded.watermark, sync_state.watermark), synced_at = excluded.synced_at",
+                (identity, watermark, int(time.time() * 1000))
+            )
+        return added
+
+    def assign_epochs(self, epoch_for, identity=None):
+        """Fill in the epoch of withdrawals stored before their epoch was known"""
+        if identity is None:
+            rows = self.conn.execute("SELECT rowid, timestamp FROM withdrawals WHERE epoch IS NULL").fetchall()
+        else:
+            rows = self.conn.execute(
+                "SELECT rowid, timestamp FROM withdrawals WHERE identity = ? AND epoch IS NULL", (identity,)
+            ).fetchall()
+        updates = [(epoch, rowid) for rowid, epoch in ((rowid, epoch_for(ts)) for rowid, ts in rows) if epoch is not None]
+        if updates:
+            with self.conn:
+                self.conn.executemany("UPDATE withdrawals SET epoch = ? WHERE rowid = ?", updates)
+        return len(updates)
+
+    def withdrawal_matrix(self, validators, start_epoch, end_epoch):
+        """Load {validator: {epoch: amount}} for a validator set in one query.
+
+        Validators whose identity has never been synced fall back to totals
+        migrated from the legacy per-cell cache files.
+        """
+        marks = placeholders(validators)
+        rows = self.conn.execute(
+            f"""
+            SELECT v.validator, w.epoch, SUM(w.amount)
+            FROM validators v JOIN withdrawals w ON w.identity = v.identity
+            WHERE v.validator IN ({marks}) AND w.epoch BETWEEN ? AND ?
+            GROUP BY v.validator, w.epoch
+            UNION ALL
+            SELECT t.validator, t.epoch, t.amount
+            FROM legacy_epoch_totals t
+            LEFT JOIN validators v ON v.validator = t.validator
+            LEFT JOIN sync_state s ON s.identity = v.identity
+            WHERE t.validator IN ({marks}) AND t.epoch BETWEEN ? AND ? AND s.identity IS NULL
+            """,
+            [*validators, start_epoch, end_epoch, *validators, start_epoch, end_epoch]
+        ).fetchall()
+        matrix = {}
+        for validator, epoch, amount in rows:
+            matrix.setdefault(validator, {})[epoch] = amount / AMOUNT_DIVISOR
+        return matrix
+
+    def data_version(self, validators):
+        """Get (version, last_modified_ms) of the stored data behind a validator set's table.
+
+        The version changes whenever withdrawals, their epoch assignment,
+        registry fields or proposed blocks of these validators change.
+        """
+        marks = placeholders(validators)
+        withdrawn = self.conn.execute(
+            f"SELECT COUNT(*), COUNT(w.epoch), COALESCE(SUM(w.amount), 0), COALESCE(MAX(w.timestamp), 0) "
+            f"FROM validators v JOIN withdrawals w ON w.identity = v.identity WHERE v.validator IN ({marks})",
+            validators
+        ).fetchone()
+        registered = self.conn.execute(
+            f"SELECT COUNT(*), COALESCE(MAX(updated_at), 0), COUNT(registered_time) FROM validators WHERE validator IN ({marks})",
+            validators
+        ).fetchone()
+        blocks = self.conn.execute(
+            f"SELECT COUNT(*) FROM validator_blocks WHERE validator IN ({marks})", validators
+        ).fetchone()
+        last_modified = max(withdrawn[3], int(registered[1] * 1000))
+        return [*withdrawn, *registered, *blocks], last_modified
+
+    def withdrawal_totals(self, validators):
+        """Get {validator: lifetime withdrawn amount} from the synced histories"""
+        rows = self.conn.execute(
+            f"SELECT v.validator, SUM(w.amount) FROM validators v JOIN withdrawals w ON w.identity = v.identity "
+            f"WHERE v.validator IN ({placeholders(validators)}) GROUP BY v.validator",
+            list(validators)
+        ).fetchall()
+        return dict(rows)
+
+    def legacy_cells(self, validators, start_epoch, end_epoch):
+        """(validator, epoch) pairs known from the legacy per-cell cache, zeros included"""
+        rows = self.conn.execute(
+            f"SELECT validator, epoch FROM legacy_epoch_totals "
+            f"WHERE validator IN ({placeholders(validators)}) AND epoch BETWEEN ? AND ?",
+            [*validators, start_epoch, end_epoch]
+        ).fetchall()
+        return set(rows)
+
+    # Cache entries
+
+    def cache_get(self, kind, key):
+        row = self.conn.execute("SELECT value, stored_at FROM cache WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def cache_set(self, kind, key, value, stored_at):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO cache (kind, key, value, stored_at) VALUES (?, ?, ?, ?)",
+                (kind, key, json.dumps(value), stored_at)
+            )
+
+    # Jobs
+
+    def claim_job(self, job_id, key, validators, start_epoch, stale_before):
+        """Return (id, created): an in-flight job with this key, or a new queued one.
+
+        The lookup and insert share one write transaction so concurrent
+        workers cannot both create a job for the same key.
+        """
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE key = ? AND status IN (?, ?) AND updated_at >= ? "
+                "ORDER BY created_at DESC LIMIT 1",
+                (key, JOB_QUEUED, JOB_RUNNING, stale_before)
+            ).fetchone()
+            if row:
+                conn.commit()
+                return row[0], False
+            now = time.time()
+            conn.execute(
+                "INSERT INTO jobs (id, key, status, validators, start_epoch, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, key, JOB_QUEUED, json.dumps(validators), start_epoch, now, now)
+            )
+            conn.commit()
+            return job_id, True
+        except Exception:
+            conn.rollback()
+            raise
+
+    def update_job(self, job_id, **fields):
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self.conn:
+            self.conn.execute(
+                f"UPDATE jobs SET {assignments}, updated_at = ? WHERE id = ?",
+                [*fields.values(), time.time(), job_id]
+            )
+
+    def touch_job(self, job_id):
+        """Record that an in-flight job is still alive"""
+        with self.conn:
+            self.conn.execute("UPDATE jobs SET updated_at = ? WHERE id = ?", (time.time(), job_id))
+
+    def add_job_row(self, job_id, row):
+        """Append a finished row to a job and count it as completed"""
+        with self.conn:
+            self.conn.execute("INSERT INTO job_rows (job_id, row) VALUES (?, ?)", (job_id, json.dumps(row)))
+            self.conn.execute(
+                "UPDATE jobs SET completed = completed + 1, updated_at = ? WHERE id = ?",
+                (time.time(), job_id)
+            )
+
+    def get_job(self, job_id):
+        row = self.conn.execute(
+            "SELECT id, status, validators, start_epoch, current_epoch, completed, result, error, created_at, updated_at "
+            "FROM jobs WHERE id = ?",
+            (job_id,)
+        ).fetchone()
+        if not row:
+            return None
+        return {
+            "id": row[0],
+            "status": row[1],
+            "validators": json.loads(row[2]),
+            "start_epoch": row[3],
+            "current_epoch": row[4],
+            "completed": row[5],
+            "result": json.loads(row[6]) if row[6] else None,
+            "error": row[7],
+            "created_at": row[8],
+            "updated_at": row[9]
+        }
+
+    def latest_job_id(self, key, status):
+        """Id of the newest job with this key and status, or None"""
+        row = self.conn.execute(
+            "SELECT id FROM jobs WHERE key = ? AND status = ? ORDER BY updated_at DESC LIMIT 1", (key, status)
+        ).fetchone()
+        return row[0] if row else None
+
+    def get_job_rows(self, job_id, since=0):
+        """Get [(seq, row)] appended to a job after seq since"""
+        rows = self.conn.execute(
+            "SELECT seq, row FROM job_rows WHERE job_id = ? AND seq > ? ORDER BY seq",
+            (job_id, since)
+        ).fetchall()
+        return [(seq, json.loads(row)) for seq, row in rows]
+
+    def purge_jobs(self, before):
+        """Delete jobs (and their rows) last updated before a timestamp"""
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM job_rows WHERE job_id IN (SELECT id FROM jobs WHERE updated_at < ?)", (before,)
+            )
+            self.conn.execute("DELETE FROM jobs WHERE updated_at < ?", (before,))
+
+    # Fleets
+
+    def save_fleet(self, fleet_id, validators, name=None, start_epoch=None):
+        """Create a fleet or mark an existing one used, keeping its name and start epoch unless given"""
+        now = time.time()
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO fleets (id, name, validators, start_epoch, created_at, used_at) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET name = COALESCE(excluded.name, fleets.name), "
+                "start_epoch = COALESCE(excluded.start_epoch, fleets.start_epoch), used_at = excluded.used_at",
+                (fleet_id, name, json.dumps(validators), start_epoch, now, now)
+            )
+
+    def get_fleet(self, fleet_id):
+        row = self.conn.execute(
+            "SELECT id, name, validators, start_epoch, created_at, used_at, warmed_at FROM fleets WHERE id = ?",
+            (fleet_id,)
+        ).fetchone()
+        return fleet_from_row(row) if row else None
+
+    def touch_fleet(self, fleet_id):
+        with self.conn:
+            self.conn.execute("UPDATE fleets SET used_at = ? WHERE id = ?", (time.time(), fleet_id))
+
+    def active_fleets(self, used_after):
+        """Fleets used since a timestamp, most recently used first"""
+        rows = self.conn.execute(
+            "SELECT id, name, validators, start_epoch, created_at, used_at, warmed_at FROM fleets "
+            "WHERE used_at >= ? ORDER BY used_at DESC",
+            (used_after,)
+        ).fetchall()
+        return [fleet_from_row(row) for row in rows]
+
+    def set_fleet_warmed(self, fleet_id, warmed_at):
+        with self.conn:
+            self.conn.execute("UPDATE fleets SET warmed_at = ? WHERE id = ?", (warmed_at, fleet_id))
+
+    # Migration
+
+    def migrate_legacy_files(self, save_dir):
+        """Import the ~/tmp cache files written by earlier versions (runs once)"""
+        if self.get_meta("legacy_files_migrated"):
+            return
+        logger.info(f"Migrating legacy cache files from {save_dir}")
+        validators = {}
+        totals = []
+
+        # identities.txt holds "validator: identity" lines
+        identities_file = os.path.join(save_dir, "identities.txt")
+        if os.path.exists(identities_file):
+            with open(identities_file, 'r') as f:
+                for line in f:
+                    if ':' in line:
+                        validator, identity = (part.strip() for part in line.split(':', 1))
+                        validators.setdefault(validator, [None, None])[0] = identity
+
+        ip_files = glob.glob(os.path.join(save_dir, "validator_ip_*.txt"))
+        for path in ip_files:
+            validator = os.path.basename(path)[len("validator_ip_"):-len(".txt")]
+            with open(path, 'r') as f:
+                validators.setdefault(validator, [None, None])[1] = f.read().strip() or None
+
+        # Cells whose amount is an API error marker are left in place, as are unreadable ones
+        cell_files = []
+        for path in glob.glob(os.path.join(save_dir, "withdrawal_*_*.json")):
+            try:
+                with open(path, 'r') as f:
+                    validator, epoch, amount = parse_legacy_cell(f.read())
+            except Exception as e:
+                logger.warning(f"Skipping unreadable cache file {path}: {e}")
+                continue
+            if amount is not None:
+                totals.append((validator, epoch, int(round(amount * AMOUNT_DIVISOR))))
+                cell_files.append(path)
+
+        # Withdrawal history and watermarks from the JSON-lines store
+        history = []
+        watermarks = {}
+        withdrawals_dir = os.path.join(save_dir, "withdrawals")
+        watermarks_file = os.path.join(withdrawals_dir, "watermarks.json")
+        if os.path.exists(watermarks_file):
+            with open(watermarks_file, 'r') as f:
+                watermarks = json.load(f)
+        for path in glob.glob(os.path.join(withdrawals_dir, "*.jsonl")):
+            identity = os.path.basename(path)[:-len(".jsonl")]
+            with open(path, 'r') as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        history.append((identity, record['key'], record['timestamp'], record['amount']))
+
+        epoch_rows = []
+        epoch_index_file = os.path.join(save_dir, "epoch_index.bin")
+        if os.path.exists(epoch_index_file):
+            data = array('q')
+            with open(epoch_index_file, 'rb') as f:
+                data.frombytes(f.read())
+            epoch_rows = list(zip(data[0::3], data[1::3], data[2::3]))
+
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO validators (validator, identity, server_ip, updated_at) VALUES (?, ?, ?, 0)",
+                [(validator, identity, server_ip) for validator, (identity, server_ip) in validators.items()
+                 if re.fullmatch(r'[0-9a-fA-F]+', validator)]
+            )
+            self.conn.executemany("INSERT OR IGNORE INTO legacy_epoch_totals (validator, epoch, amount) VALUES (?, ?, ?)", totals)
+            self.conn.executemany("INSERT OR IGNORE INTO withdrawals (identity, key, timestamp, amount) VALUES (?, ?, ?, ?)", history)
+            self.conn.executemany("INSERT OR IGNORE INTO sync_state (identity, watermark, synced_at) VALUES (?, ?, 0)", list(watermarks.items()))
+            self.conn.executemany("INSERT OR IGNORE INTO epochs (epoch, start_time, end_time) VALUES (?, ?, ?)", epoch_rows)
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_files_migrated', ?)", (str(time.time()),))
+
+        # The per-item files are the problem being solved, drop them once imported
+        for path in ip_files + cell_files:
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning(f"Could not remove migrated file {path}: {e}")
+        logger.info(f"Migrated {len(validators)} validators, {len(totals)} epoch totals, "
+                    f"{len(history)} withdrawals and {len(epoch_rows)} epochs")
+
+
+def parse_legacy_cell(content):
+    """(validator, epoch, amount) from a legacy withdrawal cell file; amount is None for an error marker.
+
+    save_cached_data wrote the tuple as three lines; a JSON array is
+    accepted too.
+    """
+    content = content.strip()
+    if content.startswith('['):
+        validator, epoch, amount = json.loads(content)
+    else:
+        validator, epoch, amount = (line.strip() for line in content.splitlines())
+    try:
+        amount = float(amount)
+    except (TypeError, ValueError):
+        amount = None
+    return validator, int(epoch), amount
+
+
+def placeholders(values):
+    """SQL placeholder list for an IN clause"""
+    return ', '.join('?' * len(values))
+
+
+def fleet_from_row(row):
+    """Fleet dict from a fleets row"""
+    return {
+        "id": row[0],
+        "name": row[1],
+        "validators": json.loads(row[2]),
+        "start_epoch": row[3],
+        "created_at": row[4],
+        "used_at": row[5],
+        "warmed_at": row[6]
+    }
@@ -0,0 +1,81 @@
+import json
+import hashlib
+import logging
+
+from flask import render_template
+
+from cache import MISSING
+from utils import cache, store, get_current_epoch
+from jobs import job_queue
+from async_engine import fleet_is_fresh
+from withdrawal_matrix import WithdrawalMatrix
+
+logger = logging.getLogger(__name__)
+
+FRAGMENT_KIND = "table_fragment"
+FRAGMENT_TEMPLATE = "_withdrawals_table.html"
+
+
+def fragment_key(validators, start_epoch, lang, current_epoch):
+    """Cache key from the validator set, start epoch, language and the stored data version.
+
+    Rows follow the submitted order, so the order is part of the key too.
+    """
+    version, _ = store.data_version(sorted(set(validators)))
+    payload = json.dumps([sorted(set(validators)), start_epoch, lang, current_epoch, version, validators])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def table_context(fleet):
+    """Rows and totals of a finished job's table, in the shape the fragment template reads"""
+    matrix = WithdrawalMatrix.from_columnar(fleet["withdrawals"])
+    apy = (fleet.get("yields") or {}).get("apy") or {}
+    rows = []
+    for validator, amounts in zip(matrix.validators, matrix.values.tolist()):
+        rows.append({
+            "name": fleet["validator_ips"].get(validator) or fleet["identities"].get(validator) or validator[:8] + "...",
+            "amounts": amounts,
+            "total": fleet["validator_totals"].get(validator, 0),
+            "blocks": fleet["blocks"].get(validator),
+            "apy": apy.get(validator)
+        })
+    return {
+        "epochs": matrix.epochs.tolist(),
+        "rows": rows,
+        "epoch_totals": matrix.column_totals().tolist(),
+        "grand_total": fleet["grand_total"],
+        "total_blocks": sum(row["blocks"] or 0 for row in rows),
+        "fleet_apy": (fleet.get("yields") or {}).get("fleet_apy")
+    }
+
+
+def cached_table_fragment(validators, start_epoch, lang, translations):
+    """Rendered table for a fleet whose data is up to date, or None to leave it to script.js.
+
+    A fleet that would need syncing is never served from here, so a stale
+    table is not shown; new data changes the key, which invalidates it.
+    Nothing is built here: a missing fragment is rendered from a job that
+    already finished on the current data, otherwise script.js fetches it.
+    """
+    if not fleet_is_fresh(validators):
+        return None
+
+    current_epoch = get_current_epoch()
+    key = fragment_key(validators, start_epoch, lang, current_epoch)
+    fragment = cache.get(FRAGMENT_KIND, key)
+    if fragment is not MISSING:
+        logger.debug(f"Serving cached table for {len(validators)} validators")
+        return fragment
+
+    job = job_queue.latest_done(validators, start_epoch)
+    if job is None or job["validators"] != validators or job["result"]["api_errors"]:
+        return None
+    if job["result"]["current_epoch"] != current_epoch:
+        return None
+    _, last_modified = store.data_version(sorted(set(validators)))
+    if job["updated_at"] * 1000 < last_modified:
+        return None  # finished before the stored data last changed
+
+    fragment = render_template(FRAGMENT_TEMPLATE, table=table_context(job["result"]), translations=translations)
+    cache.set(FRAGMENT_KIND, key, fragment)
+    return fragment
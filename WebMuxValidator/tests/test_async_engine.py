@@ -0,0 +1,144 @@
+import os
+import sys
+import json
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+# The engine reads its API base and data directory at import time, so the stub is set up first
+HOME = tempfile.mkdtemp()
+os.environ["HOME"] = HOME
+os.environ["PLATFORM_API_RATE"] = "1000"
+os.environ["PLATFORM_API_BURST"] = "1000"
+
+# Stub network: 1-hour epochs with epoch 8 still open
+EPOCH_MS = 3600 * 1000
+BASE_MS = 1_700_000_000_000
+CURRENT_EPOCH = 8
+VALIDATORS = {f"{i:064x}": f"ID{i}" for i in (1, 2)}
+
+
+def epoch_bounds(epoch):
+    start = BASE_MS + (epoch - 1) * EPOCH_MS
+    return start, start + EPOCH_MS - 1
+
+
+def iso(timestamp_ms):
+    return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+# Two completed withdrawals per identity in epochs 6 and 7, plus an expired one that must be ignored
+WITHDRAWALS = {
+    identity: [
+        {"id": f"{identity}-{epoch}", "timestamp": iso(epoch_bounds(epoch)[0] + 1000), "amount": n * epoch * 10**8, "status": 3}
+        for epoch in (6, 7)
+    ] + [{"id": f"{identity}-x", "timestamp": iso(epoch_bounds(7)[0] + 2000), "amount": 10**12, "status": 4}]
+    for n, identity in enumerate(VALIDATORS.values(), start=1)
+}
+
+
+class StubPlatformAPI(BaseHTTPRequestHandler):
+    """The explorer endpoints the engine reads, served from the tables above"""
+
+    status = {"epoch": {"number": CURRENT_EPOCH}}
+    calls = []
+
+    def log_message(self, *args):
+        pass
+
+    def send(self, payload, code=200):
+        body = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def page(self, items, query):
+        page = int(query.get("page", ["1"])[0])
+        limit = int(query.get("limit", ["10"])[0])
+        if query.get("order", ["asc"])[0] == "desc":
+            items = items[::-1]
+        return {"resultSet": items[(page - 1) * limit:page * limit], "pagination": {"total": len(items)}}
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        parts = url.path.strip("/").split("/")
+        self.calls.append(url.path)
+        if parts == ["status"]:
+            return self.send(self.status)
+        if parts[0] == "epoch":
+            start, end = epoch_bounds(int(parts[1]))
+            return self.send({"epoch": {"startTime": start, "endTime": end, "firstBlockHeight": int(parts[1]) * 100}})
+        if parts == ["validators"]:
+            return self.send(self.page([
+                {"proTxHash": validator, "identity": identity, "proTxInfo": {"state": {"service": "10.0.0.1:443"}}}
+                for validator, identity in VALIDATORS.items()
+            ], query))
+        if parts[0] == "validator" and parts[-1] == "blocks":
+            return self.send(self.page([{"header": {"height": 750}}], query))
+        if parts[0] == "identity":
+            return self.send(self.page(WITHDRAWALS[parts[1]], query))
+        self.send({"error": "not found"}, 404)
+
+
+server = ThreadingHTTPServer(("127.0.0.1", 0), StubPlatformAPI)
+os.environ["PLATFORM_API_BASE"] = f"http://127.0.0.1:{server.server_port}"
+os.environ["INSIGHT_API_BASE"] = f"http://127.0.0.1:{server.server_port}/insight-api"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import cache, store  # noqa: E402
+from async_engine import fetch_fleet_withdrawals  # noqa: E402
+
+
+def expire_status():
+    """Forget the cached current epoch so the next fetch asks /status again"""
+    store.cache_set("status", "current_epoch", CURRENT_EPOCH, 0)
+    cache.invalidate("status", "current_epoch")
+
+
+class FleetWithdrawalsTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        server.shutdown()
+
+    def setUp(self):
+        StubPlatformAPI.status = {"epoch": {"number": CURRENT_EPOCH}}
+        StubPlatformAPI.calls.clear()
+        expire_status()
+
+    def test_fleet_table_from_stub(self):
+        fleet = fetch_fleet_withdrawals(list(VALIDATORS), 6)
+        self.assertEqual(fleet["api_errors"], [])
+        self.assertEqual(fleet["current_epoch"], CURRENT_EPOCH)
+        self.assertEqual(fleet["identities"], VALIDATORS)
+        for n, validator in enumerate(VALIDATORS, start=1):
+            self.assertEqual(fleet["withdrawals"][validator], {6: 6 * n, 7: 7 * n})
+
+    def test_fresh_history_is_not_refetched(self):
+        fetch_fleet_withdrawals(list(VALIDATORS), 6)
+        StubPlatformAPI.calls.clear()
+        fleet = fetch_fleet_withdrawals(list(VALIDATORS), 6)
+        self.assertFalse([path for path in StubPlatformAPI.calls if path.startswith("/identity/")])
+        self.assertEqual(fleet["cell_stats"]["fetched"], 0)
+        self.assertEqual(fleet["withdrawals"][list(VALIDATORS)[0]], {6: 6, 7: 7})
+
+    def test_status_without_epoch_is_an_api_error(self):
+        StubPlatformAPI.status = {}
+        fleet = fetch_fleet_withdrawals(list(VALIDATORS), 6)
+        self.assertIsNone(fleet["current_epoch"])
+        self.assertTrue(fleet["api_errors"])
+        self.assertEqual(fleet["withdrawals"], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
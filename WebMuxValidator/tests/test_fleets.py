@@ -0,0 +1,36 @@
+import os
+import sys
+import tempfile
+import unittest
+
+os.environ["HOME"] = tempfile.mkdtemp()
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import store  # noqa: E402
+from fleets import fleet_id, save_fleet, use_fleet  # noqa: E402
+
+
+class FleetOwnershipTest(unittest.TestCase):
+
+    def test_api_use_does_not_create_a_fleet(self):
+        validators = ["a1", "a2"]
+        self.assertIsNone(use_fleet(validators))
+        self.assertIsNone(store.get_fleet(fleet_id(validators)))
+
+        fleet, created = save_fleet(validators, "Mine", 6)
+        self.assertTrue(created)
+        self.assertEqual(use_fleet(validators), fleet)
+
+    def test_only_the_owner_renames(self):
+        validators = ["b1", "b2"]
+        fleet, created = save_fleet(validators, "Original", 6)
+        self.assertTrue(created)
+
+        self.assertEqual(save_fleet(validators, "Hijacked", 9), (fleet, False))
+        self.assertEqual(store.get_fleet(fleet)["name"], "Original")
+
+        save_fleet(validators, "Renamed", None, owned=[fleet])
+        self.assertEqual(store.get_fleet(fleet)["name"], "Renamed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from store import Store  # noqa: E402
+from withdrawal_store import WithdrawalStore  # noqa: E402
+
+
+class LegacyMigrationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.save_dir = tempfile.mkdtemp()
+        self.store = Store(os.path.join(self.save_dir, "webmux.sqlite3"))
+
+    def write(self, name, content):
+        with open(os.path.join(self.save_dir, name), 'w') as f:
+            f.write(content)
+
+    def test_cell_files_are_imported_and_removed(self):
+        self.write("withdrawal_aa_12.json", "aa\n12\n3.5")  # as save_cached_data wrote them
+        self.write("withdrawal_bb_7.json", '["bb", 7, 1.25]')
+        self.store.migrate_legacy_files(self.save_dir)
+
+        self.assertEqual(self.store.legacy_cells(["aa", "bb"], 1, 20), {("aa", 12), ("bb", 7)})
+        amounts = self.store.conn.execute("SELECT validator, amount FROM legacy_epoch_totals").fetchall()
+        self.assertEqual(sorted(amounts), [("aa", 350000000), ("bb", 125000000)])
+        self.assertFalse(os.path.exists(os.path.join(self.save_dir, "withdrawal_aa_12.json")))
+
+    def test_unimported_cell_files_are_kept(self):
+        self.write("withdrawal_cc_8.json", "cc\n8\nAPI_CONNECTION_ERROR")
+        self.write("withdrawal_dd_9.json", "garbage")
+        self.store.migrate_legacy_files(self.save_dir)
+
+        self.assertEqual(self.store.legacy_cells(["cc", "dd"], 1, 20), set())
+        self.assertTrue(os.path.exists(os.path.join(self.save_dir, "withdrawal_cc_8.json")))
+        self.assertTrue(os.path.exists(os.path.join(self.save_dir, "withdrawal_dd_9.json")))
+
+
+class SyncedValidatorsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.store = Store(os.path.join(tempfile.mkdtemp(), "webmux.sqlite3"))
+
+    def test_registry_rows_are_not_synced_validators(self):
+        record = {"identity_balance": None, "registered_height": None, "collateral": None, "fingerprint": "f"}
+        self.store.upsert_validator_records([
+            {**record, "validator": "aa", "identity": "ID1", "server_ip": None},
+            {**record, "validator": "bb", "identity": "ID2", "server_ip": None}
+        ])
+        self.store.add_withdrawals("ID2", [], None)
+
+        self.assertEqual(self.store.synced_validators(), ["bb"])
+        self.assertEqual(self.store.synced_validators(["aa", "bb"]), ["bb"])
+
+
+class WithdrawalKeyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.withdrawals = WithdrawalStore(Store(os.path.join(tempfile.mkdtemp(), "webmux.sqlite3")))
+
+    def sync(self, page):
+        sync = self.withdrawals.begin_sync("ID1")
+        sync.add_page(page)
+        return sync.commit()
+
+    def test_equal_withdrawals_without_id_are_both_kept(self):
+        twin = {"timestamp": "2024-01-01T00:00:00Z", "amount": 5, "status": 3}
+        history = self.sync({"resultSet": [twin, twin], "pagination": {"total": 2}})
+        self.assertEqual(sorted(record["key"] for record in history), ["ID1:0", "ID1:1"])
+
+    def test_withdrawal_without_stable_key_is_retried(self):
+        page = {"resultSet": [{"timestamp": "2024-01-01T00:00:00Z", "amount": 5, "status": 3}]}
+        self.assertEqual(self.sync(page), [])
+        self.assertEqual(self.withdrawals.watermark("ID1"), 1704067200000)
+
+
+class JobHeartbeatTest(unittest.TestCase):
+
+    def setUp(self):
+        self.store = Store(os.path.join(tempfile.mkdtemp(), "webmux.sqlite3"))
+
+    def test_touched_job_is_joined_and_silent_one_replaced(self):
+        job_id, created = self.store.claim_job("j1", "key", ["aa"], 6, 0)
+        self.assertTrue(created)
+
+        self.store.conn.execute("UPDATE jobs SET updated_at = 100 WHERE id = ?", (job_id,))
+        self.store.conn.commit()
+        self.store.touch_job(job_id)
+        self.assertEqual(self.store.claim_job("j2", "key", ["aa"], 6, 200), ("j1", False))
+
+        self.store.conn.execute("UPDATE jobs SET updated_at = 100 WHERE id = ?", (job_id,))
+        self.store.conn.commit()
+        self.assertEqual(self.store.claim_job("j3", "key", ["aa"], 6, 200), ("j3", True))
+
+
+if __name__ == "__main__":
+    unittest.main()
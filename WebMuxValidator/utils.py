@@ -1,25 +1,62 @@
 import os
 import json
 import time
-import requests
 import logging
-from datetime import datetime
+
+from http_client import platform_client
+from store import Store
+from cache import TieredCache, MISSING
+from epoch_index import FIRST_EPOCH, EpochIndex
+from withdrawal_store import WithdrawalStore
+from singleflight import SingleFlight
+from validator_registry import ValidatorRegistry, parse_validator_record
+from blocks import BlockIndex
+from apy import build_inputs, compute_yields, yields_to_json
+from withdrawal_matrix import WithdrawalMatrix
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-# API Endpoints
-PLATFORM_API_BASE = "https://platform-explorer.pshenmic.dev"
-
 # Constants
 SAVE_DIR = os.path.join(os.path.expanduser("~"), "tmp")
 os.makedirs(SAVE_DIR, exist_ok=True)
 
-EPOCH_INTERVALS_FILE = os.path.join(SAVE_DIR, "epoch_intervals.txt")
+STORE_FILE = os.path.join(SAVE_DIR, "webmux.sqlite3")
+
+# Single SQLite store for validators, epochs and withdrawals
+store = Store(STORE_FILE)
+store.migrate_legacy_files(SAVE_DIR)
+
+# In-process LRU in front of stored entries, with a TTL per data class
+cache = TieredCache(store)
+
+# Closed epoch boundaries, loaded once and extended incrementally
+epoch_index = EpochIndex(store)
+
+# Completed withdrawals per identity, synced incrementally
+withdrawal_store = WithdrawalStore(store, cache)
+
+# Concurrent requests for the same upstream resource share one fetch
+flight = SingleFlight()
+
+# Local copy of the explorer's validator list (identity, IP, balance, collateral)
+registry = ValidatorRegistry(store, cache)
+
+# Proposed-block heights per validator, synced incrementally
+block_index = BlockIndex(store, cache, epoch_index)
 
 def load_cached_data(file_path, default=None):
-    """Load data from cache file"""
+    """Load data from cache file, keeping the parsed value in memory"""
+    value = cache.get("file", file_path, persist=False)
+    if value is MISSING:
+        value = read_cache_file(file_path, default)
+        if value is not None:
+            cache.set("file", file_path, value, persist=False)
+    return value if value is not None else default
+
+def read_cache_file(file_path, default=None):
+    """Read and parse a cache file"""
     try:
         if os.path.exists(file_path):
             with open(file_path, 'r') as f:
@@ -46,6 +83,7 @@ def load_cached_data(file_path, default=None):
 
 def save_cached_data(file_path, data):
     """Save data to cache file"""
+    cache.invalidate("file", file_path)
     try:
         with open(file_path, 'w') as f:
             if isinstance(data, (list, tuple)):
@@ -61,175 +99,27 @@ def save_cached_data(file_path, data):
     except Exception as e:
         logger.error(f"Error saving cache to {file_path}: {e}")
 
-def update_epoch_intervals():
-    """Update epoch intervals cache file"""
-    try:
-        if not os.path.exists(EPOCH_INTERVALS_FILE):
-            # Fetch epoch data from API
-            response = requests.get("https://dashsight.dashevo.org/insight-api-dash/sync")
-            data = response.json()
-            
-            if 'blockChainHeight' in data:
-                height = data['blockChainHeight']
-                
-                # Get timestamps for blocks around epoch transitions
-                epochs = {}
-                for block_height in range(100, height, 16320):  # Approximately 16320 blocks per epoch
-                    try:
-                        block_response = requests.get(f"https://dashsight.dashevo.org/insight-api-dash/block-index/{block_height}")
-                        block_hash = block_response.json().get('blockHash')
-                        
-                        if block_hash:
-                            block_data_response = requests.get(f"https://dashsight.dashevo.org/insight-api-dash/block/{block_hash}")
-                            block_data = block_data_response.json()
-                            
-                            if 'time' in block_data:
-                                epoch_num = block_height // 16320
-                                epochs[epoch_num] = block_data['time']
-                    except Exception as e:
-                        logger.warning(f"Error fetching block data for height {block_height}: {e}")
-                
-                # Save epoch intervals to file
-                save_cached_data(EPOCH_INTERVALS_FILE, epochs)
-    except Exception as e:
-        logger.error(f"Error updating epoch intervals: {e}")
+def refresh_epoch_index(current_epoch=None):
+    """Fetch boundaries of newly closed epochs into the epoch index"""
+    if current_epoch is None:
+        current_epoch = get_current_epoch()
+    if current_epoch != epoch_index.current_epoch or epoch_index.last_closed_epoch < current_epoch - 1:
+        epoch_index.refresh(current_epoch, get_epoch_timestamps)
+    return epoch_index
 
-def timestamp_to_epoch(timestamp):
-    """Convert timestamp to epoch number"""
-    # This function is now primarily for backwards compatibility
-    # New code should use the direct epoch data from the API
-    
-    # Best approach: directly query current epoch from API
-    try:
-        response = requests.get("https://platform-explorer.pshenmic.dev/status")
-        data = response.json()
-        current_epoch = data.get('epoch', {}).get('number', 24) # Default to 24 if not available
-        
-        # For timestamps in the future, return current epoch
-        current_time_ms = int(time.time() * 1000)
-        if timestamp * 1000 > current_time_ms:  # Convert timestamp to milliseconds
-            return current_epoch
-        
-        # For historical timestamps, use epoch data from API
-        # Start from the earliest epoch (6) and check each one
-        for epoch_num in range(6, current_epoch + 1):
-            epoch_data = get_epoch_timestamps(epoch_num)
-            if epoch_data:
-                start_time, end_time = epoch_data
-                # Convert timestamp to milliseconds for comparison
-                if start_time <= timestamp * 1000 <= end_time:
-                    return epoch_num
-    except Exception as e:
-        logger.error(f"Error in direct epoch determination: {e}")
-        
-    # If all else fails, return a reasonable default (current epoch)
-    return 24
-
-def fetch_validator_identity(validator_hash):
-    """Fetch validator identity and IP from API"""
-    try:
-        url = f"https://platform-explorer.pshenmic.dev/validator/{validator_hash}"
-        response = requests.get(url, timeout=10)  # Add timeout to prevent long wait
-        data = response.json()
-        
-        # Extract identity from response
-        identity = data.get('identity')
-        if not identity:
-            logger.warning(f"No identity found for validator {validator_hash}")
-            return None
-        
-        # Also extract server IP if available (for display purposes)
-        try:
-            # Validator's IP address is in the proTxInfo.state.service field in format IP:PORT
-            ip_port = data.get('proTxInfo', {}).get('state', {}).get('service', '')
-            if ip_port and ':' in ip_port:
-                server_ip = ip_port.split(':')[0]
-                # Cache this IP address for this validator
-                cache_file = os.path.join(SAVE_DIR, f"validator_ip_{validator_hash}.txt")
-                with open(cache_file, 'w') as f:
-                    f.write(server_ip)
-        except Exception as e:
-            logger.error(f"Error extracting server IP for validator {validator_hash}: {e}")
-            
-        return identity
-    except requests.exceptions.ConnectionError as e:
-        logger.error(f"Connection error fetching validator identity: {e}")
-        # Return a placeholder indicating API connectivity issues rather than None
-        # This allows us to show the error to the user 
-        return f"API_CONNECTION_ERROR"
-    except requests.exceptions.Timeout:
-        logger.error(f"Timeout fetching validator identity for {validator_hash}")
-        return f"API_TIMEOUT_ERROR"
-    except Exception as e:
-        logger.error(f"Error fetching validator identity: {e}")
-        return None
+def parse_validator_info(data):
+    """Extract identity and server IP from a /validator/{hash} response"""
+    record = parse_validator_record(data)
+    return {"identity": record["identity"], "server_ip": record["server_ip"]}
 
-def fetch_withdrawal_data(validator_hash, epoch):
-    """Fetch withdrawal data for a specific validator and epoch"""
-    try:
-        # First get identity for the validator
-        identity = fetch_validator_identity(validator_hash)
-        
-        if identity == "API_CONNECTION_ERROR" or identity == "API_TIMEOUT_ERROR":
-            # If we can't get identity due to connection issues, return the error
-            return (validator_hash, epoch, identity)
-            
-        if not identity:
-            logger.warning(f"No identity found for validator {validator_hash}, cannot fetch withdrawals")
-            return None
-            
-        # Now get withdrawals data using the identity
-        url = f"https://platform-explorer.pshenmic.dev/identity/{identity}/withdrawals?page=1&limit=100"
-        response = requests.get(url, timeout=15)  # Increased timeout
-        data = response.json()
-        
-        # Get epoch start and end timestamps
-        epoch_data = get_epoch_timestamps(epoch)
-        if not epoch_data:
-            logger.warning(f"Could not get epoch timestamps for epoch {epoch}")
-            return None
-            
-        epoch_start_time, epoch_end_time = epoch_data
-        
-        # Filter withdrawals for the specific epoch by timestamp
-        epoch_withdrawals = [
-            withdrawal for withdrawal in data.get('resultSet', [])
-            if withdrawal.get('status') == 3  # Status 3 means completed withdrawals
-            and is_timestamp_in_epoch(withdrawal.get('timestamp'), epoch_start_time, epoch_end_time)
-        ]
-        
-        # Sum up all withdrawals for this validator in this epoch
-        # Convert amount from smallest unit (satoshis) to DASH (1 DASH = 100,000,000 satoshis)
-        total_amount = sum(withdrawal.get('amount', 0) / 100000000 for withdrawal in epoch_withdrawals)
-        
-        # Create result
-        result = (validator_hash, epoch, total_amount if total_amount > 0 else 0)
-        
-        # Cache the result to reduce future API calls
-        cache_file = os.path.join(SAVE_DIR, f"withdrawal_{validator_hash}_{epoch}.json")
-        save_cached_data(cache_file, result)
-        
-        if total_amount > 0:
-            return result
-        else:
-            return None
-    except requests.exceptions.ConnectionError as e:
-        logger.error(f"Connection error fetching withdrawal data: {e}")
-        # Special error marker to detect network issues
-        return (validator_hash, epoch, "API_CONNECTION_ERROR")
-    except requests.exceptions.Timeout:
-        logger.error(f"Timeout fetching withdrawal data for {validator_hash}, epoch {epoch}")
-        return (validator_hash, epoch, "API_TIMEOUT_ERROR")
-    except Exception as e:
-        logger.error(f"Error fetching withdrawal data for {validator_hash}, epoch {epoch}: {e}")
-        return None
-        
+@flight.wrap
 def get_epoch_timestamps(epoch_number):
-    """Get start and end timestamps for a given epoch"""
+    """Get start and end timestamps for a given epoch (closed epochs are cached forever)"""
+    cached = cache.get("epoch", epoch_number)
+    if cached is not MISSING:
+        return tuple(cached)
     try:
-        url = f"https://platform-explorer.pshenmic.dev/epoch/{epoch_number}"
-        response = requests.get(url, timeout=10)
-        data = response.json()
+        data = platform_client.get_json(f"/epoch/{epoch_number}")
         
         # Check if we have valid epoch data
         if not data or 'epoch' not in data:
@@ -241,53 +131,61 @@ def get_epoch_timestamps(epoch_number):
         
         if not start_time or not end_time:
             return None
-            
+        
+        if end_time < int(time.time() * 1000):
+            cache.set("epoch", epoch_number, [start_time, end_time])
         return (start_time, end_time)
     except Exception as e:
         logger.error(f"Error fetching epoch timestamps for epoch {epoch_number}: {e}")
         return None
         
-def is_timestamp_in_epoch(timestamp_str, epoch_start_time, epoch_end_time):
-    """Check if a timestamp is within a given epoch's time range"""
+@flight.wrap
+def fetch_current_epoch():
+    """Fetch current epoch number from API, or None on error"""
     try:
-        # Parse ISO timestamp to datetime with better error handling
-        if not timestamp_str or not isinstance(timestamp_str, str):
-            return False
-            
-        timestamp_dt = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
-        # Convert to milliseconds timestamp
-        timestamp_ms = int(timestamp_dt.timestamp() * 1000)
-        
-        # Check if timestamp is within epoch boundaries
-        return epoch_start_time <= timestamp_ms <= epoch_end_time
+        data = platform_client.get_json("/status")
+        return data.get('epoch', {}).get('number') or None
     except Exception as e:
-        logger.error(f"Error comparing timestamp {timestamp_str} with epoch: {e}")
-        return False
+        logger.error(f"Error fetching current epoch: {e}")
+        return None
 
+@flight.wrap
 def get_current_epoch():
-    """Get current epoch number from API"""
-    try:
-        response = requests.get(f"{PLATFORM_API_BASE}/status")
-        data = response.json()
-        current_epoch = data.get('epoch', {}).get('number')
-        if current_epoch:
-            return current_epoch
-    except Exception as e:
-        logger.error(f"Error fetching current epoch: {e}")
+    """Get current epoch number (cached for a few seconds)"""
+    current_epoch = cache.get_or_load("status", "current_epoch", fetch_current_epoch)
     
     # Fallback value if there's an error
-    return 24
+    return current_epoch or 24
+
+def get_known_epoch():
+    """Last known current epoch without an upstream call (a stale value is fine for page renders)"""
+    current_epoch = cache.get_stale("status", "current_epoch")
+    if current_epoch is MISSING and epoch_index.epochs:
+        current_epoch = epoch_index.last_closed_epoch + 1
+    return current_epoch if current_epoch is not MISSING and current_epoch else 24
+
+def calculate_totals(withdrawals_data, validators, current_epoch, start_epoch=FIRST_EPOCH):
+    """Calculate totals, APY and per-epoch yield for all validators and epochs.
 
-def calculate_totals(withdrawals_data, validators, current_epoch, start_epoch=6):
-    """Calculate totals for all validators and epochs"""
-    validator_totals = {}
-    grand_total = 0
+    withdrawals_data is a WithdrawalMatrix or {validator: {epoch: amount}}.
+    """
     epoch_range = list(range(start_epoch, current_epoch + 1))
+    if isinstance(withdrawals_data, WithdrawalMatrix):
+        matrix = withdrawals_data.since(start_epoch)
+    else:
+        matrix = WithdrawalMatrix.from_rows(withdrawals_data, validators, epoch_range)
     
-    for validator in validators:
-        if validator in withdrawals_data:
-            validator_total = sum(withdrawals_data[validator].get(epoch, 0) for epoch in epoch_range)
-            validator_totals[validator] = validator_total
-            grand_total += validator_total
+    validator_totals = dict(zip(matrix.validators, matrix.row_totals().tolist()))
+    grand_total = matrix.grand_total()
+    
+    yields = None
+    if validators:
+        try:
+            inputs = build_inputs(
+                matrix, validators, store.get_validator_records(validators), store.withdrawal_totals(validators)
+            )
+            yields = yields_to_json(validators, epoch_range, compute_yields(*inputs))
+        except Exception as e:
+            logger.error(f"Error calculating APY: {e}")
     
-    return validator_totals, grand_total, epoch_range
+    return validator_totals, grand_total, epoch_range, yields
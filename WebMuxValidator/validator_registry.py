@@ -0,0 +1,129 @@
+import json
+import time
+import asyncio
+import hashlib
+import logging
+
+from http_client import INSIGHT_API_BASE
+from cache import MISSING
+
+logger = logging.getLogger(__name__)
+
+# Registry settings
+VALIDATORS_PAGE_LIMIT = 100
+REGISTRY_TTL = 6 * 3600       # seconds before the validator list is pulled again
+REGISTRY_MIN_INTERVAL = 300   # seconds between pulls triggered by unknown validators
+LISTED_AT_KEY = "validators_listed_at"
+
+# Fields compared to decide whether a stored validator changed
+RECORD_FIELDS = ("identity", "server_ip", "identity_balance", "registered_height", "collateral")
+
+
+def parse_validator_record(data):
+    """Extract registry fields from a /validators entry or /validator/{hash} response"""
+    pro_tx_info = data.get('proTxInfo') or {}
+    state = pro_tx_info.get('state') or {}
+    # Validator's IP address is in the proTxInfo.state.service field in format IP:PORT
+    ip_port = state.get('service') or ''
+    collateral = state.get('collateral') or pro_tx_info.get('collateral') or {}
+    record = {
+        "validator": data.get('proTxHash'),
+        "identity": data.get('identity'),
+        "server_ip": ip_port.split(':')[0] if ':' in ip_port else None,
+        "identity_balance": data.get('identityBalance'),
+        "registered_height": state.get('registeredHeight'),
+        "collateral": collateral.get('amount') if isinstance(collateral, dict) else None
+    }
+    record["fingerprint"] = hashlib.sha1(
+        json.dumps([record[field] for field in RECORD_FIELDS]).encode()
+    ).hexdigest()
+    return record
+
+
+class ValidatorRegistry:
+    """Indexed local copy of the explorer's validator list.
+
+    The whole list is pulled page by page (a handful of requests for the
+    network) and only entries whose fields changed are written back, so
+    identity and IP resolution no longer costs one request per validator.
+    """
+
+    def __init__(self, store, cache=None):
+        self.store = store
+        self.cache = cache
+
+    def apply(self, entries):
+        """Store the changed entries of a validator list; returns how many changed"""
+        known = self.store.get_validator_fingerprints()
+        changed = []
+        for entry in entries:
+            record = parse_validator_record(entry)
+            if record["validator"] and record["identity"] and known.get(record["validator"]) != record["fingerprint"]:
+                changed.append(record)
+        if changed:
+            self.store.upsert_validator_records(changed)
+        return len(changed)
+
+    def listed_at(self):
+        return float(self.store.get_meta(LISTED_AT_KEY) or 0)
+
+    def lookup(self, validators):
+        """Get {validator: record} for validators in the local copy"""
+        return self.store.get_validator_records(validators) if validators else {}
+
+    async def refresh(self, client):
+        """Pull the whole validator list and store the changed entries"""
+        params = {"page": 1, "limit": VALIDATORS_PAGE_LIMIT}
+        first = await client.get_json("/validators", params=params)
+        entries = list(first.get('resultSet') or [])
+        total = (first.get('pagination') or {}).get('total') or 0
+        pages = range(2, -(-total // VALIDATORS_PAGE_LIMIT) + 1)
+        for data in await asyncio.gather(
+            *(client.get_json("/validators", params={**params, "page": page}) for page in pages)
+        ):
+            entries.extend(data.get('resultSet') or [])
+
+        changed = await asyncio.to_thread(self.apply, entries)
+        await asyncio.to_thread(self.store.set_meta, LISTED_AT_KEY, time.time())
+        logger.info(f"Validator registry refreshed: {len(entries)} listed, {changed} changed")
+        return changed
+
+    async def fetch_block_time(self, client, height):
+        """Core block time (unix seconds) at a height from the Insight API, or None"""
+        if self.cache is not None and await asyncio.to_thread(self.cache.get, "block_time", height) is not MISSING:
+            return None
+        try:
+            block_hash = (await client.get_json(f"{INSIGHT_API_BASE}/block-index/{height}")).get('blockHash')
+            return (await client.get_json(f"{INSIGHT_API_BASE}/block/{block_hash}")).get('time')
+        except Exception as e:
+            logger.error(f"Error fetching core block time at height {height}: {e}")
+            if self.cache is not None:
+                await asyncio.to_thread(self.cache.set, "block_time", height, 0)
+            return None
+
+    async def fill_registered_times(self, client, validators):
+        """Look up registration block times (for APY) that are not stored yet"""
+        pending = {
+            validator: record["registered_height"]
+            for validator, record in (await asyncio.to_thread(self.lookup, validators)).items()
+            if record["registered_height"] and not record["registered_time"]
+        }
+        heights = sorted(set(pending.values()))
+        times = dict(zip(heights, await asyncio.gather(*(self.fetch_block_time(client, height) for height in heights))))
+        pairs = [(validator, times[height]) for validator, height in pending.items() if times[height]]
+        if pairs:
+            await asyncio.to_thread(self.store.set_registered_times, pairs)
+        return len(pairs)
+
+    async def ensure(self, client, validators):
+        """Refresh the list if it is stale or misses requested validators, then look them up"""
+        known = await asyncio.to_thread(self.lookup, validators)
+        age = time.time() - await asyncio.to_thread(self.listed_at)
+        missing = len(known) < len(set(validators))
+        if age > REGISTRY_TTL or (missing and age > REGISTRY_MIN_INTERVAL):
+            try:
+                await self.refresh(client)
+                known = await asyncio.to_thread(self.lookup, validators)
+            except Exception as e:
+                logger.error(f"Error refreshing validator registry: {e}")
+        return known
@@ -0,0 +1,82 @@
+import numpy as np
+
+# Decimal places kept in the JSON encoding (amounts are credits / 1e8)
+AMOUNT_PRECISION = 8
+
+
+class WithdrawalMatrix:
+    """Dense validator x epoch withdrawal amounts.
+
+    Amounts are a float array indexed by the positions of the validator and
+    epoch label arrays. Epochs are consecutive and ascending, so an epoch
+    maps to a column by offset and slicing by start epoch is a view.
+    """
+
+    def __init__(self, validators, epochs, values=None):
+        self.validators = list(validators)
+        self.epochs = np.asarray(epochs, dtype=np.int64)
+        if values is None:
+            values = np.zeros((len(self.validators), len(self.epochs)))
+        self.values = np.asarray(values, dtype=float).reshape(len(self.validators), len(self.epochs))
+        self.index = {validator: i for i, validator in enumerate(self.validators)}
+
+    @classmethod
+    def from_rows(cls, rows, validators, epochs):
+        """Build from {validator: {epoch: amount}}, keeping the validators present in rows in list order"""
+        matrix = cls([validator for validator in dict.fromkeys(validators) if validator in rows], epochs)
+        first_epoch = matrix.epochs[0] if len(matrix.epochs) else 0
+        for i, validator in enumerate(matrix.validators):
+            row = rows[validator]
+            if not row:
+                continue
+            columns = np.fromiter(map(int, row.keys()), dtype=np.int64, count=len(row)) - first_epoch
+            amounts = np.fromiter(row.values(), dtype=float, count=len(row))
+            in_range = (columns >= 0) & (columns < len(matrix.epochs))
+            matrix.values[i, columns[in_range]] = amounts[in_range]
+        return matrix
+
+    @classmethod
+    def from_columnar(cls, data):
+        """Build from the to_columnar() encoding"""
+        return cls(data["validators"], data["epochs"], np.asarray(data["columns"], dtype=float).T)
+
+    def __len__(self):
+        return len(self.validators)
+
+    def row_totals(self):
+        return self.values.sum(axis=1)
+
+    def column_totals(self):
+        return self.values.sum(axis=0)
+
+    def grand_total(self):
+        return float(self.values.sum())
+
+    def since(self, start_epoch):
+        """Columns from start_epoch onwards (a view, not a copy)"""
+        offset = int(np.searchsorted(self.epochs, start_epoch))
+        return WithdrawalMatrix(self.validators, self.epochs[offset:], self.values[:, offset:])
+
+    def reindex(self, validators):
+        """Rows in the order of a validator list; validators without a row get zeros"""
+        positions = np.array([self.index.get(validator, -1) for validator in validators], dtype=np.int64)
+        values = np.zeros((len(positions), len(self.epochs)))
+        known = positions >= 0
+        values[known] = self.values[positions[known]]
+        return WithdrawalMatrix(validators, self.epochs, values)
+
+    def to_rows(self):
+        """Nested {validator: {epoch: amount}} with the non-zero cells, as the frontend reads it"""
+        epochs = self.epochs.tolist()
+        rows = {}
+        for validator, row in zip(self.validators, self.values.tolist()):
+            rows[validator] = {epoch: amount for epoch, amount in zip(epochs, row) if amount}
+        return rows
+
+    def to_columnar(self):
+        """Compact JSON encoding: label arrays once and one amount array per epoch"""
+        return {
+            "validators": self.validators,
+            "epochs": self.epochs.tolist(),
+            "columns": np.round(self.values.T, AMOUNT_PRECISION).tolist()
+        }
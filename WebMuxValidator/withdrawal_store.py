@@ -0,0 +1,134 @@
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+WITHDRAWALS_PAGE_LIMIT = 100
+
+# Withdrawal statuses: 3 means completed, 4 expired; others may still complete later
+STATUS_COMPLETED = 3
+STATUS_EXPIRED = 4
+
+
+def parse_timestamp_ms(timestamp_str):
+    """Parse an ISO timestamp into milliseconds since the epoch"""
+    try:
+        if not timestamp_str or not isinstance(timestamp_str, str):
+            return None
+        timestamp_dt = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
+        return int(timestamp_dt.timestamp() * 1000)
+    except Exception as e:
+        logger.error(f"Error parsing timestamp {timestamp_str}: {e}")
+        return None
+
+
+class WithdrawalStore:
+    """Append-only store of completed withdrawals per identity.
+
+    Records ({"key", "timestamp", "amount"}, timestamp in ms) live in the
+    SQLite store together with a per-identity watermark: the newest
+    timestamp below which the history is known to be complete, so a sync
+    only needs the pages newer than it.
+    """
+
+    def __init__(self, store, cache=None):
+        self.store = store
+        self.cache = cache
+
+    def watermark(self, identity):
+        """Newest timestamp (ms) up to which the identity's history is stored"""
+        return self.store.get_watermark(identity)
+
+    def load(self, identity):
+        """Load all stored withdrawal records of an identity"""
+        if self.cache is not None:
+            return self.cache.get_or_load("withdrawals", identity, lambda: self.store.load_withdrawals(identity), persist=False)
+        return self.store.load_withdrawals(identity)
+
+    def append(self, identity, records, watermark):
+        """Append new records (skipping known keys) and advance the watermark"""
+        added = self.store.add_withdrawals(identity, records, watermark)
+        if added and self.cache is not None:
+            self.cache.invalidate("withdrawals", identity)
+        return added
+
+    def begin_sync(self, identity):
+        """Start a newest-first page walk for an identity"""
+        return WithdrawalSync(self, identity)
+
+
+class WithdrawalSync:
+    """State of one newest-first walk over an identity's withdrawal pages.
+
+    The caller fetches pages with params() until add_page() returns False,
+    then calls commit(). Requests are left to the caller.
+    """
+
+    def __init__(self, store, identity):
+        self.store = store
+        self.identity = identity
+        self.watermark = store.watermark(identity)
+        self.completed = []
+        self.oldest_pending = None
+        self.page = 1
+
+    def params(self):
+        return {"page": self.page, "limit": WITHDRAWALS_PAGE_LIMIT, "order": "desc"}
+
+    def record_key(self, withdrawal, total, offset):
+        """Stable key of a withdrawal: its upstream ID or hash, else its index in the identity's history.
+
+        The history is append-only, so counting from the oldest entry
+        (total minus the newest-first offset) gives the same index on
+        every sync. Returns None when neither is available.
+        """
+        key = withdrawal.get('id') or withdrawal.get('hash')
+        if key:
+            return key
+        if not total:
+            logger.warning(f"Withdrawal of identity {self.identity} at {withdrawal.get('timestamp')} has no stable key")
+            return None
+        return f"{self.identity}:{total - offset - 1}"
+
+    def add_page(self, data):
+        """Consume one page of API results, returning True if another page is needed"""
+        withdrawals = data.get('resultSet', [])
+        total = data.get('pagination', {}).get('total')
+        
+        for offset, withdrawal in enumerate(withdrawals, start=(self.page - 1) * WITHDRAWALS_PAGE_LIMIT):
+            timestamp_ms = parse_timestamp_ms(withdrawal.get('timestamp'))
+            if timestamp_ms is None:
+                continue
+            if self.watermark is not None and timestamp_ms < self.watermark:
+                return False
+            status = withdrawal.get('status')
+            key = self.record_key(withdrawal, total, offset) if status == STATUS_COMPLETED else None
+            if key is not None:
+                self.completed.append({
+                    "key": key,
+                    "timestamp": timestamp_ms,
+                    "amount": withdrawal.get('amount', 0)
+                })
+            elif status != STATUS_EXPIRED and (self.oldest_pending is None or timestamp_ms < self.oldest_pending):
+                # Not completed yet, or completed without a stable key: retried on the next sync
+                self.oldest_pending = timestamp_ms
+        
+        if len(withdrawals) < WITHDRAWALS_PAGE_LIMIT or (total and self.page * WITHDRAWALS_PAGE_LIMIT >= total):
+            return False
+        self.page += 1
+        return True
+
+    def commit(self):
+        """Store the new records, advance the watermark and return the full history"""
+        watermark = self.watermark
+        new_watermark = max([record['timestamp'] for record in self.completed], default=watermark)
+        # Never move the watermark past a withdrawal that has not completed yet
+        if self.oldest_pending is not None:
+            if watermark is None:
+                new_watermark = self.oldest_pending
+            else:
+                new_watermark = max(watermark, min(new_watermark, self.oldest_pending))
+        
+        added = self.store.append(self.identity, self.completed, new_watermark)
+        logger.debug(f"Synced {added} new withdrawals for identity {self.identity} in {self.page} page(s)")
+        return self.store.load(self.identity)